@@ -3,6 +3,7 @@ from logging.config import fileConfig
 import app.models  # noqa: F401
 from alembic import context
 from app.core.config import get_settings
+from app.db.backfill import CHECKPOINT_TABLE
 from app.db.base import Base
 from sqlalchemy import engine_from_config, pool
 
@@ -16,11 +17,17 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Backfill checkpoints belong to app.db.backfill, not to the models
+    return not (type_ == "table" and name == CHECKPOINT_TABLE)
+
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -37,7 +44,11 @@ def run_migrations_online():
     )
 
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+        )
 
         with context.begin_transaction():
             context.run_migrations()
@@ -0,0 +1,34 @@
+"""add membership and invitation change counters to organizations
+
+Revision ID: add_org_change_counters
+Revises: set_invitation_max_uses_default
+Create Date: 2026-01-12 10:00:00.000000
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "add_org_change_counters"
+down_revision = "set_invitation_max_uses_default"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Counters are bumped on every membership/invitation change and feed the
+    # ETag validators of the organization endpoints
+    op.add_column(
+        "organizations",
+        sa.Column("members_version", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "organizations",
+        sa.Column(
+            "invitations_version", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("organizations", "invitations_version")
+    op.drop_column("organizations", "members_version")
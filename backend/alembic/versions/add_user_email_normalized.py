@@ -0,0 +1,146 @@
+"""add users.email_normalized lookup column
+
+Revision ID: add_user_email_normalized
+Revises: add_org_change_counters
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from typing import Optional
+
+import sqlalchemy as sa
+from alembic import op
+from app.db.backfill import Backfill, checkpoints, run_in_migration
+
+revision = "add_user_email_normalized"
+down_revision = "add_org_change_counters"
+branch_labels = None
+depends_on = None
+
+BACKFILL_NAME = "users_email_normalized"
+INDEX_NAME = "ix_users_email_normalized"
+
+# Frozen copy of app.utils.email.normalize_email at the time of this revision
+GMAIL_DOMAINS = frozenset({"gmail.com", "googlemail.com"})
+
+users = sa.table(
+    "users",
+    sa.column("id", sa.Integer),
+    sa.column("email", sa.String),
+    sa.column("email_normalized", sa.String),
+)
+
+
+def _normalize(email: str) -> str:
+    local_part, domain = email.lower().strip().rsplit("@", 1)
+    if domain in GMAIL_DOMAINS:
+        local_part = local_part.replace(".", "")
+    return f"{local_part}@{domain}"
+
+
+def _normalize_rows(connection, rows) -> None:
+    if not rows:
+        return
+    connection.execute(
+        users.update()
+        .where(users.c.id == sa.bindparam("user_id"))
+        .values(email_normalized=sa.bindparam("normalized")),
+        [{"user_id": row.id, "normalized": _normalize(row.email)} for row in rows],
+    )
+
+
+def _index_is_valid(bind) -> Optional[bool]:
+    """Whether the unique index exists and is usable; None when it is missing."""
+    if bind.dialect.name == "postgresql":
+        # A failed CREATE INDEX CONCURRENTLY leaves an INVALID index behind
+        return bind.scalar(
+            sa.text(
+                "SELECT i.indisvalid FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = :name"
+            ),
+            {"name": INDEX_NAME},
+        )
+    indexes = sa.inspect(bind).get_indexes("users")
+    return True if any(index["name"] == INDEX_NAME for index in indexes) else None
+
+
+# Every step is skipped when already done, so a failed upgrade can be re-run:
+# the backfill and the index build commit on their own, before the revision.
+def upgrade() -> None:
+    columns = sa.inspect(op.get_bind()).get_columns("users")
+    if not any(column["name"] == "email_normalized" for column in columns):
+        op.add_column(
+            "users",
+            sa.Column("email_normalized", sa.String(length=255), nullable=True),
+        )
+
+    # Commits the ADD COLUMN first, so users is not locked during the backfill
+    run_in_migration(
+        Backfill(
+            BACKFILL_NAME,
+            users,
+            process=_normalize_rows,
+            columns=("email",),
+            where=users.c.email_normalized.is_(None),
+        )
+    )
+
+    # Legacy rows stored un-normalized may collide; they must be merged by hand
+    duplicates = (
+        op.get_bind()
+        .execute(
+            sa.select(users.c.email_normalized)
+            .where(users.c.email_normalized.is_not(None))
+            .group_by(users.c.email_normalized)
+            .having(sa.func.count() > 1)
+        )
+        .all()
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Users share a normalized email, merge them before upgrading: "
+            + ", ".join(row.email_normalized for row in duplicates)
+        )
+
+    # Built without blocking writes; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        valid = _index_is_valid(op.get_bind())
+        if valid is False:
+            op.drop_index(
+                op.f(INDEX_NAME), table_name="users", postgresql_concurrently=True
+            )
+        if not valid:
+            op.create_index(
+                op.f(INDEX_NAME),
+                "users",
+                ["email_normalized"],
+                unique=True,
+                postgresql_concurrently=True,
+            )
+
+    # Processes still running the previous release insert rows without the
+    # column. Block writes (not reads) until NOT NULL is set, then catch up.
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        op.execute("LOCK TABLE users IN SHARE ROW EXCLUSIVE MODE")
+    _normalize_rows(
+        bind,
+        bind.execute(
+            sa.select(users.c.id, users.c.email).where(
+                users.c.email_normalized.is_(None)
+            )
+        ).all(),
+    )
+    op.alter_column(
+        "users",
+        "email_normalized",
+        existing_type=sa.String(length=255),
+        nullable=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f(INDEX_NAME), table_name="users")
+    op.drop_column("users", "email_normalized")
+    # Otherwise a later upgrade would skip the backfill as already completed
+    if sa.inspect(op.get_bind()).has_table(checkpoints.name):
+        op.execute(checkpoints.delete().where(checkpoints.c.name == BACKFILL_NAME))
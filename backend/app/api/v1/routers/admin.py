@@ -0,0 +1,80 @@
+import logging
+
+from app.core.profiler import (
+    MAX_WINDOW_SECONDS,
+    ProfilerBusyError,
+    profile_store,
+    profile_window,
+    worker_id,
+)
+from app.core.responses import ORJSONResponse
+from app.core.security import require_admin
+from app.core.usage import NO_TENANT, collect_usage
+from app.schemas.admin import TenantUsage, TenantUsageReport, TenantUsageSort
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+logger = logging.getLogger(__name__)
+router = APIRouter(
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(require_admin)],
+    include_in_schema=False,
+)
+
+COLLAPSED_MEDIA_TYPE = "text/plain; charset=utf-8"
+
+
+@router.post("/profiler/window", summary="Profile this worker for a time window")
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=MAX_WINDOW_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=100),
+) -> Response:
+    """Sample the worker that serves this request and return collapsed stacks."""
+    try:
+        collapsed = await profile_window(seconds, interval_ms / 1000)
+    except ProfilerBusyError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+    logger.info("Profiled worker %s for %.1fs", worker_id(), seconds)
+    return Response(
+        content=collapsed,
+        media_type=COLLAPSED_MEDIA_TYPE,
+        headers={"X-Worker-Id": worker_id()},
+    )
+
+
+@router.get("/profiler/profiles/{profile_id}", summary="Fetch a request profile")
+async def get_request_profile(profile_id: str) -> Response:
+    """Return a profile captured via the ``X-Debug-Profile`` request header."""
+    collapsed = profile_store.get(profile_id)
+    if collapsed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile not found on worker {worker_id()}",
+        )
+    return Response(
+        content=collapsed,
+        media_type=COLLAPSED_MEDIA_TYPE,
+        headers={"X-Worker-Id": worker_id()},
+    )
+
+
+@router.get(
+    "/tenants/usage",
+    response_model=TenantUsageReport,
+    summary="Resource usage per organization",
+)
+def get_tenant_usage(
+    sort_by: TenantUsageSort = Query("db_time_seconds"),
+    limit: int = Query(50, ge=1, le=1000),
+):
+    """Totals since worker start, summed over all workers in multiprocess mode."""
+    # Sync endpoint: runs in the threadpool since multiprocess mode reads files
+    tenants = [
+        TenantUsage(
+            organization_id=None if tenant == NO_TENANT else int(tenant),
+            **vars(totals),
+        )
+        for tenant, totals in collect_usage().items()
+    ]
+    tenants.sort(key=lambda usage: getattr(usage, sort_by), reverse=True)
+    return ORJSONResponse(TenantUsageReport(sort_by=sort_by, tenants=tenants[:limit]))
@@ -1,5 +1,7 @@
 import logging
 
+from app.core.rate_limit import RateLimitKey, rate_limit
+from app.core.responses import ORJSONResponse
 from app.core.security import get_user_context
 from app.db.session import get_session
 from app.schemas.auth import (
@@ -27,52 +29,67 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
-@router.post("/login", response_model=AuthResponse)
+@router.post(
+    "/login",
+    response_model=AuthResponse,
+    dependencies=[Depends(rate_limit("auth.login", "10/minute"))],
+)
 async def login(
-    payload: LoginRequest, session: AsyncSession = Depends(get_session)
-) -> AuthResponse:
+    payload: LoginRequest,
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Login with email and password"""
     auth_service = AuthService(session)
     logger.debug("Login attempt for %s", payload.email)
-    return await auth_service.login(payload)
+    return ORJSONResponse(await auth_service.login(payload))
 
 
 @router.post(
-    "/register", response_model=AuthResponse, status_code=status.HTTP_201_CREATED
+    "/register",
+    response_model=AuthResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(rate_limit("auth.register", "5/minute"))],
 )
 async def register(
-    payload: RegisterRequest, session: AsyncSession = Depends(get_session)
-) -> AuthResponse:
+    payload: RegisterRequest,
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Register a new user with email and password"""
     auth_service = AuthService(session)
     logger.debug("Registration attempt for %s", payload.email)
-    return await auth_service.register(payload)
+    return ORJSONResponse(
+        await auth_service.register(payload), status_code=status.HTTP_201_CREATED
+    )
 
 
 @router.post("/google", response_model=AuthResponse)
 async def google_auth(
-    payload: GoogleAuthRequest, session: AsyncSession = Depends(get_session)
-) -> AuthResponse:
+    payload: GoogleAuthRequest,
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Authenticate or register via Google OAuth"""
     auth_service = AuthService(session)
     logger.debug("Google auth attempt (is_registration=%s)", payload.is_registration)
-    return await auth_service.google_auth(payload)
+    return ORJSONResponse(await auth_service.google_auth(payload))
 
 
 @router.get("/me", response_model=UserRead)
 async def get_current_user(
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> UserRead:
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Get current authenticated user"""
     auth_service = AuthService(session)
-    return await auth_service.get_current_user(ctx.user_id)
+    return ORJSONResponse(await auth_service.get_current_user(ctx.user_id))
 
 
-@router.post("/forgot-password")
+@router.post(
+    "/forgot-password",
+    dependencies=[Depends(rate_limit("auth.password-reset", "5/minute"))],
+)
 async def forgot_password(
     payload: ForgotPasswordRequest,
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ) -> dict:
     """Request password reset email (for users who forgot their password)"""
     auth_service = AuthService(session)
@@ -80,10 +97,15 @@ async def forgot_password(
     return await auth_service.request_password_reset(str(payload.email))
 
 
-@router.post("/request-password-reset")
+@router.post(
+    "/request-password-reset",
+    dependencies=[
+        Depends(rate_limit("auth.password-reset", "5/minute", key=RateLimitKey.USER))
+    ],
+)
 async def request_password_reset(
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ) -> dict:
     """Request password reset email for authenticated user (set or change password)"""
     auth_service = AuthService(session)
@@ -91,16 +113,22 @@ async def request_password_reset(
     return await auth_service.request_password_reset_authenticated(ctx.user_id)
 
 
-@router.post("/reset-password", response_model=UserRead)
+@router.post(
+    "/reset-password",
+    response_model=UserRead,
+    dependencies=[Depends(rate_limit("auth.reset-password", "10/minute"))],
+)
 async def reset_password(
     payload: ResetPasswordRequest,
-    session: AsyncSession = Depends(get_session),
-) -> UserRead:
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Reset password using token from email"""
     auth_service = AuthService(session)
     logger.debug("Reset password request")
-    return await auth_service.reset_password(
-        payload.token, payload.password, payload.confirm_password
+    return ORJSONResponse(
+        await auth_service.reset_password(
+            payload.token, payload.password, payload.confirm_password
+        )
     )
 
 
@@ -108,40 +136,44 @@ async def reset_password(
 async def update_profile(
     payload: UpdateProfileRequest,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> UserRead:
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Update current user's profile"""
     auth_service = AuthService(session)
     logger.debug("Update profile request for user_id=%s", ctx.user_id)
-    return await auth_service.update_profile(ctx.user_id, payload.full_name)
+    return ORJSONResponse(
+        await auth_service.update_profile(ctx.user_id, payload.full_name)
+    )
 
 
 @router.post("/link-google", response_model=UserRead)
 async def link_google(
     payload: LinkGoogleRequest,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> UserRead:
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Link Google account to existing user"""
     auth_service = AuthService(session)
     logger.debug("Link Google request for user_id=%s", ctx.user_id)
-    return await auth_service.link_google(ctx.user_id, payload.credential)
+    return ORJSONResponse(
+        await auth_service.link_google(ctx.user_id, payload.credential)
+    )
 
 
 @router.post("/verify-email", response_model=UserRead)
 async def verify_email(
-    token: str, session: AsyncSession = Depends(get_session)
-) -> UserRead:
+    token: str, session: AsyncSession = Depends(get_session, scope="function")
+) -> ORJSONResponse:
     """Verify user email with token from verification email"""
     auth_service = AuthService(session)
     logger.debug("Email verification request")
-    return await auth_service.verify_email(token)
+    return ORJSONResponse(await auth_service.verify_email(token))
 
 
 @router.post("/resend-verification")
 async def resend_verification(
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ) -> dict:
     """Resend verification email to current user"""
     auth_service = AuthService(session)
@@ -159,32 +191,39 @@ async def logout() -> dict:
 
 @router.post("/refresh", response_model=AuthResponse)
 async def refresh_token(
-    payload: RefreshTokenRequest, session: AsyncSession = Depends(get_session)
-) -> AuthResponse:
+    payload: RefreshTokenRequest,
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Get new access token using refresh token"""
     auth_service = AuthService(session)
-    return await auth_service.refresh_token(payload.refresh_token)
+    return ORJSONResponse(await auth_service.refresh_token(payload.refresh_token))
 
 
 # Legacy endpoint for OAuth2PasswordRequestForm compatibility
-@router.post("/token", response_model=Token)
+@router.post(
+    "/token",
+    response_model=Token,
+    dependencies=[Depends(rate_limit("auth.login", "10/minute"))],
+)
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: AsyncSession = Depends(get_session),
-) -> Token:
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Legacy token endpoint for OAuth2 form login"""
     auth_service = AuthService(session)
     logger.debug("Token request for %s", form_data.username)
     user = await auth_service.authenticate_user(form_data.username, form_data.password)
-    return auth_service.generate_token(user.id)
+    return ORJSONResponse(auth_service.generate_token(user.id))
 
 
 @router.post("/switch-organization", response_model=SwitchOrganizationResponse)
 async def switch_organization(
     payload: SwitchOrganizationRequest,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> SwitchOrganizationResponse:
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Switch to a different organization and get new tokens with org context"""
     auth_service = AuthService(session)
-    return await auth_service.switch_organization(ctx.user_id, payload.organization_id)
+    return ORJSONResponse(
+        await auth_service.switch_organization(ctx.user_id, payload.organization_id)
+    )
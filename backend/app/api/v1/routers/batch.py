@@ -0,0 +1,33 @@
+import logging
+
+from app.core.batch import run_batch
+from app.core.responses import ORJSONResponse
+from app.core.security import get_user_context, oauth2_scheme
+from app.schemas.auth import UserContext
+from app.schemas.batch import BatchRequest, BatchResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/batch", tags=["batch"])
+
+
+@router.post("", response_model=BatchResponse)
+async def batch(
+    payload: BatchRequest,
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    ctx: UserContext = Depends(get_user_context),
+) -> ORJSONResponse:
+    """
+    Run several GET requests in one round trip. Each sub-request has its own
+    status, ETag and body; a failing sub-request does not fail the batch.
+    """
+    ids = [item.id for item in payload.requests]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Batch request ids must be unique",
+        )
+    responses = await run_batch(request, payload.requests, token, ctx)
+    logger.debug("Batch of %d requests for user %s", len(responses), ctx.user_id)
+    return ORJSONResponse(BatchResponse(responses=responses))
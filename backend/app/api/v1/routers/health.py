@@ -1,5 +1,6 @@
 import logging
 
+from app.core.responses import ORJSONResponse
 from app.schemas.health import HealthResponse
 from app.services.health import HealthService
 from fastapi import APIRouter
@@ -9,7 +10,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=HealthResponse, summary="Simple health check")
-async def health_check() -> HealthResponse:
+async def health_check() -> ORJSONResponse:
     status = await HealthService().get_status()
     logger.debug("Health check status: %s", status)
-    return HealthResponse(**status)
+    return ORJSONResponse(HealthResponse(**status))
@@ -0,0 +1,13 @@
+import logging
+
+from app.core.metrics import CONTENT_TYPE_LATEST, generate_latest
+from fastapi import APIRouter, Response
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+@router.get("", include_in_schema=False, summary="Prometheus metrics")
+def metrics() -> Response:
+    # Sync endpoint: runs in the threadpool since multiprocess mode reads files
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,11 +1,17 @@
 import logging
 from typing import List
 
+from app.core.config import get_settings
+from app.core.permissions import OrgPermission, require
+from app.core.rate_limit import RateLimitKey, rate_limit
+from app.core.responses import ORJSONResponse, render_json
 from app.core.security import get_optional_user_context, get_user_context
+from app.core.singleflight import coalesce
 from app.db.session import get_session
-from app.models.organization import OrganizationRole
 from app.schemas.auth import UserContext
 from app.schemas.organization import (
+    BulkInvitationCreate,
+    BulkInvitationResponse,
     ChangeMemberRoleRequest,
     InvitationCreate,
     InvitationResponse,
@@ -22,12 +28,28 @@ from app.schemas.organization import (
 )
 from app.services.organization import organization_service
 from app.services.user import UserService
-from fastapi import APIRouter, Depends, HTTPException, status
+from app.tasks.deferred import defer
+from app.tasks.email import send_organization_invitation_emails
+from app.utils.etag import etag_headers, etag_matches, make_etag, not_modified
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    status,
+)
+from sqlalchemy import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/organizations", tags=["organizations"])
 
+# Declared after the permission check so non-members cannot drain the bucket
+INVITATIONS_RATE_LIMIT = rate_limit(
+    "org.invitations", "30/minute", key=RateLimitKey.ORGANIZATION
+)
+
 
 @router.post(
     "", response_model=OrganizationResponse, status_code=status.HTTP_201_CREATED
@@ -35,7 +57,7 @@ router = APIRouter(prefix="/organizations", tags=["organizations"])
 async def create_organization(
     data: OrganizationCreate,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ) -> OrganizationResponse:
     """Create a new organization. The creator becomes the owner."""
     # Check if user's email is verified
@@ -66,34 +88,46 @@ async def create_organization(
 
 @router.get("", response_model=UserOrganizationsResponse)
 async def get_my_organizations(
+    request: Request,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> UserOrganizationsResponse:
+    session: AsyncSession = Depends(get_session, scope="function"),
+):
     """Get all organizations the current user is a member of."""
+    validators = await organization_service.get_user_organizations_validators(
+        session, ctx.user_id
+    )
+    etag = make_etag("organizations", ctx.user_id, *validators)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
     organizations = await organization_service.get_user_organizations(
         session, ctx.user_id
     )
-    return UserOrganizationsResponse(
-        organizations=organizations, total=len(organizations)
+    return ORJSONResponse(
+        UserOrganizationsResponse(
+            organizations=organizations, total=len(organizations)
+        ),
+        headers=etag_headers(etag),
     )
 
 
 @router.get("/{organization_id}", response_model=OrganizationWithRole)
 async def get_organization(
     organization_id: int,
-    ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> OrganizationWithRole:
+    request: Request,
+    membership: Row = Depends(require(OrgPermission.VIEW_ORGANIZATION)),
+    session: AsyncSession = Depends(get_session, scope="function"),
+):
     """Get organization details. User must be a member."""
-    # Check if user is a member
-    role = await organization_service.get_user_role_in_organization(
-        session, ctx.user_id, organization_id
+    etag = make_etag(
+        "organization",
+        organization_id,
+        membership.role,
+        membership.joined_at,
+        membership.updated_at,
     )
-    if not role:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Немате пристап до оваа организација.",
-        )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
 
     organization = await organization_service.get_organization_by_id(
         session, organization_id
@@ -104,36 +138,22 @@ async def get_organization(
             detail="Организацијата не е пронајдена.",
         )
 
-    # Get user's membership info
-    orgs = await organization_service.get_user_organizations(session, ctx.user_id)
-    org_with_role = next((o for o in orgs if o.id == organization_id), None)
-
-    if not org_with_role:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Организацијата не е пронајдена.",
-        )
-
-    return org_with_role
+    org_with_role = OrganizationWithRole(
+        **OrganizationResponse.model_validate(organization).model_dump(),
+        role=membership.role,
+        joined_at=membership.joined_at,
+    )
+    return ORJSONResponse(org_with_role, headers=etag_headers(etag))
 
 
 @router.put("/{organization_id}", response_model=OrganizationResponse)
 async def update_organization(
     organization_id: int,
     data: OrganizationUpdate,
-    ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
+    _: Row = Depends(require(OrgPermission.UPDATE_ORGANIZATION)),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ) -> OrganizationResponse:
     """Update organization details. Only owners and admins can update."""
-    role = await organization_service.get_user_role_in_organization(
-        session, ctx.user_id, organization_id
-    )
-    if role not in [OrganizationRole.OWNER, OrganizationRole.ADMIN]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Немате дозвола да ја измените оваа организација.",
-        )
-
     organization = await organization_service.update_organization(
         session, organization_id, data
     )
@@ -149,24 +169,32 @@ async def update_organization(
 @router.get("/{organization_id}/members", response_model=TeamMembersResponse)
 async def get_members(
     organization_id: int,
-    ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> TeamMembersResponse:
+    request: Request,
+    membership: Row = Depends(
+        require(OrgPermission.VIEW_MEMBERS, include_member_profiles=True)
+    ),
+    session: AsyncSession = Depends(get_session, scope="function"),
+):
     """Get all members of an organization. User must be a member."""
-    # Check if user is a member
-    role = await organization_service.get_user_role_in_organization(
-        session, ctx.user_id, organization_id
+    etag = make_etag(
+        "members",
+        organization_id,
+        membership.members_version,
+        membership.members_updated_at,
     )
-    if not role:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Немате пристап до оваа организација.",
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+
+    async def render() -> bytes:
+        members = await organization_service.get_organization_members(
+            session, organization_id
         )
+        return render_json(TeamMembersResponse(members=members, total=len(members)))
 
-    members = await organization_service.get_organization_members(
-        session, organization_id
-    )
-    return TeamMembersResponse(members=members, total=len(members))
+    # The body depends only on the organization and the version in the ETag;
+    # every caller has passed the permission check above
+    body = await coalesce(request, render, scope=etag)
+    return Response(body, media_type="application/json", headers=etag_headers(etag))
 
 
 @router.delete(
@@ -177,11 +205,12 @@ async def remove_member(
     organization_id: int,
     member_id: int,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
+    membership: Row = Depends(require(OrgPermission.MANAGE_MEMBERS)),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ):
     """Remove a member from an organization. Only owner/admin can remove members."""
     success, message = await organization_service.remove_member(
-        session, organization_id, member_id, ctx.user_id
+        session, organization_id, member_id, ctx.user_id, membership.role
     )
     if not success:
         raise HTTPException(
@@ -199,8 +228,9 @@ async def change_member_role(
     member_id: int,
     data: ChangeMemberRoleRequest,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> TeamMember:
+    membership: Row = Depends(require(OrgPermission.MANAGE_MEMBERS)),
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """
     Change a member's role in an organization.
 
@@ -210,7 +240,7 @@ async def change_member_role(
     - Admin cannot promote someone to admin or owner
     """
     success, message = await organization_service.change_member_role(
-        session, organization_id, member_id, data.role, ctx.user_id
+        session, organization_id, member_id, data.role, ctx.user_id, membership.role
     )
     if not success:
         raise HTTPException(
@@ -230,7 +260,7 @@ async def change_member_role(
             detail="Членот не е пронајден.",
         )
 
-    return updated_member
+    return ORJSONResponse(updated_member)
 
 
 # Invitation endpoints
@@ -239,22 +269,11 @@ async def create_invitation(
     organization_id: int,
     data: InvitationCreate,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> InvitationWithLink:
+    _: Row = Depends(require(OrgPermission.CREATE_INVITATIONS)),
+    _limit: None = Depends(INVITATIONS_RATE_LIMIT),
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Create an invitation link. Only owners, admins, and accountants can create invitations."""
-    role = await organization_service.get_user_role_in_organization(
-        session, ctx.user_id, organization_id
-    )
-    if role not in [
-        OrganizationRole.OWNER,
-        OrganizationRole.ADMIN,
-        OrganizationRole.ACCOUNTANT,
-    ]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Немате дозвола да креирате покани за оваа организација.",
-        )
-
     invitation = await organization_service.create_invitation_with_notification(
         session, organization_id, ctx.user_id, data
     )
@@ -264,29 +283,77 @@ async def create_invitation(
         + (f", email sent to {data.target_email}" if data.target_email else "")
     )
 
-    return invitation
+    return ORJSONResponse(invitation)
 
 
-@router.get("/{organization_id}/invitations", response_model=List[InvitationResponse])
-async def get_invitations(
+@router.post(
+    "/{organization_id}/invitations/bulk", response_model=BulkInvitationResponse
+)
+async def create_invitations_bulk(
     organization_id: int,
+    data: BulkInvitationCreate,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> List[InvitationResponse]:
-    """Get all invitations for an organization."""
-    role = await organization_service.get_user_role_in_organization(
-        session, ctx.user_id, organization_id
+    _: Row = Depends(require(OrgPermission.CREATE_INVITATIONS)),
+    _limit: None = Depends(INVITATIONS_RATE_LIMIT),
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
+    """
+    Invite many people at once; each address gets its own single-use code.
+    The emails go out from a background task, over one SMTP connection.
+    """
+    invitations, notifications = await organization_service.create_invitations_bulk(
+        session, organization_id, ctx.user_id, data.invitations
     )
-    if role not in [OrganizationRole.OWNER, OrganizationRole.ADMIN]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Немате дозвола да ги видите поканите.",
+    organization = await organization_service.get_organization_by_id(
+        session, organization_id
+    )
+    inviter = await UserService(session).get_by_id(ctx.user_id)
+    defer(
+        session,
+        send_organization_invitation_emails,
+        organization.company_name,
+        inviter.full_name if inviter else None,
+        notifications,
+        get_settings().frontend_url,
+    )
+
+    logger.info(
+        f"{len(invitations)} invitations created for org {organization_id} "
+        f"by user {ctx.user_id}"
+    )
+    return ORJSONResponse(
+        BulkInvitationResponse(
+            invitations=[
+                InvitationWithLink(
+                    **InvitationResponse.model_validate(invitation).model_dump(),
+                    link=f"/organization?join={invitation.code}",
+                )
+                for invitation in invitations
+            ],
+            total=len(invitations),
         )
+    )
+
+
+@router.get("/{organization_id}/invitations", response_model=List[InvitationResponse])
+async def get_invitations(
+    organization_id: int,
+    request: Request,
+    membership: Row = Depends(require(OrgPermission.VIEW_INVITATIONS)),
+    session: AsyncSession = Depends(get_session, scope="function"),
+):
+    """Get all invitations for an organization."""
+    etag = make_etag("invitations", organization_id, membership.invitations_version)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
 
     invitations = await organization_service.get_organization_invitations(
         session, organization_id
     )
-    return invitations
+    return ORJSONResponse(
+        [InvitationResponse.model_validate(invitation) for invitation in invitations],
+        headers=etag_headers(etag),
+    )
 
 
 @router.delete(
@@ -297,11 +364,12 @@ async def deactivate_invitation(
     organization_id: int,
     invitation_id: int,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
+    membership: Row = Depends(require(OrgPermission.VIEW_ORGANIZATION)),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ):
-    """Deactivate an invitation."""
+    """Deactivate an invitation. Its creator or an owner/admin may do so."""
     success = await organization_service.deactivate_invitation(
-        session, invitation_id, ctx.user_id
+        session, organization_id, invitation_id, ctx.user_id, membership.role
     )
     if not success:
         raise HTTPException(
@@ -311,12 +379,16 @@ async def deactivate_invitation(
 
 
 # Join via invitation code
-@router.post("/join", response_model=JoinOrganizationResponse)
+@router.post(
+    "/join",
+    response_model=JoinOrganizationResponse,
+    dependencies=[Depends(rate_limit("org.join", "10/minute", key=RateLimitKey.USER))],
+)
 async def join_organization(
     data: JoinOrganizationRequest,
     ctx: UserContext = Depends(get_user_context),
-    session: AsyncSession = Depends(get_session),
-) -> JoinOrganizationResponse:
+    session: AsyncSession = Depends(get_session, scope="function"),
+) -> ORJSONResponse:
     """Join an organization using an invitation code."""
     (
         success,
@@ -332,19 +404,25 @@ async def join_organization(
 
     logger.info(f"User {ctx.user_id} joined organization {organization.id}")
 
-    return JoinOrganizationResponse(
-        message=message,
-        organization=OrganizationResponse.model_validate(organization),
-        role=role,
+    return ORJSONResponse(
+        JoinOrganizationResponse(
+            message=message,
+            organization=OrganizationResponse.model_validate(organization),
+            role=role,
+        )
     )
 
 
 # Validate invitation code (without joining - for preview)
-@router.get("/join/validate", response_model=dict)
+@router.get(
+    "/join/validate",
+    response_model=dict,
+    dependencies=[Depends(rate_limit("org.join-validate", "30/minute"))],
+)
 async def validate_invitation_code(
     code: str,
     ctx: UserContext | None = Depends(get_optional_user_context),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_session, scope="function"),
 ) -> dict:
     """Validate an invitation code and return organization info."""
     is_valid, message, invitation = await organization_service.validate_invitation(
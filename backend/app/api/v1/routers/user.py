@@ -1,5 +1,6 @@
 import logging
 
+from app.core.responses import ORJSONResponse
 from app.db.session import get_session
 from app.schemas.user import UserCreate, UserRead
 from app.services.user import UserService
@@ -13,8 +14,8 @@ router = APIRouter()
 
 @router.post("/", response_model=UserRead, status_code=status.HTTP_201_CREATED)
 async def create_user(
-    payload: UserCreate, session: AsyncSession = Depends(get_session)
-) -> UserRead:
+    payload: UserCreate, session: AsyncSession = Depends(get_session, scope="function")
+) -> ORJSONResponse:
     service = UserService(session)
     logger.info("Creating user %s", payload.email)
     existing = await service.get_by_email(EmailStr(payload.email))
@@ -23,11 +24,13 @@ async def create_user(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
     user = await service.create_user(payload)
-    return user
+    return ORJSONResponse(user, status_code=status.HTTP_201_CREATED)
 
 
 @router.get("/", response_model=list[UserRead])
-async def list_users(session: AsyncSession = Depends(get_session)) -> list[UserRead]:
+async def list_users(
+    session: AsyncSession = Depends(get_session, scope="function")
+) -> ORJSONResponse:
     service = UserService(session)
     logger.debug("Listing users")
-    return await service.list_users()
+    return ORJSONResponse(await service.list_users())
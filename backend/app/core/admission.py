@@ -0,0 +1,239 @@
+"""
+Adaptive admission control.
+
+When Postgres slows down, requests keep arriving but finish later, so the
+number in flight grows until the worker runs out of memory. Each worker
+therefore admits at most ``limit`` concurrent requests and adapts that limit
+to observed latency (AIMD):
+
+- A request that finishes within ``target_latency`` raises the limit by
+  ``1 / limit``, i.e. by about one per limit's worth of fast requests.
+- A slow request or a server error multiplies the limit by
+  ``backoff_ratio``. This happens at most once per ``target_latency``, so a
+  burst of slow completions from one overload counts once.
+
+Requests over the limit wait in a bounded queue, highest priority first.
+A request is shed with 503 and ``Retry-After`` when:
+
+- the queue is full and it does not outrank anyone already waiting, or
+- it has waited longer than ``queue_timeout``.
+
+A full queue sheds its lowest-priority waiter to make room for a more
+important request.
+
+Priorities keep cheap, important routes working during overload. Low
+priority requests (bulk operations, batches, admin reports) may only fill
+part of the limit; the rest is headroom for normal and high priority ones.
+Health checks and metrics scrapes bypass admission entirely, so an
+overloaded worker is not also restarted by its liveness probe.
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Optional
+
+from app.core.config import get_settings
+from app.core.metrics import ADMISSION_DECISIONS, ADMISSION_INFLIGHT, ADMISSION_LIMIT
+
+
+class Priority(IntEnum):
+    LOW = 0
+    NORMAL = 1
+    HIGH = 2
+
+
+# Share of the limit each priority may fill
+PRIORITY_SHARE = {Priority.LOW: 0.5, Priority.NORMAL: 0.9, Priority.HIGH: 1.0}
+
+# Paths relative to API_V1_PREFIX; the first match wins
+EXEMPT_PATHS = re.compile(r"^/(health|metrics)(/|$)")
+PRIORITY_RULES = (
+    (re.compile(r"^/auth/(refresh|logout)$"), Priority.HIGH),
+    (re.compile(r"/bulk$|/export|^/batch$|^/admin/"), Priority.LOW),
+)
+
+MAX_RETRY_AFTER_SECONDS = 30
+
+
+def classify(path: str) -> Optional[Priority]:
+    """Priority of a request to ``path``; None when it bypasses admission."""
+    prefix = get_settings().api_v1_prefix
+    if prefix and path.startswith(prefix):
+        path = path[len(prefix) :]
+    if EXEMPT_PATHS.match(path):
+        return None
+    for pattern, priority in PRIORITY_RULES:
+        if pattern.search(path):
+            return priority
+    return Priority.NORMAL
+
+
+class Shed(Exception):
+    """The request was not admitted and should be answered with 503."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__(f"Shed, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class _Waiter:
+    sort_key: tuple[int, int]
+    priority: Priority = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        initial_limit: float = 50,
+        min_limit: float = 5,
+        max_limit: float = 500,
+        max_queue: int = 100,
+        queue_timeout: float = 1.0,
+        target_latency: float = 1.0,
+        backoff_ratio: float = 0.9,
+    ) -> None:
+        self.enabled = enabled
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.target_latency = target_latency
+        self.backoff_ratio = backoff_ratio
+        self.inflight = 0
+        self._queue: list[_Waiter] = []
+        self._order = itertools.count()
+        self._last_decrease = 0.0
+        # Smoothed latency of admitted requests, for Retry-After estimates
+        self._latency = target_latency
+        ADMISSION_LIMIT.set(self.limit)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def _fits(self, priority: Priority) -> bool:
+        share = max(1, math.floor(self.limit * PRIORITY_SHARE[priority]))
+        return self.inflight < share
+
+    def retry_after(self) -> int:
+        """Seconds until the queue ahead would likely have drained."""
+        drain = self._latency * (self.queued + 1) / max(self.limit, 1.0)
+        return min(MAX_RETRY_AFTER_SECONDS, max(1, math.ceil(drain)))
+
+    async def acquire(self, priority: Priority) -> None:
+        """Wait for a slot; raises ``Shed`` when the request should be dropped."""
+        if self._fits(priority) and not any(
+            waiter.priority >= priority for waiter in self._queue
+        ):
+            self._admit(priority, "admitted")
+            return
+        if len(self._queue) >= self.max_queue:
+            lowest = max(self._queue) if self._queue else None
+            if lowest is None or lowest.priority >= priority:
+                ADMISSION_DECISIONS.labels(priority.name.lower(), "rejected").inc()
+                raise Shed(self.retry_after())
+            # Make room by shedding the least important, most recent waiter
+            self._queue.remove(lowest)
+            heapq.heapify(self._queue)
+            lowest.future.set_exception(Shed(self.retry_after()))
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = _Waiter((-priority, next(self._order)), priority, future)
+        heapq.heappush(self._queue, waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled() and not future.exception():
+                # Granted just as the wait timed out; keep the slot
+                return
+            self._drop(waiter)
+            ADMISSION_DECISIONS.labels(priority.name.lower(), "timed_out").inc()
+            raise Shed(self.retry_after()) from None
+        except Shed:
+            ADMISSION_DECISIONS.labels(priority.name.lower(), "evicted").inc()
+            raise
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and not future.exception():
+                self.release(None, ok=True)
+            else:
+                self._drop(waiter)
+            raise
+
+    def _drop(self, waiter: _Waiter) -> None:
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+        if not waiter.future.done():
+            waiter.future.cancel()
+
+    def _admit(self, priority: Priority, outcome: str) -> None:
+        self.inflight += 1
+        ADMISSION_INFLIGHT.set(self.inflight)
+        ADMISSION_DECISIONS.labels(priority.name.lower(), outcome).inc()
+
+    def release(self, latency: Optional[float], *, ok: bool) -> None:
+        """
+        Free the request's slot and adapt the limit to how it went. Pass no
+        latency for requests whose duration says nothing about load.
+        """
+        self.inflight -= 1
+        ADMISSION_INFLIGHT.set(self.inflight)
+        if not ok:
+            self._decrease()
+        elif latency is not None:
+            self._latency += 0.1 * (latency - self._latency)
+            if latency <= self.target_latency:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                ADMISSION_LIMIT.set(self.limit)
+            else:
+                self._decrease()
+        while self._queue and self._fits(self._queue[0].priority):
+            waiter = heapq.heappop(self._queue)
+            if waiter.future.done():
+                continue
+            self._admit(waiter.priority, "queued")
+            waiter.future.set_result(None)
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.target_latency:
+            return
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.backoff_ratio)
+        ADMISSION_LIMIT.set(self.limit)
+
+
+def _build_controller() -> AdmissionController:
+    settings = get_settings()
+    return AdmissionController(
+        enabled=settings.admission_enabled,
+        initial_limit=settings.admission_initial_limit,
+        min_limit=settings.admission_min_limit,
+        max_limit=settings.admission_max_limit,
+        max_queue=settings.admission_max_queue,
+        queue_timeout=settings.admission_queue_timeout_ms / 1000,
+        target_latency=settings.admission_target_latency_ms / 1000,
+    )
+
+
+controller = AdmissionController()
+
+
+def configure_admission(
+    instance: Optional[AdmissionController] = None,
+) -> AdmissionController:
+    """Install ``instance`` (or one built from settings) as the global controller."""
+    global controller
+    controller = instance or _build_controller()
+    return controller
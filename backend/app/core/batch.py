@@ -0,0 +1,153 @@
+"""
+In-process dispatch of batched read requests.
+
+``POST /batch`` lets the frontend send the reads of a page load in one
+round trip. Each sub-request is routed through the API router in this
+process, exactly as if it had arrived on its own. It passes the same
+dependencies, permission checks, rate limits and ETag handling, but skips
+the HTTP and middleware overhead. The parent's already decoded
+``UserContext`` is handed to the sub-requests, so the JWT is verified
+once per batch.
+
+Only GET sub-requests are accepted: reads can run concurrently and in any
+order, while batched writes would need ordering and a shared transaction
+that the per-request unit of work does not offer. Each sub-request gets its
+own database session (an ``AsyncSession`` cannot serve concurrent
+statements). At most ``BATCH_CONCURRENCY`` run at once, to keep a single
+batch from taking over the connection pool.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+import orjson
+from app.core.config import get_settings
+from app.core.security import USER_CONTEXTS_STATE
+from app.schemas.auth import UserContext
+from app.schemas.batch import BatchItem, BatchItemResponse
+from fastapi import Request
+from fastapi.middleware.asyncexitstack import AsyncExitStackMiddleware
+from starlette.exceptions import HTTPException
+from starlette.types import Message
+
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = 4
+FORWARDED_HEADERS = frozenset({"if-none-match", "accept-language"})
+RETURNED_HEADERS = frozenset({"etag", "cache-control", "retry-after", "location"})
+
+# Copied from the parent scope so routing and exception handlers work as usual
+_INHERITED_SCOPE_KEYS = (
+    "asgi",
+    "http_version",
+    "scheme",
+    "server",
+    "client",
+    "root_path",
+    "app",
+    "starlette.exception_handlers",
+)
+
+
+def _sub_scope(
+    request: Request, item: BatchItem, token: str, context: UserContext
+) -> dict[str, Any]:
+    path, _, query = item.path.partition("?")
+    path = get_settings().api_v1_prefix + path
+    headers = [(b"authorization", f"Bearer {token}".encode())]
+    headers.extend(
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in item.headers.items()
+        if name.lower() in FORWARDED_HEADERS
+    )
+    scope = {
+        key: request.scope[key] for key in _INHERITED_SCOPE_KEYS if key in request.scope
+    }
+    scope.update(
+        type="http",
+        method=item.method,
+        path=path,
+        raw_path=path.encode(),
+        query_string=query.encode(),
+        headers=headers,
+        state={USER_CONTEXTS_STATE: {token: context}},
+    )
+    return scope
+
+
+def _decode_body(body: bytes, content_type: str) -> Any:
+    if not body:
+        return None
+    if content_type.startswith("application/json"):
+        return orjson.loads(body)
+    return body.decode("utf-8", errors="replace")
+
+
+async def dispatch(
+    request: Request, item: BatchItem, token: str, context: UserContext
+) -> BatchItemResponse:
+    status = 500
+    headers: dict[str, str] = {}
+    content_type = ""
+    chunks: list[bytes] = []
+    received = False
+
+    async def receive() -> Message:
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Message) -> None:
+        nonlocal status, content_type
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for raw_name, raw_value in message.get("headers", []):
+                name = raw_name.decode("latin-1").lower()
+                if name == "content-type":
+                    content_type = raw_value.decode("latin-1")
+                elif name in RETURNED_HEADERS:
+                    headers[name] = raw_value.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        # Below the middleware stack, so provide the exit stack FastAPI expects
+        await AsyncExitStackMiddleware(request.app.router)(
+            _sub_scope(request, item, token, context), receive, send
+        )
+    except HTTPException as exc:
+        # Raised outside a route, e.g. the router's 404 for an unknown path
+        return BatchItemResponse(
+            id=item.id,
+            status=exc.status_code,
+            headers=dict(exc.headers or {}),
+            body={"detail": exc.detail},
+        )
+    except Exception:
+        logger.exception("Batch sub-request %s %s failed", item.method, item.path)
+        return BatchItemResponse(
+            id=item.id, status=500, headers={}, body={"detail": "Internal Server Error"}
+        )
+
+    return BatchItemResponse(
+        id=item.id,
+        status=status,
+        headers=headers,
+        body=_decode_body(b"".join(chunks), content_type),
+    )
+
+
+async def run_batch(
+    request: Request, items: list[BatchItem], token: str, context: UserContext
+) -> list[BatchItemResponse]:
+    """Dispatch ``items`` concurrently; responses keep the request order."""
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(item: BatchItem) -> BatchItemResponse:
+        async with semaphore:
+            return await dispatch(request, item, token, context)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
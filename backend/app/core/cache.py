@@ -0,0 +1,386 @@
+"""
+Two-tier read-through cache for service read methods.
+
+Tier one is a small in-process LRU with a short TTL. Tier two is a shared
+backend: Redis in production, or ``MemoryBackend`` for tests and single-process
+development. Values are serialized with a pydantic ``TypeAdapter`` of the
+decorated method's return annotation, so only plain schema objects (never ORM
+instances) can be cached.
+
+Invalidation is tag based. Every tag (``user:42``, ``org:7``) has a version
+counter in the backend. Entries remember the versions they were computed
+under, and a read compares them with the current versions in the same
+round trip as the entry itself. Invalidating a tag increments its counter.
+Write methods call ``invalidate_tags(session, ...)``: the tags are bumped at
+once and again after the request's commit or rollback (see ``get_session``),
+which closes the window where a concurrent reader caches pre-commit data.
+
+A recomputed value is only written when none of its tags moved while it was
+being computed; otherwise it may reflect data from before the invalidation
+and still be recorded under the new version. Versions of the key's tags (and
+of the result tags the previous entry recorded) are snapshotted before
+``compute()``. A missing tag counter is version 0. A result tag seen for
+the first time has no snapshot, but one still at 0 was never invalidated,
+so it cannot have moved. Any other unseen tag is recorded as unverified:
+the entry never reads as fresh, but tells the next fill which tags to
+snapshot, so the value is cached on the second compute.
+
+The in-process tier is not told about invalidations made by other workers;
+its TTL bounds that staleness. Methods whose results are paired with
+database-derived ETags set ``local_ttl=0`` to skip it.
+
+Stampedes are damped with probabilistic early expiration (XFetch): the closer
+an entry is to expiry, and the longer it took to compute, the more likely a
+reader recomputes it before it expires, so expiry rarely hits many readers
+at once.
+
+Backend errors never fail a request: the cache logs them and computes the
+value directly.
+"""
+
+import functools
+import logging
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterable,
+    Optional,
+    TypeVar,
+    get_type_hints,
+)
+
+import orjson
+from app.core.config import get_settings
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "cache:"
+TAG_PREFIX = "cache:tag:"
+# Tag counters must outlive every entry that recorded them
+TAG_TTL_SECONDS = 7 * 24 * 3600
+XFETCH_BETA = 1.0
+# Recorded for result tags whose version could not be checked; never current
+UNVERIFIED = -1
+
+_SESSION_TAGS_KEY = "cache_tags"
+
+T = TypeVar("T")
+
+
+class CacheBackend(ABC):
+    """Shared key-value store; values and tag counters are bytes."""
+
+    @abstractmethod
+    async def get_many(self, keys: list[str]) -> list[Optional[bytes]]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def incr_many(self, keys: list[str], ttl: float) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Process-local backend for tests and single-process development."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[bytes, float]] = {}
+
+    def _get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        return [self._get(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (value, time.monotonic() + ttl)
+
+    async def incr_many(self, keys: list[str], ttl: float) -> None:
+        for key in keys:
+            current = int(self._get(key) or 0)
+            self._data[key] = (str(current + 1).encode(), time.monotonic() + ttl)
+
+
+class RedisBackend(CacheBackend):
+    def __init__(self, url: str) -> None:
+        from redis.asyncio import Redis
+
+        self._client = Redis.from_url(url)
+
+    async def get_many(self, keys: list[str]) -> list[Optional[bytes]]:
+        return await self._client.mget(keys)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=max(1, int(ttl * 1000)))
+
+    async def incr_many(self, keys: list[str], ttl: float) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.incr(key)
+                pipe.expire(key, int(ttl))
+            await pipe.execute()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class LocalCache:
+    """Bounded LRU of decoded values with per-entry expiry and a tag index."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[Any, float, frozenset[str]]] = (
+            OrderedDict()
+        )
+        self._keys_by_tag: dict[str, set[str]] = {}
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        item = self._entries.get(key)
+        if item is None:
+            return False, None
+        value, expires_at, _tags = item
+        if expires_at <= time.monotonic():
+            self._discard(key)
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, ttl: float, tags: Iterable[str]) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        self._discard(key)
+        tags = frozenset(tags)
+        self._entries[key] = (value, time.monotonic() + ttl, tags)
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            for key in self._keys_by_tag.pop(tag, ()):
+                self._discard(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_tag.clear()
+
+    def _discard(self, key: str) -> None:
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+
+def _versions(raw: Iterable[Optional[bytes]]) -> list[int]:
+    return [int(value) if value is not None else 0 for value in raw]
+
+
+class Cache:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        *,
+        default_ttl: float = 300.0,
+        local_ttl: float = 5.0,
+        local_max_entries: int = 2048,
+    ) -> None:
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.local_ttl = local_ttl
+        self.local = LocalCache(local_max_entries)
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[T]],
+        adapter: TypeAdapter,
+        *,
+        tags: list[str],
+        result_tags: Optional[Callable[[T], Iterable[str]]] = None,
+        ttl: Optional[float] = None,
+        local_ttl: Optional[float] = None,
+    ) -> T:
+        ttl = self.default_ttl if ttl is None else ttl
+        local_ttl = min(ttl, self.local_ttl if local_ttl is None else local_ttl)
+        full_key = KEY_PREFIX + key
+
+        hit, value = self.local.get(full_key)
+        if hit:
+            return value
+
+        try:
+            raw_entry, *raw_versions = await self.backend.get_many(
+                [full_key, *(TAG_PREFIX + tag for tag in tags)]
+            )
+            versions = dict(zip(tags, _versions(raw_versions)))
+            if raw_entry is not None:
+                entry = orjson.loads(raw_entry)
+                if await self._is_fresh(entry, versions):
+                    value = adapter.validate_python(entry["v"])
+                    self.local.set(full_key, value, local_ttl, entry["t"])
+                    return value
+        except Exception as exc:
+            logger.warning("Cache read failed for %s: %s", key, exc)
+            return await compute()
+
+        started = time.monotonic()
+        value = await compute()
+        delta = time.monotonic() - started
+
+        try:
+            recorded = set(tags) | set(result_tags(value) if result_tags else ())
+            checked = sorted(recorded | set(versions))
+            raw_after = await self.backend.get_many(
+                [TAG_PREFIX + tag for tag in checked]
+            )
+            after = dict(zip(checked, _versions(raw_after)))
+            if any(after[tag] != version for tag, version in versions.items()):
+                logger.debug("Tags of %s changed during compute, not caching", key)
+                return value
+            recorded_versions = {
+                tag: (after[tag] if tag in versions or after[tag] == 0 else UNVERIFIED)
+                for tag in sorted(recorded)
+            }
+            entry = {
+                "v": adapter.dump_python(value, mode="json"),
+                "t": recorded_versions,
+                "x": time.time() + ttl,
+                "d": delta,
+            }
+            await self.backend.set(full_key, orjson.dumps(entry), ttl)
+            if UNVERIFIED not in recorded_versions.values():
+                self.local.set(full_key, value, local_ttl, recorded_versions)
+        except Exception as exc:
+            logger.warning("Cache write failed for %s: %s", key, exc)
+        return value
+
+    async def _is_fresh(self, entry: dict[str, Any], versions: dict[str, int]) -> bool:
+        """Whether ``entry`` is current; adds its recorded tags to ``versions``."""
+        recorded: dict[str, int] = entry["t"]
+        missing = [tag for tag in recorded if tag not in versions]
+        if missing:
+            raw = await self.backend.get_many([TAG_PREFIX + tag for tag in missing])
+            versions.update(zip(missing, _versions(raw)))
+        if any(versions.get(tag, 0) != version for tag, version in recorded.items()):
+            return False
+        # XFetch: recompute early with a probability that grows near expiry
+        early = -entry["d"] * XFETCH_BETA * math.log(1.0 - random.random())
+        return time.time() + early < entry["x"]
+
+    async def invalidate(self, *tags: str) -> None:
+        if not tags:
+            return
+        self.local.invalidate(tags)
+        try:
+            await self.backend.incr_many(
+                [TAG_PREFIX + tag for tag in tags], TAG_TTL_SECONDS
+            )
+        except Exception as exc:
+            logger.warning("Cache invalidation failed for %s: %s", tags, exc)
+
+    async def close(self) -> None:
+        self.local.clear()
+        await self.backend.close()
+
+
+def _build_cache() -> Cache:
+    settings = get_settings()
+    backend: CacheBackend = (
+        RedisBackend(settings.redis_url)
+        if settings.cache_backend == "redis"
+        else MemoryBackend()
+    )
+    return Cache(
+        backend,
+        default_ttl=settings.cache_ttl_seconds,
+        local_ttl=settings.cache_local_ttl_seconds,
+        local_max_entries=settings.cache_local_max_entries,
+    )
+
+
+cache = Cache(MemoryBackend())
+
+
+def configure_cache(instance: Optional[Cache] = None) -> Cache:
+    """Install ``instance`` (or one built from settings) as the global cache."""
+    global cache
+    cache = instance or _build_cache()
+    return cache
+
+
+async def close_cache() -> None:
+    await cache.close()
+
+
+def cached(
+    namespace: str,
+    *,
+    key: Callable[..., Any],
+    tags: Callable[..., Iterable[str]],
+    result_tags: Optional[Callable[[Any], Iterable[str]]] = None,
+    ttl: Optional[float] = None,
+    local_ttl: Optional[float] = None,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Cache an async read method. ``key`` and ``tags`` receive the method's
+    arguments; ``result_tags`` receives its result. Returned values are shared
+    between callers and must be treated as read-only.
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        adapter: Optional[TypeAdapter] = None
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            nonlocal adapter
+            if adapter is None:
+                adapter = TypeAdapter(get_type_hints(func)["return"])
+            return await cache.get_or_compute(
+                f"{namespace}:{key(*args, **kwargs)}",
+                lambda: func(*args, **kwargs),
+                adapter,
+                tags=list(tags(*args, **kwargs)),
+                result_tags=result_tags,
+                ttl=ttl,
+                local_ttl=local_ttl,
+            )
+
+        return wrapper
+
+    return decorator
+
+
+async def invalidate_tags(session: AsyncSession, *tags: str) -> None:
+    """Invalidate ``tags`` now and again once ``session`` commits or rolls back."""
+    session.info.setdefault(_SESSION_TAGS_KEY, set()).update(tags)
+    await cache.invalidate(*tags)
+
+
+async def invalidate_pending(session: AsyncSession) -> None:
+    tags = session.info.pop(_SESSION_TAGS_KEY, None)
+    if tags:
+        await cache.invalidate(*sorted(tags))
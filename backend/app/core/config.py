@@ -29,6 +29,13 @@ def _env_optional(name: str) -> str | None:
     return value if value not in (None, "") else None
 
 
+def _env_bool(name: str, default: bool = False) -> bool:
+    value = _env_optional(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
 @dataclass(frozen=True)
 class Settings:
     app_name: str = field(default_factory=lambda: _env_required("APP_NAME"))
@@ -46,6 +53,10 @@ class Settings:
     postgres_password: str = field(
         default_factory=lambda: _env_required("POSTGRES_PASSWORD")
     )
+    # PgBouncer-style transaction pooling in front of Postgres (see engine_options)
+    database_pooler_mode: bool = field(
+        default_factory=lambda: _env_bool("DATABASE_POOLER_MODE")
+    )
     redis_url: str = field(default_factory=lambda: _env_required("REDIS_URL"))
     secret_key: str = field(default_factory=lambda: _env_required("SECRET_KEY"))
     access_token_expire_minutes: int = field(
@@ -88,6 +99,146 @@ class Settings:
         default_factory=lambda: _env_optional("FRONTEND_URL") or "http://localhost:5173"
     )
 
+    # Admin endpoints (profiler, usage reports) are disabled while unset
+    admin_api_token: str | None = field(
+        default_factory=lambda: _env_optional("ADMIN_API_TOKEN")
+    )
+
+    # Metrics (shared snapshot directory enables multiprocess aggregation)
+    metrics_multiproc_dir: str | None = field(
+        default_factory=lambda: _env_optional("METRICS_MULTIPROC_DIR")
+    )
+    metrics_flush_interval_seconds: int = field(
+        default_factory=lambda: int(
+            _env_optional("METRICS_FLUSH_INTERVAL_SECONDS") or "5"
+        )
+    )
+
+    # Event loop watchdog
+    loop_monitor_enabled: bool = field(
+        default_factory=lambda: _env_bool("LOOP_MONITOR_ENABLED", default=True)
+    )
+    loop_monitor_interval_ms: int = field(
+        default_factory=lambda: int(_env_optional("LOOP_MONITOR_INTERVAL_MS") or "100")
+    )
+    loop_block_threshold_ms: int = field(
+        default_factory=lambda: int(_env_optional("LOOP_BLOCK_THRESHOLD_MS") or "250")
+    )
+
+    # Tracing (spans are written as OTLP JSON lines to a local file)
+    tracing_enabled: bool = field(default_factory=lambda: _env_bool("TRACING_ENABLED"))
+    tracing_sample_ratio: float = field(
+        default_factory=lambda: float(_env_optional("TRACING_SAMPLE_RATIO") or "1.0")
+    )
+    tracing_exporter: str = field(
+        default_factory=lambda: _env_optional("TRACING_EXPORTER") or "file"
+    )
+    tracing_file_path: str = field(
+        default_factory=lambda: _env_optional("TRACING_FILE_PATH") or "traces.jsonl"
+    )
+
+    # Service cache ("redis" uses REDIS_URL; "memory" is per-process)
+    cache_backend: str = field(
+        default_factory=lambda: _env_optional("CACHE_BACKEND") or "redis"
+    )
+    cache_ttl_seconds: float = field(
+        default_factory=lambda: float(_env_optional("CACHE_TTL_SECONDS") or "300")
+    )
+    cache_local_ttl_seconds: float = field(
+        default_factory=lambda: float(_env_optional("CACHE_LOCAL_TTL_SECONDS") or "5")
+    )
+    cache_local_max_entries: int = field(
+        default_factory=lambda: int(_env_optional("CACHE_LOCAL_MAX_ENTRIES") or "2048")
+    )
+
+    # Rate limiting ("redis" shares buckets through REDIS_URL; "memory" is
+    # per-process). RATE_LIMITS overrides named limits: "auth.login=5/minute".
+    rate_limit_enabled: bool = field(
+        default_factory=lambda: _env_bool("RATE_LIMIT_ENABLED", default=True)
+    )
+    rate_limit_backend: str = field(
+        default_factory=lambda: _env_optional("RATE_LIMIT_BACKEND") or "redis"
+    )
+    rate_limits: str | None = field(
+        default_factory=lambda: _env_optional("RATE_LIMITS")
+    )
+    # Header set by a trusted reverse proxy (e.g. X-Real-IP); unset uses the peer
+    rate_limit_client_ip_header: str | None = field(
+        default_factory=lambda: _env_optional("RATE_LIMIT_CLIENT_IP_HEADER")
+    )
+
+    # Idempotency-Key responses ("redis" shares them through REDIS_URL)
+    idempotency_backend: str = field(
+        default_factory=lambda: _env_optional("IDEMPOTENCY_BACKEND") or "redis"
+    )
+    idempotency_ttl_seconds: int = field(
+        default_factory=lambda: int(_env_optional("IDEMPOTENCY_TTL_SECONDS") or "86400")
+    )
+    # How long a duplicate waits for the first request before answering 409
+    idempotency_wait_seconds: float = field(
+        default_factory=lambda: float(_env_optional("IDEMPOTENCY_WAIT_SECONDS") or "10")
+    )
+
+    # Background tasks (Celery). Broker and results default to REDIS_URL;
+    # eager mode runs tasks inline in the calling process (tests, local dev).
+    task_broker_url: str | None = field(
+        default_factory=lambda: _env_optional("TASK_BROKER_URL")
+    )
+    task_result_backend: str | None = field(
+        default_factory=lambda: _env_optional("TASK_RESULT_BACKEND")
+    )
+    tasks_always_eager: bool = field(
+        default_factory=lambda: _env_bool("TASKS_ALWAYS_EAGER")
+    )
+    task_result_ttl_seconds: int = field(
+        default_factory=lambda: int(_env_optional("TASK_RESULT_TTL_SECONDS") or "86400")
+    )
+
+    # Periodic jobs; one replica at a time leads ("redis" elects it through
+    # REDIS_URL, "memory" makes every process its own leader)
+    scheduler_enabled: bool = field(
+        default_factory=lambda: _env_bool("SCHEDULER_ENABLED")
+    )
+    scheduler_backend: str = field(
+        default_factory=lambda: _env_optional("SCHEDULER_BACKEND") or "redis"
+    )
+    scheduler_lease_seconds: float = field(
+        default_factory=lambda: float(_env_optional("SCHEDULER_LEASE_SECONDS") or "30")
+    )
+    unverified_user_retention_days: int = field(
+        default_factory=lambda: int(
+            _env_optional("UNVERIFIED_USER_RETENTION_DAYS") or "30"
+        )
+    )
+
+    # Admission control (per worker); the limit adapts between min and max
+    admission_enabled: bool = field(
+        default_factory=lambda: _env_bool("ADMISSION_ENABLED", default=True)
+    )
+    admission_initial_limit: int = field(
+        default_factory=lambda: int(_env_optional("ADMISSION_INITIAL_LIMIT") or "50")
+    )
+    admission_min_limit: int = field(
+        default_factory=lambda: int(_env_optional("ADMISSION_MIN_LIMIT") or "5")
+    )
+    admission_max_limit: int = field(
+        default_factory=lambda: int(_env_optional("ADMISSION_MAX_LIMIT") or "500")
+    )
+    admission_max_queue: int = field(
+        default_factory=lambda: int(_env_optional("ADMISSION_MAX_QUEUE") or "100")
+    )
+    admission_queue_timeout_ms: float = field(
+        default_factory=lambda: float(
+            _env_optional("ADMISSION_QUEUE_TIMEOUT_MS") or "1000"
+        )
+    )
+    # Requests slower than this count as a sign of overload
+    admission_target_latency_ms: float = field(
+        default_factory=lambda: float(
+            _env_optional("ADMISSION_TARGET_LATENCY_MS") or "1000"
+        )
+    )
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,183 @@
+"""
+Idempotency-Key storage.
+
+A client that may retry a mutating request sends ``Idempotency-Key: <uuid>``.
+The first request claims the key with a short-lived pending record and runs
+normally. Its response (status, headers, body) then replaces the claim and
+is kept for ``IDEMPOTENCY_TTL_SECONDS``. A retry with the same key gets that
+stored response back without running the handler again. A duplicate that
+arrives while the first is still running waits for it to finish (see
+``IdempotencyMiddleware``).
+
+Keys are scoped to the caller's credentials, so two users cannot read each
+other's responses by guessing a key. A record also stores a fingerprint of
+the method, path, query string and body; reusing a key for a different
+request is an error rather than a silent replay.
+
+Records live in Redis (``IDEMPOTENCY_BACKEND=redis``) so retries that land
+on another worker are recognized, or in process memory for tests. Store
+errors fail open: the request runs without idempotency protection.
+"""
+
+import base64
+import hashlib
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+
+import orjson
+from app.core.config import get_settings
+
+KEY_PREFIX = "idempotency:"
+# Claims outlive any reasonable request, but free up after a crashed worker
+PENDING_TTL_SECONDS = 60
+MAX_KEY_LENGTH = 255
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+@dataclass(frozen=True)
+class IdempotencyRecord:
+    fingerprint: str
+    response: Optional[StoredResponse] = None
+
+    @property
+    def pending(self) -> bool:
+        return self.response is None
+
+    def dumps(self) -> bytes:
+        data: dict = {"fp": self.fingerprint}
+        if self.response is not None:
+            data["status"] = self.response.status
+            data["headers"] = [
+                [name.decode("latin-1"), value.decode("latin-1")]
+                for name, value in self.response.headers
+            ]
+            data["body"] = base64.b64encode(self.response.body).decode()
+        return orjson.dumps(data)
+
+    @classmethod
+    def loads(cls, raw: bytes) -> "IdempotencyRecord":
+        data = orjson.loads(raw)
+        if "status" not in data:
+            return cls(data["fp"])
+        return cls(
+            data["fp"],
+            StoredResponse(
+                data["status"],
+                [
+                    (name.encode("latin-1"), value.encode("latin-1"))
+                    for name, value in data["headers"]
+                ],
+                base64.b64decode(data["body"]),
+            ),
+        )
+
+
+class IdempotencyStore(ABC):
+    @abstractmethod
+    async def claim(self, key: str, value: bytes, ttl: float) -> bool:
+        """Store ``value`` unless ``key`` exists; True if it was stored."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryStore(IdempotencyStore):
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[bytes, float]] = {}
+
+    async def claim(self, key: str, value: bytes, ttl: float) -> bool:
+        if await self.get(key) is not None:
+            return False
+        await self.set(key, value, ttl)
+        return True
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return item[0]
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._data[key] = (value, time.monotonic() + ttl)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(key, None)
+
+
+class RedisStore(IdempotencyStore):
+    def __init__(self, url: str) -> None:
+        from redis.asyncio import Redis
+
+        self._client = Redis.from_url(url)
+
+    async def claim(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(await self._client.set(key, value, px=int(ttl * 1000), nx=True))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def storage_key(idempotency_key: str, authorization: Optional[bytes]) -> str:
+    """Scope ``idempotency_key`` to the credentials that sent it."""
+    scope = hashlib.sha256(authorization or b"").hexdigest()[:32]
+    return f"{KEY_PREFIX}{scope}:{idempotency_key}"
+
+
+def fingerprint(method: str, path: str, query: bytes, body: bytes) -> str:
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), query, body):
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _build_store() -> IdempotencyStore:
+    settings = get_settings()
+    if settings.idempotency_backend == "redis":
+        return RedisStore(settings.redis_url)
+    return MemoryStore()
+
+
+store: IdempotencyStore = MemoryStore()
+
+
+def configure_idempotency(
+    instance: Optional[IdempotencyStore] = None,
+) -> IdempotencyStore:
+    """Install ``instance`` (or one built from settings) as the global store."""
+    global store
+    store = instance or _build_store()
+    return store
+
+
+async def close_idempotency() -> None:
+    await store.close()
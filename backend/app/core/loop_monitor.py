@@ -0,0 +1,145 @@
+"""
+Event loop lag monitor and blocking-call detector.
+
+A probe task sleeps for ``interval`` and records how late it woke up as
+``event_loop_lag_seconds``. Each wake-up also refreshes a heartbeat. A
+watchdog thread checks that heartbeat. When the loop has not come back for
+longer than the block threshold, the watchdog snapshots the loop thread's
+stack while it is still blocked. It then logs the stack and counts the stall
+by call site, which points straight at calls like ``smtplib`` or Argon2 that
+should run in a worker thread.
+"""
+
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from app.core.config import get_settings
+from app.core.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+APP_DIR = Path(__file__).resolve().parents[1]
+
+
+@dataclass(frozen=True)
+class BlockedLoop:
+    blocked_for: float
+    site: str
+    stack: str
+
+
+def _call_site(frames: traceback.StackSummary) -> str:
+    """Innermost frame inside the application, else the innermost frame."""
+    for frame in reversed(frames):
+        path = Path(frame.filename)
+        if path.is_relative_to(APP_DIR):
+            module = path.relative_to(APP_DIR.parent).with_suffix("")
+            return f"{'.'.join(module.parts)}:{frame.name}"
+    if not frames:
+        return "unknown"
+    innermost = frames[-1]
+    return f"{Path(innermost.filename).stem}:{innermost.name}"
+
+
+class LoopMonitor:
+    def __init__(
+        self, interval: float = 0.1, threshold: float = 0.25, max_reports: int = 50
+    ) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self.reports: deque[BlockedLoop] = deque(maxlen=max_reports)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start monitoring the running loop; call from inside that loop."""
+        loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = loop.create_task(self._probe(), name="loop-lag-probe")
+        self._watchdog = threading.Thread(
+            target=self._watch, name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _probe(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            EVENT_LOOP_LAG.observe(max(0.0, now - started - self.interval))
+
+    def _watch(self) -> None:
+        reported_heartbeat = None
+        check_every = min(self.interval, self.threshold) / 2
+        while not self._stopped.wait(check_every):
+            heartbeat = self._heartbeat
+            # The probe legitimately sleeps for ``interval`` between heartbeats
+            blocked_for = time.monotonic() - heartbeat - self.interval
+            if blocked_for < self.threshold or heartbeat == reported_heartbeat:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            reported_heartbeat = heartbeat
+            self._report(blocked_for, traceback.extract_stack(frame))
+
+    def _report(self, blocked_for: float, frames: traceback.StackSummary) -> None:
+        site = _call_site(frames)
+        stack = "".join(frames.format())
+        self.reports.append(BlockedLoop(blocked_for, site, stack))
+        EVENT_LOOP_BLOCKS.labels(site).inc()
+        logger.warning(
+            "Event loop blocked for at least %.0f ms in %s\n%s",
+            blocked_for * 1000,
+            site,
+            stack,
+        )
+
+
+loop_monitor: Optional[LoopMonitor] = None
+
+
+def start_loop_monitor() -> None:
+    global loop_monitor
+    settings = get_settings()
+    if not settings.loop_monitor_enabled or loop_monitor is not None:
+        return
+    loop_monitor = LoopMonitor(
+        interval=settings.loop_monitor_interval_ms / 1000,
+        threshold=settings.loop_block_threshold_ms / 1000,
+    )
+    loop_monitor.start()
+
+
+async def stop_loop_monitor() -> None:
+    global loop_monitor
+    if loop_monitor is None:
+        return
+    await loop_monitor.stop()
+    loop_monitor = None
@@ -0,0 +1,538 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are plain Python objects guarded by a lock,
+so recording a sample costs a dict lookup and an addition. In multiprocess
+mode (``METRICS_MULTIPROC_DIR`` set) every worker periodically writes a JSON
+snapshot of its registry to that directory and ``/metrics`` merges all
+snapshots: counters and histograms are summed, gauges are combined according
+to their ``multiprocess_mode``. The directory must be emptied when the
+deployment starts, as with ``prometheus_client``.
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from app.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+GAUGE_MODES = ("sum", "max", "min", "all")
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["MetricsRegistry"] = None,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: dict[tuple[str, ...], Any] = {}
+        (registry or REGISTRY).register(self)
+
+    def labels(self, *values: Any) -> Any:
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(
+                    f"{self.name} expects labels {self.labelnames}, got {key}"
+                )
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        with self._lock:
+            self._children.clear()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            samples = [
+                [list(key), child.snapshot()] for key, child in self._children.items()
+            ]
+        return {
+            "type": self.kind,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self, lock: threading.Lock) -> None:
+        self._lock = lock
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        with self._lock:
+            self.value += amount
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild(self._lock)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self, lock: threading.Lock) -> None:
+        self._lock = lock
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def snapshot(self) -> float:
+        return self.value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["MetricsRegistry"] = None,
+        multiprocess_mode: str = "sum",
+    ) -> None:
+        if multiprocess_mode not in GAUGE_MODES:
+            raise ValueError(f"Unknown multiprocess_mode {multiprocess_mode!r}")
+        self.multiprocess_mode = multiprocess_mode
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild(self._lock)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def snapshot(self) -> dict[str, Any]:
+        data = super().snapshot()
+        data["mode"] = self.multiprocess_mode
+        return data
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_bounds", "counts", "sum")
+
+    def __init__(self, lock: threading.Lock, bounds: tuple[float, ...]) -> None:
+        self._lock = lock
+        self._bounds = bounds
+        # One slot per finite bucket plus the +Inf bucket, non-cumulative
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"counts": list(self.counts), "sum": self.sum}
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["MetricsRegistry"] = None,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self._lock, self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self) -> Any:
+        return self.labels().time()
+
+    def snapshot(self) -> dict[str, Any]:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback that refreshes gauges right before collection."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception:
+                logger.exception("Metrics collector %r failed", collector)
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def render(self) -> str:
+        return render_snapshots([(os.getpid(), self.snapshot())])
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _merge(snapshots: list[tuple[int, dict[str, dict[str, Any]]]]) -> dict:
+    merged: dict[str, dict[str, Any]] = {}
+    for pid, snapshot in snapshots:
+        for name, data in snapshot.items():
+            target = merged.setdefault(
+                name,
+                {
+                    "type": data["type"],
+                    "help": data["help"],
+                    "labelnames": list(data["labelnames"]),
+                    "buckets": data.get("buckets"),
+                    "mode": data.get("mode", "sum"),
+                    "samples": {},
+                },
+            )
+            labelnames = data["labelnames"]
+            for labels, value in data["samples"]:
+                key = tuple(labels)
+                samples = target["samples"]
+                if data["type"] == "histogram":
+                    current = samples.get(key)
+                    if current is None:
+                        samples[key] = {
+                            "counts": list(value["counts"]),
+                            "sum": value["sum"],
+                        }
+                    else:
+                        current["counts"] = [
+                            a + b for a, b in zip(current["counts"], value["counts"])
+                        ]
+                        current["sum"] += value["sum"]
+                elif data["type"] == "gauge" and target["mode"] == "all":
+                    if "pid" not in target["labelnames"]:
+                        target["labelnames"] = list(labelnames) + ["pid"]
+                    samples[key + (str(pid),)] = value
+                elif data["type"] == "gauge" and target["mode"] in ("max", "min"):
+                    pick = max if target["mode"] == "max" else min
+                    samples[key] = (
+                        pick(samples[key], value) if key in samples else value
+                    )
+                else:
+                    samples[key] = samples.get(key, 0.0) + value
+    return merged
+
+
+def render_snapshots(snapshots: list[tuple[int, dict[str, dict[str, Any]]]]) -> str:
+    """Merge per-process snapshots and render them in Prometheus text format."""
+    lines: list[str] = []
+    for name, data in sorted(_merge(snapshots).items()):
+        lines.append(f"# HELP {name} {_escape(data['help'])}")
+        lines.append(f"# TYPE {name} {data['type']}")
+        names = data["labelnames"]
+        for labels, value in sorted(data["samples"].items()):
+            if data["type"] != "histogram":
+                lines.append(
+                    f"{name}{_format_labels(names, labels)} {_format_value(value)}"
+                )
+                continue
+            cumulative = 0
+            bounds = list(data["buckets"]) + [float("inf")]
+            for bound, count in zip(bounds, value["counts"]):
+                cumulative += count
+                bucket_labels = _format_labels(
+                    list(names) + ["le"], list(labels) + [_format_value(bound)]
+                )
+                lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+            label_str = _format_labels(names, labels)
+            lines.append(f"{name}_sum{label_str} {_format_value(value['sum'])}")
+            lines.append(f"{name}_count{label_str} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class MultiprocessStore:
+    """Per-process snapshot files shared by all workers of one deployment."""
+
+    def __init__(self, directory: str | Path, prefix: str = "metrics") -> None:
+        self.directory = Path(directory)
+        self.prefix = prefix
+
+    def _path(self, pid: int) -> Path:
+        return self.directory / f"{self.prefix}_{pid}.json"
+
+    def write(self, data: Any, pid: Optional[int] = None) -> None:
+        pid = pid or os.getpid()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self._path(pid)
+        tmp = target.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, target)
+
+    def read_all(self) -> list[tuple[int, Any]]:
+        if not self.directory.is_dir():
+            return []
+        results = []
+        for path in sorted(self.directory.glob(f"{self.prefix}_*.json")):
+            try:
+                pid = int(path.stem.rsplit("_", 1)[1])
+                results.append((pid, json.loads(path.read_text())))
+            except (ValueError, OSError) as exc:
+                logger.warning("Skipping unreadable snapshot %s: %s", path, exc)
+        return results
+
+
+def _drop_dead_gauges(pid: int, snapshot: dict[str, Any]) -> dict[str, Any]:
+    if pid == os.getpid() or _pid_alive(pid):
+        return snapshot
+    # Counters and histograms of exited workers are kept so totals stay monotonic
+    return {name: data for name, data in snapshot.items() if data["type"] != "gauge"}
+
+
+class _SnapshotWriter(threading.Thread):
+    def __init__(self, store: MultiprocessStore, interval: float) -> None:
+        super().__init__(name="metrics-snapshot-writer", daemon=True)
+        self.store = store
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            flush()
+
+
+REGISTRY = MetricsRegistry()
+_writer: Optional[_SnapshotWriter] = None
+
+
+def _multiprocess_store() -> Optional[MultiprocessStore]:
+    directory = get_settings().metrics_multiproc_dir
+    return MultiprocessStore(directory) if directory else None
+
+
+def flush() -> None:
+    """Write this worker's snapshot to the multiprocess directory, if enabled."""
+    store = _multiprocess_store()
+    if store is None:
+        return
+    try:
+        store.write(REGISTRY.snapshot())
+    except OSError as exc:
+        logger.warning("Failed to write metrics snapshot: %s", exc)
+
+
+def generate_latest() -> str:
+    """Render the metrics of this worker, or of all workers in multiprocess mode."""
+    store = _multiprocess_store()
+    if store is None:
+        return REGISTRY.render()
+    flush()
+    snapshots = [
+        (pid, _drop_dead_gauges(pid, snapshot)) for pid, snapshot in store.read_all()
+    ]
+    return render_snapshots(snapshots)
+
+
+def start_snapshot_writer() -> None:
+    global _writer
+    store = _multiprocess_store()
+    if store is None or _writer is not None:
+        return
+    _writer = _SnapshotWriter(store, get_settings().metrics_flush_interval_seconds)
+    _writer.start()
+
+
+def stop_snapshot_writer() -> None:
+    global _writer
+    if _writer is None:
+        return
+    _writer.stopped.set()
+    _writer = None
+    flush()
+
+
+# Application metrics
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template.",
+    ["method", "route"],
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Database pool connections by state (size, checkedin, checkedout, overflow).",
+    ["state"],
+)
+PASSWORD_VERIFY_DURATION = Histogram(
+    "password_verify_duration_seconds",
+    "Time spent verifying password hashes.",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0),
+)
+JWT_DECODES = Counter(
+    "jwt_decodes_total",
+    "JWT decode attempts by result.",
+    ["result"],
+)
+EMAIL_SENDS = Counter(
+    "email_sends_total",
+    "Outgoing emails by outcome.",
+    ["outcome"],
+)
+INVITATION_REDEMPTIONS = Counter(
+    "invitation_redemptions_total",
+    "Invitation redemption attempts by outcome.",
+    ["outcome"],
+)
+COALESCED_REQUESTS = Counter(
+    "coalesced_requests_total",
+    "Single-flight reads by route and role (leader computed, follower shared).",
+    ["route", "role"],
+)
+EVENT_LOOP_LAG = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between a scheduled event loop wake-up and when it actually ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_BLOCKS = Counter(
+    "event_loop_blocks_total",
+    "Event loop stalls longer than the block threshold, by blocking call site.",
+    ["site"],
+)
+SCHEDULER_LEADER = Gauge(
+    "scheduler_leader",
+    "1 while this process holds the periodic job scheduler's leader lease.",
+)
+SCHEDULER_JOB_RUNS = Counter(
+    "scheduler_job_runs_total",
+    "Periodic job runs by job and outcome (success, error, cancelled).",
+    ["job", "outcome"],
+)
+SCHEDULER_JOB_DURATION = Histogram(
+    "scheduler_job_duration_seconds",
+    "Periodic job run time by job.",
+    ["job"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+ADMISSION_LIMIT = Gauge(
+    "admission_limit",
+    "Adaptive concurrency limit of the admission controller.",
+)
+ADMISSION_INFLIGHT = Gauge(
+    "admission_inflight",
+    "Requests currently admitted by the admission controller.",
+)
+ADMISSION_DECISIONS = Counter(
+    "admission_decisions_total",
+    "Admission decisions by priority and outcome "
+    "(admitted, queued, rejected, timed_out, evicted).",
+    ["priority", "outcome"],
+)
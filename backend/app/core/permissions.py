@@ -0,0 +1,130 @@
+"""
+Organization permissions.
+
+Each role maps to a fixed set of ``OrgPermission`` values, so an
+authorization check is a set lookup. Routes declare what they need:
+
+    membership: Row = Depends(require(OrgPermission.MANAGE_MEMBERS))
+
+The dependency loads the caller's membership once per request, caches it on
+``request.state`` and answers 403 if the role lacks the permission. It
+returns the membership row (role plus the organization's ETag validators,
+see ``OrganizationService.get_membership_validators``), so handlers need no
+further role lookups.
+
+Rules that depend on the target member, not only on the caller's role
+(e.g. "admins cannot demote other admins"), compare ``ROLE_HIERARCHY``
+levels in the service.
+"""
+
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+from app.core.security import get_user_context
+from app.db.session import get_session
+from app.models.organization import OrganizationRole
+from app.schemas.auth import UserContext
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class OrgPermission(str, Enum):
+    VIEW_ORGANIZATION = "view_organization"
+    VIEW_MEMBERS = "view_members"
+    UPDATE_ORGANIZATION = "update_organization"
+    MANAGE_MEMBERS = "manage_members"
+    CREATE_INVITATIONS = "create_invitations"
+    VIEW_INVITATIONS = "view_invitations"
+    MANAGE_INVITATIONS = "manage_invitations"
+
+
+# Role hierarchy (lower number = higher authority)
+ROLE_HIERARCHY = {
+    OrganizationRole.OWNER: 0,
+    OrganizationRole.ADMIN: 1,
+    OrganizationRole.ACCOUNTANT: 2,
+    OrganizationRole.MEMBER: 3,
+    OrganizationRole.VIEWER: 4,
+}
+
+_MEMBER_PERMISSIONS = frozenset(
+    {OrgPermission.VIEW_ORGANIZATION, OrgPermission.VIEW_MEMBERS}
+)
+_MANAGER_PERMISSIONS = frozenset(OrgPermission)
+
+ROLE_PERMISSIONS: dict[OrganizationRole, frozenset[OrgPermission]] = {
+    OrganizationRole.OWNER: _MANAGER_PERMISSIONS,
+    OrganizationRole.ADMIN: _MANAGER_PERMISSIONS,
+    OrganizationRole.ACCOUNTANT: _MEMBER_PERMISSIONS
+    | {OrgPermission.CREATE_INVITATIONS},
+    OrganizationRole.MEMBER: _MEMBER_PERMISSIONS,
+    OrganizationRole.VIEWER: _MEMBER_PERMISSIONS,
+}
+
+DENIED_MESSAGES = {
+    OrgPermission.VIEW_ORGANIZATION: "Немате пристап до оваа организација.",
+    OrgPermission.VIEW_MEMBERS: "Немате пристап до оваа организација.",
+    OrgPermission.UPDATE_ORGANIZATION: "Немате дозвола да ја измените оваа организација.",
+    OrgPermission.MANAGE_MEMBERS: "Немате дозвола да управувате со членови.",
+    OrgPermission.CREATE_INVITATIONS: "Немате дозвола да креирате покани за оваа организација.",
+    OrgPermission.VIEW_INVITATIONS: "Немате дозвола да ги видите поканите.",
+    OrgPermission.MANAGE_INVITATIONS: "Немате дозвола да управувате со поканите.",
+}
+
+
+def has_permission(role: Optional[OrganizationRole], permission: OrgPermission) -> bool:
+    return role is not None and permission in ROLE_PERMISSIONS.get(role, ())
+
+
+async def get_membership(
+    request: Request,
+    session: AsyncSession,
+    user_id: int,
+    organization_id: int,
+    *,
+    include_member_profiles: bool = False,
+) -> Optional[Row]:
+    """The caller's membership row, loaded at most once per request."""
+    from app.services.organization import OrganizationService
+
+    cache = getattr(request.state, "org_memberships", None)
+    if cache is None:
+        cache = request.state.org_memberships = {}
+    key = (user_id, organization_id, include_member_profiles)
+    if key not in cache:
+        cache[key] = await OrganizationService.get_membership_validators(
+            session,
+            user_id,
+            organization_id,
+            include_member_profiles=include_member_profiles,
+        )
+    return cache[key]
+
+
+def require(
+    permission: OrgPermission, *, include_member_profiles: bool = False
+) -> Callable[..., Awaitable[Row]]:
+    """Dependency that admits active members whose role grants ``permission``."""
+
+    async def dependency(
+        organization_id: int,
+        request: Request,
+        ctx: UserContext = Depends(get_user_context),
+        session: AsyncSession = Depends(get_session, scope="function"),
+    ) -> Row:
+        membership = await get_membership(
+            request,
+            session,
+            ctx.user_id,
+            organization_id,
+            include_member_profiles=include_member_profiles,
+        )
+        if membership is None or not has_permission(membership.role, permission):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=DENIED_MESSAGES[permission],
+            )
+        return membership
+
+    return dependency
@@ -0,0 +1,146 @@
+"""
+Low-overhead sampling profiler for live workers.
+
+A background thread reads ``sys._current_frames()`` at a fixed interval and
+counts each thread's stack, so profiled code runs unmodified and the cost is
+one stack walk per thread per sample. Results are rendered in the collapsed
+stack format (``frame;frame;frame count``) understood by ``flamegraph.pl``,
+speedscope and inferno.
+
+Two entry points:
+
+- ``profile_window`` samples the whole worker for a fixed window.
+- ``RequestProfile`` samples while a single request is in flight. Requests
+  share the event loop thread, so concurrent requests on the same worker can
+  appear in the profile too.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import uuid
+from collections import Counter, OrderedDict
+from pathlib import Path
+from types import FrameType
+from typing import Optional
+
+MAX_WINDOW_SECONDS = 60
+DEFAULT_INTERVAL = 0.005
+MAX_STACK_DEPTH = 128
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a window profile is requested while another one runs."""
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{Path(code.co_filename).stem}:{code.co_name}"
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    def __init__(
+        self,
+        interval: float = DEFAULT_INTERVAL,
+        thread_ids: Optional[set[int]] = None,
+    ) -> None:
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.samples: Counter[str] = Counter()
+        self.sample_count = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> "StackSampler":
+        self._stopped.set()
+        self._thread.join()
+        return self
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if self.thread_ids is not None and thread_id not in self.thread_ids:
+                    continue
+                self.samples[_collapse(frame)] += 1
+            self.sample_count += 1
+
+    def collapsed(self) -> str:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.samples.most_common()
+        )
+
+
+_window_lock = asyncio.Lock()
+
+
+async def profile_window(seconds: float, interval: float = DEFAULT_INTERVAL) -> str:
+    """Sample every thread of this worker for ``seconds`` and return collapsed stacks."""
+    if _window_lock.locked():
+        raise ProfilerBusyError("A profiling window is already running")
+    async with _window_lock:
+        sampler = StackSampler(interval).start()
+        try:
+            await asyncio.sleep(min(seconds, MAX_WINDOW_SECONDS))
+        finally:
+            sampler.stop()
+    return sampler.collapsed()
+
+
+class RequestProfile:
+    """Sample the current thread while a request is in flight."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL) -> None:
+        self.id = uuid.uuid4().hex
+        self._sampler = StackSampler(interval, thread_ids={threading.get_ident()})
+
+    def __enter__(self) -> "RequestProfile":
+        self._sampler.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._sampler.stop()
+        profile_store.put(self.id, self._sampler.collapsed())
+
+
+class ProfileStore:
+    """Bounded, per-worker store of finished request profiles."""
+
+    def __init__(self, max_profiles: int = 32) -> None:
+        self.max_profiles = max_profiles
+        self._profiles: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, profile_id: str, collapsed: str) -> None:
+        with self._lock:
+            self._profiles[profile_id] = collapsed
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[str]:
+        with self._lock:
+            return self._profiles.get(profile_id)
+
+
+profile_store = ProfileStore()
+
+
+def worker_id() -> str:
+    return str(os.getpid())
@@ -0,0 +1,321 @@
+"""
+Token-bucket rate limiting for expensive or abuse-prone routes.
+
+Routes declare a named limit and what to key it on:
+
+    @router.post("/login", dependencies=[Depends(rate_limit("auth.login", "10/minute"))])
+
+``"10/minute"`` is a bucket holding 10 tokens that refills at 10 per minute,
+so it allows a burst of 10 and then a steady 1 every 6 seconds. Every
+request takes one token; an empty bucket answers 429 with ``Retry-After``.
+The same name on several routes (``/auth/login`` and ``/auth/token``) shares
+one bucket per key. ``RATE_LIMITS`` overrides limits by name without a
+deploy, e.g. ``RATE_LIMITS="auth.login=5/minute,auth.register=2/minute"``.
+
+Organization-keyed limits belong after the route's permission dependency;
+otherwise non-members could drain an organization's bucket.
+
+Buckets live in Redis and are updated by a single Lua script, so the
+check-and-take is atomic across workers and costs one round trip. If Redis
+is unreachable, the limiter logs it, falls back to per-process buckets and
+retries Redis after ``REDIS_RETRY_SECONDS``; the limits then apply per
+worker rather than globally.
+
+The most restrictive decision of the request is reported in
+``RateLimit-Limit``, ``RateLimit-Remaining``, ``RateLimit-Reset`` and
+``RateLimit-Policy`` headers by ``RateLimitHeadersMiddleware``.
+"""
+
+import logging
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Optional
+
+from app.core.config import get_settings
+from app.core.security import get_optional_user_context
+from app.schemas.auth import UserContext
+from fastapi import Depends, HTTPException, Request, status
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ratelimit:"
+REDIS_RETRY_SECONDS = 5.0
+STATE_KEY = "rate_limit"
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+_LIMIT_RE = re.compile(r"^\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*$")
+
+# KEYS[1] bucket; ARGV capacity, refill per millisecond, cost. Redis' own clock
+# keeps workers with skewed clocks consistent. Returns {allowed, tokens}; the
+# token count is a string because Lua numbers are truncated to integers.
+_TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+  tokens = capacity
+  ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RateLimitKey(str, Enum):
+    IP = "ip"
+    # Authenticated user; anonymous callers fall back to their IP
+    USER = "user"
+    # ``organization_id`` path parameter, else the token's organization
+    ORGANIZATION = "organization"
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    capacity: int
+    period_seconds: int
+
+    @classmethod
+    def parse(cls, value: str) -> "RateLimit":
+        """Parse ``"<count>/<second|minute|hour|day>"``."""
+        match = _LIMIT_RE.match(value)
+        if match is None or int(match.group(1)) < 1:
+            raise ValueError(f"Invalid rate limit {value!r}")
+        return cls(int(match.group(1)), _PERIODS[match.group(2)])
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period_seconds
+
+    @property
+    def policy(self) -> str:
+        return f"{self.capacity};w={self.period_seconds}"
+
+
+@dataclass(frozen=True)
+class RateLimitDecision:
+    allowed: bool
+    limit: RateLimit
+    tokens: float
+
+    @property
+    def remaining(self) -> int:
+        return max(0, math.floor(self.tokens))
+
+    @property
+    def reset_seconds(self) -> int:
+        """Seconds until the bucket is full again."""
+        missing = self.limit.capacity - self.tokens
+        return max(0, math.ceil(missing / self.limit.refill_per_second))
+
+    @property
+    def retry_after_seconds(self) -> int:
+        """Seconds until the next token; zero when the request was allowed."""
+        if self.allowed:
+            return 0
+        return max(1, math.ceil((1 - self.tokens) / self.limit.refill_per_second))
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "RateLimit-Limit": str(self.limit.capacity),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset_seconds),
+            "RateLimit-Policy": self.limit.policy,
+        }
+
+
+class LocalBuckets:
+    """Per-process buckets, bounded by evicting the least recently used key."""
+
+    def __init__(self, max_keys: int = 10_000) -> None:
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitDecision:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.pop(key, (limit.capacity, now))
+        tokens = min(
+            limit.capacity, tokens + (now - updated_at) * limit.refill_per_second
+        )
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return RateLimitDecision(allowed, limit, tokens)
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class RedisBuckets:
+    def __init__(self, url: str) -> None:
+        from redis.asyncio import Redis
+
+        self._client = Redis.from_url(url)
+        self._script = self._client.register_script(_TOKEN_BUCKET_LUA)
+
+    async def hit(self, key: str, limit: RateLimit, cost: int = 1) -> RateLimitDecision:
+        allowed, tokens = await self._script(
+            keys=[key],
+            args=[limit.capacity, limit.refill_per_second / 1000, cost],
+        )
+        return RateLimitDecision(bool(allowed), limit, float(tokens))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def parse_overrides(spec: Optional[str]) -> dict[str, RateLimit]:
+    """Parse ``RATE_LIMITS`` (``"name=10/minute,other=5/second"``)."""
+    overrides: dict[str, RateLimit] = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        name, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid RATE_LIMITS entry {item!r}")
+        overrides[name.strip()] = RateLimit.parse(value)
+    return overrides
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        redis: Optional[RedisBuckets] = None,
+        *,
+        enabled: bool = True,
+        overrides: Optional[dict[str, RateLimit]] = None,
+    ) -> None:
+        self.redis = redis
+        self.enabled = enabled
+        self.overrides = overrides or {}
+        self.local = LocalBuckets()
+        self._redis_retry_at = 0.0
+
+    def limit_for(self, name: str, default: RateLimit) -> RateLimit:
+        return self.overrides.get(name, default)
+
+    async def hit(self, name: str, key: str, limit: RateLimit) -> RateLimitDecision:
+        bucket = f"{KEY_PREFIX}{name}:{key}"
+        if self.redis is not None and time.monotonic() >= self._redis_retry_at:
+            try:
+                return await self.redis.hit(bucket, limit)
+            except Exception as exc:
+                self._redis_retry_at = time.monotonic() + REDIS_RETRY_SECONDS
+                logger.warning(
+                    "Rate limit backend failed, using per-process buckets: %s", exc
+                )
+        return self.local.hit(bucket, limit)
+
+    async def close(self) -> None:
+        self.local.clear()
+        if self.redis is not None:
+            await self.redis.close()
+
+
+def _build_rate_limiter() -> RateLimiter:
+    settings = get_settings()
+    return RateLimiter(
+        (
+            RedisBuckets(settings.redis_url)
+            if settings.rate_limit_backend == "redis"
+            else None
+        ),
+        enabled=settings.rate_limit_enabled,
+        overrides=parse_overrides(settings.rate_limits),
+    )
+
+
+limiter = RateLimiter()
+
+
+def configure_rate_limiter(instance: Optional[RateLimiter] = None) -> RateLimiter:
+    """Install ``instance`` (or one built from settings) as the global limiter."""
+    global limiter
+    limiter = instance or _build_rate_limiter()
+    return limiter
+
+
+async def close_rate_limiter() -> None:
+    await limiter.close()
+
+
+def client_ip(request: Request) -> str:
+    header = get_settings().rate_limit_client_ip_header
+    if header:
+        value = request.headers.get(header)
+        if value:
+            return value.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _key_for(request: Request, key: RateLimitKey, ctx: Optional[UserContext]) -> str:
+    if key is RateLimitKey.ORGANIZATION:
+        organization_id = request.path_params.get("organization_id") or (
+            ctx.organization_id if ctx else None
+        )
+        if organization_id is not None:
+            return f"org:{organization_id}"
+    if key is not RateLimitKey.IP and ctx is not None:
+        return f"user:{ctx.user_id}"
+    return f"ip:{client_ip(request)}"
+
+
+def _record(request: Request, decision: RateLimitDecision) -> None:
+    """Keep the most restrictive decision for the response headers."""
+    current: Optional[RateLimitDecision] = getattr(request.state, STATE_KEY, None)
+    if current is None or decision.remaining < current.remaining:
+        setattr(request.state, STATE_KEY, decision)
+
+
+def rate_limit(
+    name: str, limit: str, *, key: RateLimitKey = RateLimitKey.IP
+) -> Callable[..., Awaitable[None]]:
+    """Dependency that takes a token from the ``name`` bucket of the caller's key."""
+    default = RateLimit.parse(limit)
+
+    async def check(request: Request, ctx: Optional[UserContext]) -> None:
+        if not limiter.enabled:
+            return
+        decision = await limiter.hit(
+            name, _key_for(request, key, ctx), limiter.limit_for(name, default)
+        )
+        _record(request, decision)
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please try again later.",
+                headers={"Retry-After": str(decision.retry_after_seconds)},
+            )
+
+    if key is RateLimitKey.IP:
+
+        async def ip_dependency(request: Request) -> None:
+            await check(request, None)
+
+        return ip_dependency
+
+    async def dependency(
+        request: Request,
+        ctx: Optional[UserContext] = Depends(get_optional_user_context),
+    ) -> None:
+        await check(request, ctx)
+
+    return dependency
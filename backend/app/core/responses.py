@@ -0,0 +1,35 @@
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse
+
+
+def _orjson_default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def render_json(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        # pydantic-core writes JSON directly, skipping the intermediate dict
+        return content.__pydantic_serializer__.to_json(content)
+    return orjson.dumps(
+        content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS
+    )
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    A top-level pydantic model is serialized straight to JSON by
+    pydantic-core; models nested in lists or dicts are dumped once with
+    ``model_dump(mode="json")`` and the container is rendered by orjson. Routes that already hold the final
+    response schema return this class directly, which makes FastAPI skip the
+    ``response_model`` re-validation step.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return render_json(content)
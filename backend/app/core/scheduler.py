@@ -0,0 +1,299 @@
+"""
+Periodic jobs that run on one replica at a time.
+
+Every replica runs a ``Scheduler``, but only the holder of a leader lease
+runs jobs. The lease is a Redis key set with ``NX`` and a TTL. The leader
+renews it on every tick; if the leader dies, the key expires and another
+replica takes over within ``lease_seconds``. Renewal and release compare
+the holder's token, so a replica whose lease has already expired cannot
+extend or delete its successor's lease.
+
+Each job records when it last started in the store, so a new leader knows
+what is due. Runs missed while there was no leader (a deploy, every replica
+down) are caught up with a single run, not one per missed interval. Next
+runs are jittered to avoid every job firing at the same second.
+
+A leader that loses its lease cancels its running jobs. Still, a job can
+overlap with the next leader's run for up to one tick, so jobs must be
+idempotent: "deactivate what has expired", not "deactivate these ids".
+
+Register jobs with ``start_scheduler`` in the FastAPI lifespan, or run them
+in a separate process (see ``app.tasks.periodic``).
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, Sequence
+
+from app.core.config import get_settings
+from app.core.metrics import (
+    SCHEDULER_JOB_DURATION,
+    SCHEDULER_JOB_RUNS,
+    SCHEDULER_LEADER,
+)
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "scheduler:"
+LEADER_KEY = f"{KEY_PREFIX}leader"
+LAST_RUN_KEY = f"{KEY_PREFIX}last_run"
+
+# KEYS[1] lease; ARGV token, ttl in milliseconds
+_RENEW_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class Job:
+    name: str
+    interval_seconds: float
+    func: Callable[[], Awaitable[None]]
+    # Next runs are delayed by up to this fraction of the interval
+    jitter: float = 0.1
+
+
+class SchedulerStore(ABC):
+    @abstractmethod
+    async def acquire(self, token: str, ttl: float) -> bool:
+        """Take the leader lease unless another token holds it."""
+
+    @abstractmethod
+    async def renew(self, token: str, ttl: float) -> bool:
+        """Extend the lease; False if ``token`` no longer holds it."""
+
+    @abstractmethod
+    async def release(self, token: str) -> None: ...
+
+    @abstractmethod
+    async def last_runs(self) -> dict[str, float]:
+        """Wall-clock start time of each job's latest run."""
+
+    @abstractmethod
+    async def set_last_run(self, job: str, started_at: float) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemoryStore(SchedulerStore):
+    """Per-process lease; every process leads, so only for one-process setups."""
+
+    def __init__(self) -> None:
+        self._holder: Optional[tuple[str, float]] = None
+        self._last_runs: dict[str, float] = {}
+
+    async def acquire(self, token: str, ttl: float) -> bool:
+        now = time.monotonic()
+        if self._holder is not None and self._holder[1] > now:
+            return self._holder[0] == token
+        self._holder = (token, now + ttl)
+        return True
+
+    async def renew(self, token: str, ttl: float) -> bool:
+        now = time.monotonic()
+        if self._holder is None or self._holder[0] != token or self._holder[1] <= now:
+            return False
+        self._holder = (token, now + ttl)
+        return True
+
+    async def release(self, token: str) -> None:
+        if self._holder is not None and self._holder[0] == token:
+            self._holder = None
+
+    async def last_runs(self) -> dict[str, float]:
+        return dict(self._last_runs)
+
+    async def set_last_run(self, job: str, started_at: float) -> None:
+        self._last_runs[job] = started_at
+
+
+class RedisStore(SchedulerStore):
+    def __init__(self, url: str) -> None:
+        from redis.asyncio import Redis
+
+        self._client = Redis.from_url(url)
+        self._renew = self._client.register_script(_RENEW_LUA)
+        self._release = self._client.register_script(_RELEASE_LUA)
+
+    async def acquire(self, token: str, ttl: float) -> bool:
+        return bool(
+            await self._client.set(LEADER_KEY, token, px=int(ttl * 1000), nx=True)
+        )
+
+    async def renew(self, token: str, ttl: float) -> bool:
+        return bool(await self._renew(keys=[LEADER_KEY], args=[token, int(ttl * 1000)]))
+
+    async def release(self, token: str) -> None:
+        await self._release(keys=[LEADER_KEY], args=[token])
+
+    async def last_runs(self) -> dict[str, float]:
+        raw = await self._client.hgetall(LAST_RUN_KEY)
+        return {name.decode(): float(value) for name, value in raw.items()}
+
+    async def set_last_run(self, job: str, started_at: float) -> None:
+        await self._client.hset(LAST_RUN_KEY, job, repr(started_at))
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+class Scheduler:
+    def __init__(
+        self,
+        store: SchedulerStore,
+        jobs: Sequence[Job],
+        *,
+        lease_seconds: float = 30.0,
+    ) -> None:
+        self.store = store
+        self.jobs = {job.name: job for job in jobs}
+        self.lease_seconds = lease_seconds
+        # Renew well before the lease can expire
+        self.tick_seconds = lease_seconds / 3
+        self.token = uuid.uuid4().hex
+        self.is_leader = False
+        self._next_runs: dict[str, float] = {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the scheduler loop; call from inside the running loop."""
+        self._task = asyncio.get_running_loop().create_task(
+            self.run(), name="scheduler"
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self._step_down()
+        with contextlib.suppress(Exception):
+            await self.store.release(self.token)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Scheduler tick failed")
+                await self._step_down()
+            # Jittered so replicas do not all contend for the lease at once
+            await asyncio.sleep(self.tick_seconds * random.uniform(0.8, 1.2))
+
+    async def tick(self) -> None:
+        """Acquire or renew the lease, then start the jobs that are due."""
+        if self.is_leader:
+            if not await self.store.renew(self.token, self.lease_seconds):
+                logger.warning("Scheduler lost its leader lease")
+                await self._step_down()
+                return
+        elif await self.store.acquire(self.token, self.lease_seconds):
+            await self._take_over()
+        else:
+            return
+
+        now = time.time()
+        for name, job in self.jobs.items():
+            if name not in self._running and self._next_runs[name] <= now:
+                self._running[name] = asyncio.create_task(
+                    self._run_job(job), name=f"scheduler:{name}"
+                )
+
+    async def _take_over(self) -> None:
+        self.is_leader = True
+        SCHEDULER_LEADER.set(1)
+        logger.info("Scheduler acquired the leader lease")
+        last_runs = await self.store.last_runs()
+        for name, job in self.jobs.items():
+            # Never run, or overdue: run on this tick (once, however many
+            # runs were missed)
+            last_run = last_runs.get(name)
+            self._next_runs[name] = (
+                last_run + job.interval_seconds if last_run is not None else 0.0
+            )
+
+    async def _step_down(self) -> None:
+        self.is_leader = False
+        SCHEDULER_LEADER.set(0)
+        running = list(self._running.values())
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run_job(self, job: Job) -> None:
+        started_at = time.time()
+        started = time.perf_counter()
+        outcome = "success"
+        try:
+            await job.func()
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception:
+            outcome = "error"
+            logger.exception("Scheduled job %s failed", job.name)
+        finally:
+            SCHEDULER_JOB_DURATION.labels(job.name).observe(
+                time.perf_counter() - started
+            )
+            SCHEDULER_JOB_RUNS.labels(job.name, outcome).inc()
+            del self._running[job.name]
+            # A failed run also waits a full interval instead of retrying
+            # on every tick
+            self._next_runs[job.name] = (
+                started_at
+                + job.interval_seconds
+                + random.uniform(0, job.jitter * job.interval_seconds)
+            )
+        try:
+            await self.store.set_last_run(job.name, started_at)
+        except Exception as exc:
+            logger.warning("Failed to record run of job %s: %s", job.name, exc)
+
+
+def _build_store() -> SchedulerStore:
+    settings = get_settings()
+    if settings.scheduler_backend == "redis":
+        return RedisStore(settings.redis_url)
+    return MemoryStore()
+
+
+scheduler: Optional[Scheduler] = None
+
+
+def start_scheduler(jobs: Sequence[Job]) -> None:
+    global scheduler
+    settings = get_settings()
+    if not settings.scheduler_enabled or scheduler is not None:
+        return
+    scheduler = Scheduler(
+        _build_store(), jobs, lease_seconds=settings.scheduler_lease_seconds
+    )
+    scheduler.start()
+
+
+async def stop_scheduler() -> None:
+    global scheduler
+    if scheduler is None:
+        return
+    await scheduler.stop()
+    await scheduler.store.close()
+    scheduler = None
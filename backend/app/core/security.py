@@ -1,11 +1,15 @@
 import logging
+import secrets
 from datetime import UTC, datetime, timedelta
 from typing import Any, Optional
 
 from app.core.config import get_settings
+from app.core.metrics import JWT_DECODES, PASSWORD_VERIFY_DURATION
+from app.core.tracing import tracer
+from app.core.usage import record_tenant
 from app.schemas.auth import UserContext
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pwdlib import PasswordHash
 
@@ -16,9 +20,13 @@ logger = logging.getLogger(__name__)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
 
+# request.state attribute mapping tokens to already decoded contexts
+USER_CONTEXTS_STATE = "user_contexts"
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_hasher.verify(plain_password, hashed_password)
+    with tracer.start_span("verify_password"), PASSWORD_VERIFY_DURATION.time():
+        return pwd_hasher.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -64,28 +72,39 @@ def create_refresh_token(
 
 def decode_access_token(token: str) -> dict[str, Any]:
     try:
-        return jwt.decode(
+        payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.jwt_algorithm]
         )
     except JWTError as exc:
+        JWT_DECODES.labels("invalid").inc()
         raise ValueError("Invalid token") from exc
+    JWT_DECODES.labels("ok").inc()
+    return payload
 
 
-def get_user_context(token: str = Depends(oauth2_scheme)) -> UserContext:
+def get_user_context(
+    request: Request, token: str = Depends(oauth2_scheme)
+) -> UserContext:
     """Extract user context from JWT token"""
-    try:
-        payload = decode_access_token(token)
-        return UserContext(
-            user_id=int(payload.get("sub")),
-            organization_id=payload.get("org_id"),
-            role=payload.get("org_role"),
-        )
-    except (ValueError, TypeError) as e:
-        logger.warning("Invalid token: %s", str(e))
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication token",
-        )
+    # Batch sub-requests carry the context their parent request already decoded
+    decoded = getattr(request.state, USER_CONTEXTS_STATE, None)
+    context = decoded.get(token) if decoded else None
+    if context is None:
+        try:
+            payload = decode_access_token(token)
+            context = UserContext(
+                user_id=int(payload.get("sub")),
+                organization_id=payload.get("org_id"),
+                role=payload.get("org_role"),
+            )
+        except (ValueError, TypeError) as e:
+            logger.warning("Invalid token: %s", str(e))
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication token",
+            )
+    record_tenant(context.organization_id)
+    return context
 
 
 # Optional OAuth2 scheme that doesn't require authentication
@@ -107,3 +126,23 @@ def get_optional_user_context(
         )
     except (ValueError, TypeError):
         return None
+
+
+admin_token_header = APIKeyHeader(name="X-Admin-Token", auto_error=False)
+
+
+def is_admin_token(token: str | None) -> bool:
+    expected = settings.admin_api_token
+    if not expected or not token:
+        return False
+    return secrets.compare_digest(token.encode(), expected.encode())
+
+
+def require_admin(token: str | None = Depends(admin_token_header)) -> None:
+    """Guard for operational endpoints; they do not exist without ADMIN_API_TOKEN."""
+    if not settings.admin_api_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if not is_admin_token(token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token"
+        )
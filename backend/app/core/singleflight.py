@@ -0,0 +1,110 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+When many identical requests arrive at once (a team opening the dashboard at
+9:00), the first becomes the leader and computes the result; the others
+await the leader's result instead of repeating the work:
+
+    body = await coalesce(request, render, scope=etag)
+
+Coalescing is per process and only spans requests that overlap in time;
+nothing is kept once the leader finishes. The response cache
+(``app.core.cache``) covers reuse over time.
+
+Scoping rules, so a shared result can never reach someone it was not
+computed for:
+
+- Authorization runs per request, before joining a flight. A follower only
+  receives what its own permission check already allowed it to see.
+- The key holds the method, route template, path and query parameters, plus
+  an explicit ``scope``. The scope must cover every other input the result
+  depends on. Pass the user id for per-user results, or a version or ETag
+  for results shared by everyone who passed the permission check. Requests
+  that saw different versions then never share.
+- Share serializable results (rendered bytes, schema objects). Never share
+  ORM instances, which belong to the leader's session.
+
+If the leader fails, its followers see the same exception. If the leader is
+cancelled (e.g. its client disconnected), one follower takes over and the
+rest wait on it.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from app.core.metrics import COALESCED_REQUESTS
+from app.utils.routing import route_template
+from fastapi import Request
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    pass
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self, key: Hashable, compute: Callable[[], Awaitable[T]], *, label: str = ""
+    ) -> T:
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            COALESCED_REQUESTS.labels(label, "follower").inc()
+            try:
+                # Shielded so a cancelled follower does not cancel the flight
+                return await asyncio.shield(flight)
+            except _LeaderCancelled:
+                continue
+
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        COALESCED_REQUESTS.labels(label, "leader").inc()
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            flight.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            del self._flights[key]
+            # Mark the exception retrieved when no follower was waiting
+            if flight.done() and not flight.cancelled():
+                flight.exception()
+
+
+coalescer = SingleFlight()
+
+
+def flight_key(request: Request, *, scope: Any) -> tuple:
+    """Key for ``request``'s route and parameters; ``scope`` is required."""
+    return (
+        request.method,
+        route_template(request.scope),
+        tuple(sorted(request.path_params.items())),
+        tuple(sorted(request.query_params.multi_items())),
+        scope,
+    )
+
+
+async def coalesce(
+    request: Request, compute: Callable[[], Awaitable[T]], *, scope: Any
+) -> T:
+    """Run ``compute`` once for all concurrent requests with the same key."""
+    key = flight_key(request, scope=scope)
+    return await coalescer.do(key, compute, label=key[1])
@@ -0,0 +1,486 @@
+"""
+Lightweight OpenTelemetry-style tracing.
+
+Spans follow the OTel data model (trace/span ids, parent, kind, attributes,
+status) and are propagated through a context variable, so nested
+``start_span`` calls and SQLAlchemy statement events attach to the active
+request span. Sampling is head-based: the root span decides from its trace id
+and ``TRACING_SAMPLE_RATIO``, and children (including remote parents from a
+W3C ``traceparent`` header) inherit that decision.
+
+Finished spans are exported as OTLP-shaped JSON lines to a local file, which
+stands in for a collector, or kept in memory for tests.
+"""
+
+import functools
+import inspect
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from app.core.config import get_settings
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+SPAN_KIND_INTERNAL = "internal"
+SPAN_KIND_SERVER = "server"
+SPAN_KIND_CLIENT = "client"
+
+_OTLP_KINDS = {SPAN_KIND_INTERNAL: 1, SPAN_KIND_SERVER: 2, SPAN_KIND_CLIENT: 3}
+_OTLP_STATUS = {"unset": 0, "ok": 1, "error": 2}
+_MAX_STATEMENT_LENGTH = 2000
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "kind",
+        "sampled",
+        "start_ns",
+        "end_ns",
+        "attributes",
+        "status",
+        "status_message",
+        "_tracer",
+    )
+
+    def __init__(
+        self,
+        tracer: Optional["Tracer"],
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        kind: str,
+        sampled: bool,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.kind = kind
+        self.sampled = sampled
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: dict[str, Any] = dict(attributes or {})
+        self.status = "unset"
+        self.status_message: Optional[str] = None
+
+    @property
+    def is_recording(self) -> bool:
+        return self.sampled and self.end_ns is None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.sampled:
+            self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException) -> None:
+        if self.sampled:
+            self.status = "error"
+            self.status_message = f"{type(exc).__name__}: {exc}"
+            self.attributes["exception.type"] = type(exc).__name__
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled and self._tracer is not None:
+            self._tracer._on_end(self)
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns or time.time_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+    def to_otlp(self) -> dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _OTLP_KINDS[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": _OTLP_STATUS[self.status]},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def get_current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class ParentBasedRatioSampler:
+    """Sample a ratio of new traces; children follow their parent's decision."""
+
+    def __init__(self, ratio: float) -> None:
+        self.ratio = min(max(ratio, 0.0), 1.0)
+        self._bound = int(self.ratio * (1 << 64))
+
+    def should_sample(self, trace_id: str, parent_sampled: Optional[bool]) -> bool:
+        if parent_sampled is not None:
+            return parent_sampled
+        # Deterministic on the trace id so every service agrees on the decision
+        return int(trace_id[-16:], 16) < self._bound
+
+
+class InMemoryExporter:
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Append spans as OTLP JSON lines (one ``resourceSpans`` batch per line)."""
+
+    def __init__(self, path: str | Path, service_name: str) -> None:
+        self.path = Path(path)
+        self.service_name = service_name
+
+    def export(self, spans: list[Span]) -> None:
+        batch = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": self.service_name},
+                            },
+                            {
+                                "key": "process.pid",
+                                "value": {"intValue": str(os.getpid())},
+                            },
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "app"},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(json.dumps(batch) + "\n")
+
+    def shutdown(self) -> None:
+        pass
+
+
+class SimpleSpanProcessor:
+    """Export every span synchronously when it ends (tests, debugging)."""
+
+    def __init__(self, exporter: Any) -> None:
+        self.exporter = exporter
+
+    def on_end(self, span: Span) -> None:
+        self.exporter.export([span])
+
+    def shutdown(self) -> None:
+        self.exporter.shutdown()
+
+
+class BatchSpanProcessor:
+    """Queue finished spans and export them from a background thread."""
+
+    def __init__(
+        self,
+        exporter: Any,
+        max_batch_size: int = 256,
+        schedule_delay: float = 1.0,
+        max_queue_size: int = 8192,
+    ) -> None:
+        self.exporter = exporter
+        self.max_batch_size = max_batch_size
+        self.schedule_delay = schedule_delay
+        self._queue: queue.Queue[Span] = queue.Queue(max_queue_size)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._worker, name="span-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            logger.debug("Span queue full, dropping span %s", span.name)
+
+    def _drain(self) -> None:
+        while True:
+            batch: list[Span] = []
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            try:
+                self.exporter.export(batch)
+            except Exception:
+                logger.exception("Span export failed")
+
+    def _worker(self) -> None:
+        while not self._stopped.wait(self.schedule_delay):
+            self._drain()
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+        self._thread.join(timeout=5)
+        self._drain()
+        self.exporter.shutdown()
+
+
+class _SpanScope:
+    """Context manager activating a span; also used by the ``traced`` decorator."""
+
+    __slots__ = ("_tracer", "_name", "_kind", "_attributes", "_span", "_token")
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        kind: str,
+        attributes: Optional[dict[str, Any]],
+    ) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._kind = kind
+        self._attributes = attributes
+        self._span: Optional[Span] = None
+        self._token: Optional[Token] = None
+
+    def __enter__(self) -> Span:
+        self._span = self._tracer.create_span(
+            self._name, kind=self._kind, attributes=self._attributes
+        )
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is not None:
+            self._span.record_exception(exc)
+        self._span.end()
+        _current_span.reset(self._token)
+
+
+class Tracer:
+    def __init__(
+        self,
+        processor: Any = None,
+        sampler: Optional[ParentBasedRatioSampler] = None,
+    ) -> None:
+        self.processor = processor
+        self.sampler = sampler or ParentBasedRatioSampler(1.0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.processor is not None
+
+    def create_span(
+        self,
+        name: str,
+        *,
+        kind: str = SPAN_KIND_INTERNAL,
+        attributes: Optional[dict[str, Any]] = None,
+        parent: Optional[Span] = None,
+        remote_parent: Optional[tuple[str, str, bool]] = None,
+    ) -> Span:
+        """Create a span without activating it (pair with ``span.end()``)."""
+        parent = parent or _current_span.get()
+        if parent is not None:
+            trace_id, parent_id, parent_sampled = (
+                parent.trace_id,
+                parent.span_id,
+                parent.sampled,
+            )
+        elif remote_parent is not None:
+            trace_id, parent_id, parent_sampled = remote_parent
+        else:
+            trace_id, parent_id, parent_sampled = (
+                f"{random.getrandbits(128):032x}",
+                None,
+                None,
+            )
+        sampled = self.enabled and self.sampler.should_sample(trace_id, parent_sampled)
+        return Span(self, name, trace_id, parent_id, kind, sampled, attributes)
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        kind: str = SPAN_KIND_INTERNAL,
+        attributes: Optional[dict[str, Any]] = None,
+    ) -> _SpanScope:
+        """Create a span and make it current for the duration of a ``with`` block."""
+        return _SpanScope(self, name, kind, attributes)
+
+    def traced(
+        self, name: Optional[str] = None, *, kind: str = SPAN_KIND_INTERNAL
+    ) -> Callable:
+        """Decorator wrapping a sync or async function in a span."""
+
+        def decorator(func: Callable) -> Callable:
+            span_name = name or func.__qualname__
+
+            if inspect.iscoroutinefunction(func):
+
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.start_span(span_name, kind=kind):
+                        return await func(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.start_span(span_name, kind=kind):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def _on_end(self, span: Span) -> None:
+        if self.processor is not None:
+            self.processor.on_end(span)
+
+    def shutdown(self) -> None:
+        if self.processor is not None:
+            self.processor.shutdown()
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    """Parse a W3C ``traceparent`` header into (trace_id, span_id, sampled)."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) < 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    version, trace_id, span_id, flags = parts[:4]
+    try:
+        if version == "ff" or int(trace_id, 16) == 0 or int(span_id, 16) == 0:
+            return None
+        sampled = bool(int(flags, 16) & 0x01)
+    except ValueError:
+        return None
+    return trace_id.lower(), span_id.lower(), sampled
+
+
+def format_traceparent(span: Span) -> str:
+    return f"00-{span.trace_id}-{span.span_id}-{'01' if span.sampled else '00'}"
+
+
+def instrument_engine(sync_engine: Engine) -> None:
+    """Record a client span for every SQL statement executed on the engine."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if not tracer.enabled or context is None:
+            return
+        span = tracer.create_span(
+            "db.query",
+            kind=SPAN_KIND_CLIENT,
+            attributes={
+                "db.system": conn.dialect.name,
+                "db.statement": statement[:_MAX_STATEMENT_LENGTH],
+                "db.executemany": many,
+            },
+        )
+        context._trace_span = span
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        span = getattr(context, "_trace_span", None)
+        if span is not None:
+            span.set_attribute("db.rowcount", cursor.rowcount)
+            span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        span = getattr(exception_context.execution_context, "_trace_span", None)
+        if span is not None:
+            span.record_exception(exception_context.original_exception)
+            span.end()
+
+
+def http_client_span(method: str, url: str) -> _SpanScope:
+    """Span for an outbound HTTP call; callers add ``http.status_code``."""
+    return tracer.start_span(
+        f"HTTP {method.upper()}",
+        kind=SPAN_KIND_CLIENT,
+        attributes={"http.method": method.upper(), "http.url": url},
+    )
+
+
+tracer = Tracer()
+
+
+def configure_tracing(
+    processor: Any = None, sample_ratio: Optional[float] = None
+) -> Tracer:
+    """
+    (Re)configure the global tracer. Without arguments the processor is built
+    from settings; tests pass ``SimpleSpanProcessor(InMemoryExporter())``.
+    """
+    settings = get_settings()
+    if processor is None and settings.tracing_enabled:
+        if settings.tracing_exporter == "memory":
+            processor = SimpleSpanProcessor(InMemoryExporter())
+        else:
+            processor = BatchSpanProcessor(
+                FileExporter(settings.tracing_file_path, settings.app_name)
+            )
+    tracer.processor = processor
+    tracer.sampler = ParentBasedRatioSampler(
+        settings.tracing_sample_ratio if sample_ratio is None else sample_ratio
+    )
+    return tracer
@@ -0,0 +1,185 @@
+"""
+Per-tenant resource accounting.
+
+Every HTTP request gets a ``RequestUsage`` accumulator in a context variable.
+``get_user_context`` tags it with the caller's ``organization_id``, SQLAlchemy
+cursor events add statement counts and DB time, and the middleware adds CPU
+time and response bytes. When the request finishes, the accumulator is folded
+into per-organization totals. Those totals are flushed to the metrics
+multiprocess directory so the admin report covers every worker.
+
+CPU time is the event loop thread's CPU time while the request was in
+flight. When requests overlap on one worker, each is charged for the others'
+work too, so treat it as an upper bound. Time spent in the threadpool is not
+counted.
+"""
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, fields
+from typing import Any, Optional
+
+from app.core.config import get_settings
+from app.core.metrics import MultiprocessStore
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+NO_TENANT = "none"
+
+
+@dataclass
+class TenantTotals:
+    requests: int = 0
+    sql_statements: int = 0
+    db_time_seconds: float = 0.0
+    cpu_time_seconds: float = 0.0
+    response_bytes: int = 0
+
+    def add(self, other: "TenantTotals") -> None:
+        for item in fields(self):
+            setattr(
+                self, item.name, getattr(self, item.name) + getattr(other, item.name)
+            )
+
+
+@dataclass
+class RequestUsage:
+    organization_id: Optional[int] = None
+    sql_statements: int = 0
+    db_time_seconds: float = 0.0
+    cpu_time_seconds: float = 0.0
+    response_bytes: int = 0
+
+    @property
+    def tenant(self) -> str:
+        return NO_TENANT if self.organization_id is None else str(self.organization_id)
+
+
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar(
+    "request_usage", default=None
+)
+
+
+def current_usage() -> Optional[RequestUsage]:
+    return _request_usage.get()
+
+
+def record_tenant(organization_id: Optional[int]) -> None:
+    """Attribute the current request to an organization."""
+    usage = _request_usage.get()
+    if usage is not None and organization_id is not None:
+        usage.organization_id = organization_id
+
+
+class TenantUsageAggregator:
+    def __init__(self) -> None:
+        self._totals: dict[str, TenantTotals] = {}
+        self._lock = threading.Lock()
+
+    def record(self, usage: RequestUsage) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(usage.tenant, TenantTotals())
+            totals.requests += 1
+            totals.sql_statements += usage.sql_statements
+            totals.db_time_seconds += usage.db_time_seconds
+            totals.cpu_time_seconds += usage.cpu_time_seconds
+            totals.response_bytes += usage.response_bytes
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {tenant: asdict(totals) for tenant, totals in self._totals.items()}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._totals.clear()
+
+
+def merge_snapshots(
+    snapshots: list[dict[str, dict[str, Any]]],
+) -> dict[str, TenantTotals]:
+    merged: dict[str, TenantTotals] = {}
+    for snapshot in snapshots:
+        for tenant, values in snapshot.items():
+            merged.setdefault(tenant, TenantTotals()).add(TenantTotals(**values))
+    return merged
+
+
+AGGREGATOR = TenantUsageAggregator()
+
+
+def _usage_store() -> Optional[MultiprocessStore]:
+    directory = get_settings().metrics_multiproc_dir
+    return MultiprocessStore(directory, prefix="tenant_usage") if directory else None
+
+
+def flush() -> None:
+    """Write this worker's totals next to the metrics snapshots, if enabled."""
+    store = _usage_store()
+    if store is None:
+        return
+    try:
+        store.write(AGGREGATOR.snapshot())
+    except OSError as exc:
+        logger.warning("Failed to write tenant usage snapshot: %s", exc)
+
+
+def collect_usage() -> dict[str, TenantTotals]:
+    """Totals of this worker, or of all workers in multiprocess mode."""
+    store = _usage_store()
+    if store is None:
+        return merge_snapshots([AGGREGATOR.snapshot()])
+    flush()
+    return merge_snapshots([snapshot for _pid, snapshot in store.read_all()])
+
+
+class _UsageWriter(threading.Thread):
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="tenant-usage-writer", daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            flush()
+
+
+_writer: Optional[_UsageWriter] = None
+
+
+def start_usage_writer() -> None:
+    global _writer
+    if _usage_store() is None or _writer is not None:
+        return
+    _writer = _UsageWriter(get_settings().metrics_flush_interval_seconds)
+    _writer.start()
+
+
+def stop_usage_writer() -> None:
+    global _writer
+    if _writer is None:
+        return
+    _writer.stopped.set()
+    _writer = None
+    flush()
+
+
+def track_engine_usage(sync_engine: Engine) -> None:
+    """Charge SQL statement counts and DB time to the current request."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if context is not None and _request_usage.get() is not None:
+            context._usage_started = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        started = getattr(context, "_usage_started", None)
+        usage = _request_usage.get()
+        if started is None or usage is None:
+            return
+        usage.sql_statements += 1
+        usage.db_time_seconds += time.perf_counter() - started
@@ -0,0 +1,369 @@
+"""
+Throttled, resumable backfills for large tables.
+
+A single ``UPDATE organization_invitations SET ...`` holds its row locks
+until the whole table is done, and on a replica-backed Postgres it produces
+one huge burst of WAL. A backfill instead walks the table by primary key in
+chunks of ``batch_size`` rows and commits each chunk on its own:
+
+    from app.db.backfill import Backfill, run_in_migration
+
+    def upgrade() -> None:
+        invitations = sa.table(
+            "organization_invitations",
+            sa.column("id", sa.Integer),
+            sa.column("max_uses", sa.Integer),
+        )
+        run_in_migration(
+            Backfill(
+                "invitations_max_uses",
+                invitations,
+                values={"max_uses": 1},
+                where=invitations.c.max_uses.is_(None),
+            )
+        )
+
+Between chunks the runner sleeps for ``pause_seconds``. While replicas lag
+more than ``max_replication_lag`` seconds, or more than ``max_lock_waiters``
+sessions wait on locks, it backs off further. Each chunk runs in its own
+transaction with a transaction-local ``lock_timeout`` (no session-level
+``SET``, so it is safe behind a transaction-mode pooler). A chunk that times out is retried at half the size, so the
+backfill yields to application traffic instead of queueing it behind itself.
+
+Progress is checkpointed in ``backfill_checkpoints`` after every chunk. A
+backfill that was interrupted resumes after the last committed key; a
+finished one is skipped. A chunk can be applied again after a crash between
+its commit and its checkpoint, so updates must be idempotent (a ``where``
+that excludes rows already done, or values that do not depend on the old
+ones). Keys must be integers.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any, Callable, Optional, Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.engine import Connection, Row
+from sqlalchemy.exc import OperationalError
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_TABLE = "backfill_checkpoints"
+# Postgres lock_not_available, raised when lock_timeout expires
+LOCK_NOT_AVAILABLE = "55P03"
+
+# Kept out of Base.metadata: the runner owns it and creates it on first use
+checkpoint_metadata = sa.MetaData()
+checkpoints = sa.Table(
+    CHECKPOINT_TABLE,
+    checkpoint_metadata,
+    sa.Column("name", sa.String(255), primary_key=True),
+    sa.Column("last_key", sa.BigInteger, nullable=True),
+    sa.Column("rows_done", sa.BigInteger, nullable=False, default=0),
+    sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+    sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+)
+
+
+@dataclass
+class Backfill:
+    """
+    Rows of ``table`` to update, visited in ``key`` order.
+
+    Either ``values`` (a SET clause applied to the chunk's key range) or
+    ``process`` (called with the connection and the chunk's rows, for
+    values computed in Python) does the work. ``columns`` selects what
+    ``process`` receives; ``where`` limits both the scan and the update.
+    """
+
+    name: str
+    table: sa.TableClause
+    key: str = "id"
+    values: Optional[dict[str, Any]] = None
+    where: Optional[sa.ColumnElement[bool]] = None
+    process: Optional[Callable[[Connection, Sequence[Row]], None]] = None
+    columns: Sequence[str] = field(default_factory=tuple)
+
+    def __post_init__(self) -> None:
+        if (self.values is None) == (self.process is None):
+            raise ValueError("A backfill needs exactly one of values or process")
+
+
+@dataclass(frozen=True)
+class BackfillProgress:
+    name: str
+    rows_done: int
+    last_key: Optional[int]
+    # Fraction of the key range covered; an estimate when keys are sparse
+    fraction: float
+    rows_per_second: float
+
+
+class BackfillRunner:
+    def __init__(
+        self,
+        connection: Connection,
+        *,
+        batch_size: int = 1000,
+        min_batch_size: int = 50,
+        pause_seconds: float = 0.05,
+        max_replication_lag: float = 5.0,
+        max_lock_waiters: int = 5,
+        lock_timeout_ms: int = 2000,
+        backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 30.0,
+        on_progress: Optional[Callable[[BackfillProgress], None]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.connection = connection
+        self.batch_size = batch_size
+        self.min_batch_size = min_batch_size
+        self.pause_seconds = pause_seconds
+        self.max_replication_lag = max_replication_lag
+        self.max_lock_waiters = max_lock_waiters
+        self.lock_timeout_ms = lock_timeout_ms
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.on_progress = on_progress or _log_progress
+        self.sleep = sleep
+        self.is_postgres = connection.dialect.name == "postgresql"
+        # Every statement commits by itself, e.g. inside autocommit_block()
+        self.autocommit = (
+            connection.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+        )
+        # An explicit BEGIN issued in autocommit mode is open
+        self._explicit_transaction = False
+
+    def run(self, backfill: Backfill) -> int:
+        """Run ``backfill`` to completion; returns the rows handled by this run."""
+        checkpoint_metadata.create_all(self.connection, checkfirst=True)
+        self._commit()
+        state = self._load_checkpoint(backfill.name)
+        if state is not None and state.completed_at is not None:
+            logger.info("Backfill %s already completed, skipping", backfill.name)
+            return 0
+        last_key = state.last_key if state is not None else None
+        rows_done = state.rows_done if state is not None else 0
+
+        key = backfill.table.c[backfill.key]
+        bounds = self.connection.execute(sa.select(sa.func.min(key), sa.func.max(key)))
+        low, high = bounds.one()
+        self._commit()
+
+        started = time.monotonic()
+        handled = 0
+        batch_size = self.batch_size
+        while True:
+            self._throttle()
+            try:
+                self._begin_chunk()
+                count, next_key = self._run_chunk(backfill, last_key, batch_size)
+            except BaseException as exc:
+                self._rollback()
+                if not (
+                    isinstance(exc, OperationalError) and self._is_lock_timeout(exc)
+                ):
+                    raise
+                batch_size = max(self.min_batch_size, batch_size // 2)
+                logger.warning(
+                    "Backfill %s hit lock_timeout, retrying with %d rows",
+                    backfill.name,
+                    batch_size,
+                )
+                self.sleep(self.backoff_seconds)
+                continue
+            if next_key is None:
+                self._commit()
+                break
+            last_key = next_key
+            rows_done += count
+            handled += count
+            self._save_checkpoint(backfill.name, last_key, rows_done)
+            self._commit()
+            # Grow back towards the configured size after a lock timeout
+            batch_size = min(self.batch_size, batch_size * 2)
+            elapsed = time.monotonic() - started
+            self.on_progress(
+                BackfillProgress(
+                    backfill.name,
+                    rows_done,
+                    last_key,
+                    _fraction(low, high, last_key),
+                    handled / elapsed if elapsed > 0 else 0.0,
+                )
+            )
+            self.sleep(self.pause_seconds)
+        self._save_checkpoint(backfill.name, last_key, rows_done, completed=True)
+        self._commit()
+        logger.info("Backfill %s completed: %d rows", backfill.name, rows_done)
+        return handled
+
+    def _begin_chunk(self) -> None:
+        """
+        Start the chunk's transaction with ``lock_timeout`` set for it alone.
+
+        A transaction-local setting ends with the chunk, whether it commits
+        or rolls back, and never outlives it on a pooled server connection.
+        In autocommit mode every statement is its own transaction, so the
+        chunk opens an explicit one.
+        """
+        if not self.is_postgres:
+            return
+        if self.autocommit:
+            self.connection.execute(sa.text("BEGIN"))
+            self._explicit_transaction = True
+        self.connection.execute(
+            sa.text("SELECT set_config('lock_timeout', :timeout, true)"),
+            {"timeout": f"{int(self.lock_timeout_ms)}ms"},
+        )
+
+    def _run_chunk(
+        self, backfill: Backfill, last_key: Optional[int], batch_size: int
+    ) -> tuple[int, Optional[int]]:
+        """Apply one chunk; returns the rows in it and its last key (None when done)."""
+        table = backfill.table
+        key = table.c[backfill.key]
+        scan = sa.true() if last_key is None else key > last_key
+        if backfill.where is not None:
+            scan = sa.and_(scan, backfill.where)
+        columns = [key, *(table.c[name] for name in backfill.columns)]
+        rows = self.connection.execute(
+            sa.select(*columns).where(scan).order_by(key).limit(batch_size)
+        ).all()
+        if not rows:
+            return 0, None
+        upper = rows[-1][0]
+        if backfill.process is not None:
+            backfill.process(self.connection, rows)
+        else:
+            self.connection.execute(
+                table.update().where(scan, key <= upper).values(**backfill.values)
+            )
+        return len(rows), upper
+
+    def _throttle(self) -> None:
+        """Wait while replicas lag or sessions queue on locks."""
+        if not self.is_postgres:
+            return
+        delay = self.backoff_seconds
+        while True:
+            lag = self._replication_lag()
+            waiters = self._lock_waiters()
+            if lag <= self.max_replication_lag and waiters <= self.max_lock_waiters:
+                return
+            logger.info(
+                "Backfill paused %.1fs: replication lag %.1fs, %d lock waiters",
+                delay,
+                lag,
+                waiters,
+            )
+            self.sleep(delay)
+            delay = min(delay * 2, self.max_backoff_seconds)
+
+    def _replication_lag(self) -> float:
+        lag = self.connection.scalar(
+            sa.text(
+                "SELECT COALESCE(EXTRACT(EPOCH FROM MAX(replay_lag)), 0) "
+                "FROM pg_stat_replication"
+            )
+        )
+        self._commit()
+        return float(lag or 0)
+
+    def _lock_waiters(self) -> int:
+        waiters = self.connection.scalar(
+            sa.text("SELECT count(*) FROM pg_locks WHERE NOT granted")
+        )
+        self._commit()
+        return int(waiters or 0)
+
+    @staticmethod
+    def _is_lock_timeout(exc: OperationalError) -> bool:
+        orig = exc.orig
+        code = getattr(orig, "pgcode", None) or getattr(orig, "sqlstate", None)
+        return code == LOCK_NOT_AVAILABLE
+
+    def _load_checkpoint(self, name: str) -> Optional[Row]:
+        row = self.connection.execute(
+            sa.select(checkpoints).where(checkpoints.c.name == name)
+        ).one_or_none()
+        self._commit()
+        return row
+
+    def _save_checkpoint(
+        self,
+        name: str,
+        last_key: Optional[int],
+        rows_done: int,
+        *,
+        completed: bool = False,
+    ) -> None:
+        now = datetime.now(UTC)
+        values = {
+            "last_key": last_key,
+            "rows_done": rows_done,
+            "updated_at": now,
+            "completed_at": now if completed else None,
+        }
+        updated = self.connection.execute(
+            checkpoints.update().where(checkpoints.c.name == name).values(**values)
+        )
+        if updated.rowcount == 0:
+            self.connection.execute(checkpoints.insert().values(name=name, **values))
+
+    def _commit(self) -> None:
+        if self._explicit_transaction:
+            self.connection.execute(sa.text("COMMIT"))
+            self._explicit_transaction = False
+        elif not self.autocommit and self.connection.in_transaction():
+            self.connection.commit()
+
+    def _rollback(self) -> None:
+        if self._explicit_transaction:
+            self.connection.execute(sa.text("ROLLBACK"))
+            self._explicit_transaction = False
+        elif not self.autocommit and self.connection.in_transaction():
+            self.connection.rollback()
+
+
+def _fraction(low: Optional[int], high: Optional[int], last_key: int) -> float:
+    if low is None or high is None or high <= low:
+        return 1.0
+    return min(1.0, max(0.0, (last_key - low) / (high - low)))
+
+
+def _log_progress(progress: BackfillProgress) -> None:
+    logger.info(
+        "Backfill %s: %d rows, key %s (~%.0f%%), %.0f rows/s",
+        progress.name,
+        progress.rows_done,
+        progress.last_key,
+        progress.fraction * 100,
+        progress.rows_per_second,
+    )
+
+
+def run_in_migration(backfill: Backfill, **options: Any) -> int:
+    """
+    Run ``backfill`` from an Alembic revision.
+
+    Chunks commit individually, so the revision's transaction is committed
+    first and the backfill runs in autocommit mode; schema changes after it
+    run in a new transaction. In offline (``--sql``) mode the update is
+    emitted as one plain statement for the DBA to run.
+    """
+    from alembic import op
+
+    context = op.get_context()
+    if context.as_sql:
+        if backfill.values is None:
+            raise RuntimeError(f"Backfill {backfill.name} cannot run in --sql mode")
+        update = backfill.table.update().values(**backfill.values)
+        if backfill.where is not None:
+            update = update.where(backfill.where)
+        op.execute(update)
+        return 0
+    with context.autocommit_block():
+        return BackfillRunner(op.get_bind(), **options).run(backfill)
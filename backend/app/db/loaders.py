@@ -0,0 +1,46 @@
+"""
+Named eager-loading profiles.
+
+Every relationship is declared with ``lazy="raise"``, so touching one that
+was not loaded raises instead of issuing a hidden query (or failing with
+``MissingGreenlet`` under asyncio). Queries that need related rows opt in
+to a profile:
+
+    select(UserOrganization).options(*loader_options(LoadProfile.MEMBER_LISTING))
+
+Many-to-one profiles use ``joinedload(innerjoin=True)`` so the rows arrive
+in the same statement. Profiles for collections should use
+``selectinload`` (one extra statement per collection, however many parents).
+"""
+
+from enum import Enum
+from typing import Tuple
+
+from app.models.organization import OrganizationInvitation, UserOrganization
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.interfaces import LoaderOption
+
+
+class LoadProfile(str, Enum):
+    # UserOrganization rows with their user, for the team page
+    MEMBER_LISTING = "member_listing"
+    # UserOrganization rows with their organization, for "my organizations"
+    USER_ORGANIZATIONS = "user_organizations"
+    # Invitation with its organization, for the join and preview flows
+    INVITATION_DETAIL = "invitation_detail"
+
+
+_PROFILES: dict[LoadProfile, Tuple[LoaderOption, ...]] = {
+    LoadProfile.MEMBER_LISTING: (joinedload(UserOrganization.user, innerjoin=True),),
+    LoadProfile.USER_ORGANIZATIONS: (
+        joinedload(UserOrganization.organization, innerjoin=True),
+    ),
+    LoadProfile.INVITATION_DETAIL: (
+        joinedload(OrganizationInvitation.organization, innerjoin=True),
+    ),
+}
+
+
+def loader_options(profile: LoadProfile) -> Tuple[LoaderOption, ...]:
+    """Loader options for ``profile``; pass them to ``Select.options``."""
+    return _PROFILES[profile]
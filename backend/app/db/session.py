@@ -1,20 +1,106 @@
-from typing import AsyncGenerator
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator
+from uuid import uuid4
 
+from app.core.cache import invalidate_pending
 from app.core.config import get_async_database_url, get_settings
+from app.core.metrics import DB_POOL_CONNECTIONS, REGISTRY
+from app.core.tracing import instrument_engine
+from app.core.usage import track_engine_usage
+from app.tasks.deferred import discard_deferred, dispatch_deferred
+from sqlalchemy import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid4().hex}__"
+
+
+def engine_options(database_url: str, pooler_mode: bool) -> dict[str, Any]:
+    """
+    Extra ``create_async_engine`` options for ``database_url``.
+
+    Pooler mode targets PgBouncer (or a similar pooler) in transaction mode,
+    where consecutive transactions of one client connection may run on
+    different server connections. The pooler already pools, so the app opens
+    a connection per session (``NullPool``). asyncpg's prepared statements
+    would otherwise be reused on a server connection that never prepared
+    them, or collide with another client's statement of the same name; both
+    statement caches are disabled and every statement gets a unique name.
+    """
+    if not pooler_mode:
+        return {}
+    options: dict[str, Any] = {"poolclass": NullPool}
+    if make_url(database_url).get_driver_name() == "asyncpg":
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": _unique_statement_name,
+        }
+    return options
+
 
 settings = get_settings()
+database_url = get_async_database_url(settings.database_url)
 engine = create_async_engine(
-    get_async_database_url(settings.database_url), future=True, echo=False
+    database_url,
+    future=True,
+    echo=False,
+    **engine_options(database_url, settings.database_pooler_mode),
 )
+instrument_engine(engine.sync_engine)
+track_engine_usage(engine.sync_engine)
 async_session_factory = async_sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
 )
 
 
-async def get_session() -> AsyncGenerator[AsyncSession, None]:
+def _collect_pool_stats() -> None:
+    pool = engine.pool
+    for state in ("size", "checkedin", "checkedout", "overflow"):
+        reader = getattr(pool, state, None)
+        if callable(reader):
+            DB_POOL_CONNECTIONS.labels(state).set(reader())
+
+
+REGISTRY.add_collector(_collect_pool_stats)
+
+
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[AsyncSession]:
+    """
+    Session that commits once at the end, or rolls back if the block raises.
+
+    Cache tags invalidated inside the block are invalidated again once the
+    transaction has ended, and deferred tasks are sent only after a
+    successful commit. ``get_session`` wraps it for requests; background
+    jobs use it directly.
+    """
     async with async_session_factory() as session:
         try:
             yield session
+            if session.in_transaction():
+                await session.commit()
+            await dispatch_deferred(session)
+        except BaseException:
+            discard_deferred(session)
+            await session.rollback()
+            raise
         finally:
+            await invalidate_pending(session)
             await session.close()
+
+
+async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Request-scoped unit of work (see ``unit_of_work``).
+
+    Services only flush; the whole request commits once here, or rolls back
+    if the handler raises (including ``HTTPException``). Declare it with
+    ``Depends(get_session, scope="function")`` so the commit runs before the
+    response is sent and a failed commit becomes an error response instead
+    of a silently lost write.
+    """
+    async with unit_of_work() as session:
+        yield session
@@ -1,13 +1,47 @@
 import logging
+from contextlib import asynccontextmanager
 
 from app.api.v1.routers import api_router
+from app.core.admission import configure_admission
+from app.core.cache import close_cache, configure_cache
 from app.core.config import get_settings
+from app.core.idempotency import close_idempotency, configure_idempotency
 from app.core.logging import setup_logging
+from app.core.loop_monitor import start_loop_monitor, stop_loop_monitor
+from app.core.metrics import start_snapshot_writer, stop_snapshot_writer
+from app.core.rate_limit import close_rate_limiter, configure_rate_limiter
+from app.core.responses import ORJSONResponse
+from app.core.scheduler import start_scheduler, stop_scheduler
+from app.core.tracing import configure_tracing, tracer
+from app.core.usage import start_usage_writer, stop_usage_writer
 from app.middleware import register_middlewares
+from app.tasks.periodic import PERIODIC_JOBS
 from fastapi import FastAPI
 
 settings = get_settings()
 setup_logging(getattr(logging, settings.log_level.upper(), logging.INFO))
+configure_tracing()
+configure_cache()
+configure_rate_limiter()
+configure_idempotency()
+configure_admission()
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    start_snapshot_writer()
+    start_usage_writer()
+    start_loop_monitor()
+    start_scheduler(PERIODIC_JOBS)
+    yield
+    await stop_scheduler()
+    await stop_loop_monitor()
+    stop_usage_writer()
+    stop_snapshot_writer()
+    await close_cache()
+    await close_rate_limiter()
+    await close_idempotency()
+    tracer.shutdown()
 
 
 def create_app() -> FastAPI:
@@ -15,6 +49,8 @@ def create_app() -> FastAPI:
         title=settings.app_name,
         version="0.1.0",
         docs_url=f"{settings.api_v1_prefix}/docs" if settings.api_v1_prefix else None,
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
     )
     register_middlewares(app_instance)
     app_instance.include_router(api_router, prefix=settings.api_v1_prefix)
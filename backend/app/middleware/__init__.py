@@ -1,5 +1,11 @@
 from app.core.config import get_settings
+from app.middleware.admission import AdmissionControlMiddleware
+from app.middleware.idempotency import IdempotencyMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.rate_limit import RateLimitHeadersMiddleware
 from app.middleware.request_timing import RequestTimingMiddleware
+from app.middleware.tracing import TracingMiddleware
+from app.middleware.usage import TenantUsageMiddleware
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -7,14 +13,43 @@ from fastapi.middleware.cors import CORSMiddleware
 def register_middlewares(app: FastAPI) -> None:
     settings = get_settings()
 
-    # CORS middleware - must be added first
+    # Idempotency-Key replay (inside the rate limit headers, which describe
+    # the current request rather than the stored one)
+    app.add_middleware(IdempotencyMiddleware)
+
+    # RateLimit-* headers for routes guarded by a rate_limit dependency
+    app.add_middleware(RateLimitHeadersMiddleware)
+
+    # Admission control - sheds overload before any request work is done,
+    # inside the timing and tracing middlewares so 503s are still recorded
+    app.add_middleware(AdmissionControlMiddleware)
+
+    # Request timing middleware
+    app.add_middleware(RequestTimingMiddleware)
+
+    # Per-tenant usage accounting (outside the timing middleware's task)
+    app.add_middleware(TenantUsageMiddleware)
+
+    # Debug-header profiling middleware
+    app.add_middleware(ProfilingMiddleware)
+
+    # Tracing middleware - wraps everything but CORS
+    app.add_middleware(TracingMiddleware)
+
+    # CORS middleware - must be added last, so every response gets CORS
+    # headers, including 503s from admission control and idempotency replays
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.cors_origins,
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "Retry-After",
+            "RateLimit-Limit",
+            "RateLimit-Remaining",
+            "RateLimit-Reset",
+            "RateLimit-Policy",
+            "Idempotent-Replayed",
+        ],
     )
-
-    # Request timing middleware
-    app.add_middleware(RequestTimingMiddleware)
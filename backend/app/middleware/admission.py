@@ -0,0 +1,64 @@
+import asyncio
+import time
+from typing import Optional
+
+from app.core import admission
+from app.core.admission import Priority, Shed, classify
+from app.core.responses import ORJSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class AdmissionControlMiddleware:
+    """Admit requests through the adaptive limiter; shed the rest with 503."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        controller = admission.controller
+        if scope["type"] != "http" or not controller.enabled:
+            await self.app(scope, receive, send)
+            return
+        priority = classify(scope["path"])
+        if priority is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await controller.acquire(priority)
+        except Shed as exc:
+            response = ORJSONResponse(
+                {"detail": "Server is busy, please try again later."},
+                status_code=503,
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        status: Optional[int] = None
+        ok = True
+        latency: Optional[float] = None
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except asyncio.CancelledError:
+            # The client gave up; that says nothing about how the server did
+            raise
+        except BaseException:
+            ok = False
+            raise
+        else:
+            if status is not None:
+                ok = status < 500
+                # Low priority routes are slow by nature; only their errors count
+                if priority is not Priority.LOW:
+                    latency = time.perf_counter() - started
+        finally:
+            controller.release(latency, ok=ok)
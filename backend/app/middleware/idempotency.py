@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from app.core import idempotency
+from app.core.config import get_settings
+from app.core.idempotency import (
+    MAX_KEY_LENGTH,
+    PENDING_TTL_SECONDS,
+    IdempotencyRecord,
+    StoredResponse,
+    fingerprint,
+    storage_key,
+)
+from app.core.responses import ORJSONResponse
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+MUTATING_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+REPLAYED_HEADER = (b"idempotent-replayed", b"true")
+
+
+def _should_store(status: int) -> bool:
+    # Server errors and throttling are transient; a retry should run again
+    return status < 500 and status != 429
+
+
+class _Execute(Exception):
+    """The key is claimed by this request, which must run the handler."""
+
+
+class IdempotencyMiddleware:
+    """Replay stored responses for retried requests with an Idempotency-Key."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        settings = get_settings()
+        self.ttl_seconds = settings.idempotency_ttl_seconds
+        self.wait_seconds = settings.idempotency_wait_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in MUTATING_METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        key = headers.get("idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            response = ORJSONResponse(
+                {"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"},
+                status_code=400,
+            )
+            await response(scope, receive, send)
+            return
+
+        body = await _read_body(receive)
+        if body is None:
+            return
+        replay_receive = _replay_body(body, receive)
+        record_key = storage_key(key, headers.get("authorization", "").encode())
+        request_fingerprint = fingerprint(
+            scope["method"], scope["path"], scope["query_string"], body
+        )
+
+        try:
+            response = await self._existing_response(record_key, request_fingerprint)
+        except _Execute:
+            await self._execute(
+                scope, replay_receive, send, record_key, request_fingerprint
+            )
+            return
+        except Exception as exc:
+            logger.warning("Idempotency store failed, running request: %s", exc)
+            await self.app(scope, replay_receive, send)
+            return
+        await response(scope, replay_receive, send)
+
+    async def _existing_response(
+        self, record_key: str, request_fingerprint: str
+    ) -> Response:
+        """
+        The response to send instead of running the handler. Raises ``_Execute``
+        once this request holds the claim, including after an earlier attempt
+        released it by failing.
+        """
+        pending = IdempotencyRecord(request_fingerprint).dumps()
+        deadline = time.monotonic() + self.wait_seconds
+        delay = 0.02
+        while True:
+            if await idempotency.store.claim(record_key, pending, PENDING_TTL_SECONDS):
+                raise _Execute
+            raw = await idempotency.store.get(record_key)
+            if raw is not None:
+                record = IdempotencyRecord.loads(raw)
+                if record.fingerprint != request_fingerprint:
+                    return ORJSONResponse(
+                        {
+                            "detail": "Idempotency-Key was already used for a "
+                            "different request"
+                        },
+                        status_code=422,
+                    )
+                if record.response is not None:
+                    return _replay(record.response)
+            if time.monotonic() >= deadline:
+                return ORJSONResponse(
+                    {"detail": "A request with this Idempotency-Key is in progress"},
+                    status_code=409,
+                    headers={"Retry-After": "1"},
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.5)
+
+    async def _execute(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        record_key: str,
+        request_fingerprint: str,
+    ) -> None:
+        status = 0
+        headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+        finished = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, headers, finished
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    # Stored before the last chunk goes out, so a retry that
+                    # follows the response always finds it
+                    finished = True
+                    await self._finish(
+                        record_key,
+                        IdempotencyRecord(
+                            request_fingerprint,
+                            StoredResponse(status, headers, b"".join(chunks)),
+                        ),
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not finished:
+                await self._release(record_key)
+
+    async def _finish(self, record_key: str, record: IdempotencyRecord) -> None:
+        if not _should_store(record.response.status):
+            await self._release(record_key)
+            return
+        try:
+            await idempotency.store.set(record_key, record.dumps(), self.ttl_seconds)
+        except Exception as exc:
+            logger.warning("Failed to store idempotent response: %s", exc)
+
+    async def _release(self, record_key: str) -> None:
+        try:
+            await idempotency.store.delete(record_key)
+        except Exception as exc:
+            logger.warning("Failed to release idempotency key: %s", exc)
+
+
+async def _read_body(receive: Receive) -> Optional[bytes]:
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+
+def _replay_body(body: bytes, receive: Receive) -> Receive:
+    sent = False
+
+    async def replay() -> Message:
+        nonlocal sent
+        if sent:
+            return await receive()
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return replay
+
+
+def _replay(stored: StoredResponse) -> Response:
+    response = Response(stored.body, status_code=stored.status)
+    response.raw_headers = [*stored.headers, REPLAYED_HEADER]
+    return response
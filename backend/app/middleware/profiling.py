@@ -0,0 +1,40 @@
+from app.core.profiler import RequestProfile, worker_id
+from app.core.security import is_admin_token
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEBUG_PROFILE_HEADER = "x-debug-profile"
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests that carry ``X-Debug-Profile: <admin token>``.
+
+    The response gets ``X-Profile-Id`` and ``X-Worker-Id`` headers; the
+    collapsed stacks are served by ``GET /admin/profiler/profiles/{id}`` on
+    the same worker.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = Headers(scope=scope).get(DEBUG_PROFILE_HEADER)
+        if token is None or not is_admin_token(token):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Profile-Id"] = profile.id
+                headers["X-Worker-Id"] = worker_id()
+            await send(message)
+
+        with profile:
+            await self.app(scope, receive, send_wrapper)
@@ -1,6 +1,8 @@
 import time
 from typing import Awaitable, Callable
 
+from app.core.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS
+from app.utils.routing import route_template
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
@@ -10,7 +12,15 @@ class RequestTimingMiddleware(BaseHTTPMiddleware):
         self, request: Request, call_next: Callable[[Request], Awaitable[Response]]
     ) -> Response:
         start_time = time.perf_counter()
-        response = await call_next(request)
-        process_time = (time.perf_counter() - start_time) * 1000
-        response.headers["X-Process-Time"] = f"{process_time:.2f}ms"
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+        finally:
+            elapsed = time.perf_counter() - start_time
+            # Label by route template to keep cardinality bounded
+            route = route_template(request.scope)
+            HTTP_REQUESTS.labels(request.method, route, status_code).inc()
+            HTTP_REQUEST_DURATION.labels(request.method, route).observe(elapsed)
+        response.headers["X-Process-Time"] = f"{elapsed * 1000:.2f}ms"
         return response
@@ -0,0 +1,50 @@
+from app.core.tracing import SPAN_KIND_SERVER, _current_span, parse_traceparent, tracer
+from app.utils.routing import route_template
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class TracingMiddleware:
+    """
+    Open a server span around every HTTP request.
+
+    Implemented as plain ASGI middleware so the span is active before any
+    ``BaseHTTPMiddleware`` copies the context into its own task.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not tracer.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        method = scope["method"]
+        span = tracer.create_span(
+            method,
+            kind=SPAN_KIND_SERVER,
+            remote_parent=parse_traceparent(headers.get("traceparent")),
+            attributes={"http.method": method, "http.target": scope["path"]},
+        )
+        token = _current_span.set(span)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = "error"
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            span.record_exception(exc)
+            raise
+        finally:
+            route = route_template(scope)
+            span.name = f"{method} {route}"
+            span.set_attribute("http.route", route)
+            span.end()
+            _current_span.reset(token)
@@ -0,0 +1,32 @@
+import time
+
+from app.core.usage import AGGREGATOR, RequestUsage, _request_usage
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class TenantUsageMiddleware:
+    """Open a per-request usage accumulator and fold it into tenant totals."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        usage = RequestUsage()
+        token = _request_usage.set(usage)
+        cpu_started = time.thread_time()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.body":
+                usage.response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            usage.cpu_time_seconds = time.thread_time() - cpu_started
+            _request_usage.reset(token)
+            AGGREGATOR.record(usage)
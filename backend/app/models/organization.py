@@ -48,6 +48,14 @@ class Organization(Base):
     # Status
     is_active: bool = Column(Boolean, default=True, nullable=False)
 
+    # Change counters (bumped on membership/invitation writes, used for ETags)
+    members_version: int = Column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    invitations_version: int = Column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+
     # Timestamps
     created_at: datetime = Column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -60,13 +68,20 @@ class Organization(Base):
     )
 
     # Relationships
+    # Relationships never lazy load; opt in via app.db.loaders profiles
     members = relationship(
-        "UserOrganization", back_populates="organization", cascade="all, delete-orphan"
+        "UserOrganization",
+        back_populates="organization",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
     )
     invitations = relationship(
         "OrganizationInvitation",
         back_populates="organization",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
     )
 
 
@@ -106,10 +121,15 @@ class UserOrganization(Base):
 
     # Relationships
     user = relationship(
-        "User", foreign_keys="UserOrganization.user_id", back_populates="organizations"
+        "User",
+        foreign_keys="UserOrganization.user_id",
+        back_populates="organizations",
+        lazy="raise",
+    )
+    organization = relationship("Organization", back_populates="members", lazy="raise")
+    inviter = relationship(
+        "User", foreign_keys="UserOrganization.invited_by", lazy="raise"
     )
-    organization = relationship("Organization", back_populates="members")
-    inviter = relationship("User", foreign_keys="UserOrganization.invited_by")
 
 
 class OrganizationInvitation(Base):
@@ -157,8 +177,12 @@ class OrganizationInvitation(Base):
     )
 
     # Relationships
-    organization = relationship("Organization", back_populates="invitations")
-    creator = relationship("User", foreign_keys="OrganizationInvitation.created_by")
+    organization = relationship(
+        "Organization", back_populates="invitations", lazy="raise"
+    )
+    creator = relationship(
+        "User", foreign_keys="OrganizationInvitation.created_by", lazy="raise"
+    )
 
     @staticmethod
     def generate_code() -> str:
@@ -3,8 +3,9 @@ from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
 from app.db.base import Base
+from app.utils.email import normalize_email
 from sqlalchemy import Boolean, Column, DateTime, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 
 if TYPE_CHECKING:
@@ -21,6 +22,8 @@ class User(Base):
 
     id: int = Column(Integer, primary_key=True, index=True)
     email: str = Column(String(255), unique=True, nullable=False, index=True)
+    # Lookup key, kept in sync with email by the validator below
+    email_normalized: str = Column(String(255), unique=True, nullable=False, index=True)
     hashed_password: Optional[str] = Column(
         String(255), nullable=True
     )  # Nullable for OAuth users
@@ -51,14 +54,21 @@ class User(Base):
     )
     last_login_at: Optional[datetime] = Column(DateTime(timezone=True), nullable=True)
 
-    # Relationships
+    # Relationships never lazy load; opt in via app.db.loaders profiles
     organizations = relationship(
         "UserOrganization",
         foreign_keys="UserOrganization.user_id",
         back_populates="user",
         cascade="all, delete-orphan",
+        passive_deletes=True,
+        lazy="raise",
     )
 
+    @validates("email")
+    def _sync_email_normalized(self, _key: str, email: str) -> str:
+        self.email_normalized = normalize_email(email)
+        return email
+
     def set_password(self, password_hash: str) -> None:
         self.hashed_password = password_hash
 
@@ -0,0 +1,27 @@
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel
+
+TenantUsageSort = Literal[
+    "requests",
+    "sql_statements",
+    "db_time_seconds",
+    "cpu_time_seconds",
+    "response_bytes",
+]
+
+
+class TenantUsage(BaseModel):
+    """Accumulated resource usage of one organization (None = unscoped requests)"""
+
+    organization_id: Optional[int] = None
+    requests: int
+    sql_statements: int
+    db_time_seconds: float
+    cpu_time_seconds: float
+    response_bytes: int
+
+
+class TenantUsageReport(BaseModel):
+    sort_by: TenantUsageSort
+    tenants: List[TenantUsage]
@@ -0,0 +1,30 @@
+from typing import Any, Dict, List, Literal
+
+from pydantic import BaseModel, Field
+
+MAX_BATCH_REQUESTS = 20
+
+
+class BatchItem(BaseModel):
+    """One sub-request; ``path`` is relative to the API prefix, e.g. ``/auth/me``."""
+
+    id: str = Field(..., min_length=1, max_length=64)
+    method: Literal["GET"] = "GET"
+    path: str = Field(..., max_length=2048, pattern=r"^/([^/#\s][^#\s]*)?$")
+    # Only conditional request headers are forwarded (see FORWARDED_HEADERS)
+    headers: Dict[str, str] = Field(default_factory=dict)
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1, max_length=MAX_BATCH_REQUESTS)
+
+
+class BatchItemResponse(BaseModel):
+    id: str
+    status: int
+    headers: Dict[str, str]
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchItemResponse]
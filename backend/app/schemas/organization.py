@@ -119,6 +119,32 @@ class InvitationWithLink(InvitationResponse):
     link: str
 
 
+# Upper bound on invitations accepted by one bulk request
+MAX_BULK_INVITATIONS = 500
+
+
+class BulkInvitationItem(BaseModel):
+    """One addressee of a bulk invitation request."""
+
+    email: EmailStr
+    role: OrganizationRole = OrganizationRole.MEMBER
+
+
+class BulkInvitationCreate(BaseModel):
+    """Schema for inviting many people at once."""
+
+    invitations: List[BulkInvitationItem] = Field(
+        ..., min_length=1, max_length=MAX_BULK_INVITATIONS
+    )
+
+
+class BulkInvitationResponse(BaseModel):
+    """Invitations created by a bulk request."""
+
+    invitations: List[InvitationWithLink]
+    total: int
+
+
 class JoinOrganizationRequest(BaseModel):
     """Schema for joining an organization via invitation code."""
 
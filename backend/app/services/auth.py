@@ -2,6 +2,7 @@ import logging
 from datetime import timedelta
 from typing import Optional
 
+from app.core.cache import invalidate_tags
 from app.core.config import get_settings
 from app.core.security import (
     create_access_token,
@@ -10,6 +11,7 @@ from app.core.security import (
     get_password_hash,
     verify_password,
 )
+from app.core.tracing import http_client_span, tracer
 from app.models import user as user_models
 from app.models.user import AuthProvider
 from app.schemas.auth import (
@@ -23,6 +25,7 @@ from app.schemas.auth import (
 )
 from app.schemas.user import UserCreateOAuth, UserRead
 from app.services.user import UserService
+from app.tasks.deferred import defer
 from fastapi import HTTPException, status
 from google.auth.transport import requests as google_requests
 from google.oauth2 import id_token
@@ -33,6 +36,18 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+class _TracedGoogleRequest(google_requests.Request):
+    """google-auth transport that records a client span per HTTP call."""
+
+    def __call__(self, url, method="GET", body=None, headers=None, **kwargs):
+        with http_client_span(method, url) as span:
+            response = super().__call__(
+                url, method=method, body=body, headers=headers, **kwargs
+            )
+            span.set_attribute("http.status_code", response.status)
+            return response
+
+
 class AuthService:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
@@ -192,12 +207,12 @@ class AuthService:
 
     async def get_current_user(self, user_id: int) -> UserRead:
         """Get current user by ID"""
-        user = await self.user_service.get_by_id(user_id)
-        if not user:
+        user_read = await self.user_service.get_user_read(user_id)
+        if not user_read:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
-        return UserRead.model_validate(user)
+        return user_read
 
     async def request_password_reset(self, email: str) -> dict:
         """
@@ -206,6 +221,7 @@ class AuthService:
         - Set password (OAuth user wants to add password login)
         """
         from app.services.email import email_service
+        from app.tasks.email import send_password_reset_email
 
         user = await self.user_service.get_by_email(email)
 
@@ -214,19 +230,17 @@ class AuthService:
             logger.info("Password reset requested for non-existent email %s", email)
             return {"message": "If this email exists, a reset link has been sent"}
 
-        # Generate reset token and send email
+        # Generate reset token and queue the email
         reset_token = email_service.generate_password_reset_token(user.id)
-        success = email_service.send_password_reset_email(
+        defer(
+            self.session,
+            send_password_reset_email,
             to_email=user.email,
             user_name=user.full_name,
             reset_token=reset_token,
         )
 
-        if success:
-            logger.info("Password reset email sent to %s", email)
-        else:
-            logger.warning("Failed to send password reset email to %s", email)
-
+        logger.info("Password reset email queued for %s", email)
         return {"message": "If this email exists, a reset link has been sent"}
 
     async def request_password_reset_authenticated(self, user_id: int) -> dict:
@@ -235,6 +249,7 @@ class AuthService:
         Used when user clicks "Change Password" or "Set Password" in settings.
         """
         from app.services.email import email_service
+        from app.tasks.email import send_password_reset_email
 
         user = await self.user_service.get_by_id(user_id)
         if not user:
@@ -242,21 +257,17 @@ class AuthService:
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
             )
 
-        # Generate reset token and send email
+        # Generate reset token and queue the email
         reset_token = email_service.generate_password_reset_token(user.id)
-        success = email_service.send_password_reset_email(
+        defer(
+            self.session,
+            send_password_reset_email,
             to_email=user.email,
             user_name=user.full_name,
             reset_token=reset_token,
         )
 
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to send password reset email",
-            )
-
-        logger.info("Password reset email sent to authenticated user %s", user.email)
+        logger.info("Password reset email queued for authenticated user %s", user.email)
         return {"message": "Password reset email sent"}
 
     async def reset_password(
@@ -303,9 +314,9 @@ class AuthService:
         user_read = await self.user_service.set_password(user, hashed_password)
 
         # Send confirmation email
-        from app.services.email import email_service
+        from app.tasks.email import send_password_changed_email
 
-        email_service.send_password_changed_email(user.email, user.full_name)
+        defer(self.session, send_password_changed_email, user.email, user.full_name)
 
         logger.info("Password reset successfully for user %s", user.email)
         return user_read
@@ -323,8 +334,8 @@ class AuthService:
         if full_name is not None:
             user.full_name = full_name
 
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        await invalidate_tags(self.session, f"user:{user.id}")
 
         logger.info("User %s updated profile", user.email)
         return UserRead.model_validate(user)
@@ -372,13 +383,14 @@ class AuthService:
         # Update auth provider if it was email only
         if user.auth_provider == AuthProvider.EMAIL.value:
             user.auth_provider = AuthProvider.GOOGLE.value
-            await self.session.commit()
-            await self.session.refresh(user)
+            await self.session.flush()
+            await invalidate_tags(self.session, f"user:{user.id}")
             user_read = UserRead.model_validate(user)
 
         logger.info("User %s linked Google account", user.email)
         return user_read
 
+    @tracer.traced("auth.verify_google_token")
     async def _verify_google_token(self, token: str) -> GoogleUserInfo:
         """Verify Google ID token and extract user info"""
         if not settings.google_client_id:
@@ -392,7 +404,7 @@ class AuthService:
             # This handles slight time differences between Google's servers and ours
             id_info = id_token.verify_oauth2_token(
                 token,
-                google_requests.Request(),
+                _TracedGoogleRequest(),
                 settings.google_client_id,
                 clock_skew_in_seconds=5,
             )
@@ -424,13 +436,16 @@ class AuthService:
     ) -> None:
         """Send verification email to user"""
         from app.services.email import email_service
+        from app.tasks.email import send_verification_email
 
         verification_token = email_service.generate_verification_token(user_id)
-        success = email_service.send_verification_email(
-            to_email=email, user_name=name, verification_token=verification_token
+        defer(
+            self.session,
+            send_verification_email,
+            to_email=email,
+            user_name=name,
+            verification_token=verification_token,
         )
-        if not success:
-            logger.warning("Failed to send verification email to %s", email)
 
     async def verify_email(self, token: str) -> UserRead:
         """Verify user email with token"""
@@ -459,9 +474,9 @@ class AuthService:
         user_read = await self.user_service.verify_user(user)
 
         # Send welcome email
-        from app.services.email import email_service
+        from app.tasks.email import send_welcome_email
 
-        email_service.send_welcome_email(user.email, user.full_name)
+        defer(self.session, send_welcome_email, user.email, user.full_name)
 
         logger.info("User %s verified email successfully", user.email)
         return user_read
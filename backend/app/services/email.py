@@ -2,46 +2,147 @@ import logging
 import smtplib
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from app.core.config import get_settings
+from app.core.metrics import EMAIL_SENDS
 from app.core.security import create_access_token
+from app.core.tracing import SPAN_KIND_CLIENT, tracer
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+class BulkSendAborted(Exception):
+    """The SMTP session failed after ``position`` of the messages were handled."""
+
+    def __init__(self, position: int, sent: int) -> None:
+        super().__init__(f"Bulk send aborted at message {position}")
+        self.position = position
+        self.sent = sent
+
+
+def is_temporary_refusal(exc: smtplib.SMTPRecipientsRefused) -> bool:
+    """4xx per-recipient replies (e.g. greylisting) may succeed later."""
+    return bool(exc.recipients) and all(
+        400 <= code < 500 for code, _message in exc.recipients.values()
+    )
+
+
 class EmailService:
-    def __init__(self):
+    def __init__(self, raise_errors: bool = False):
+        # Background tasks raise so their retry policy can see the failure
+        self.raise_errors = raise_errors
         self.smtp_host = settings.smtp_host
         self.smtp_port = settings.smtp_port
         self.smtp_user = settings.smtp_user
         self.smtp_password = settings.smtp_password
         self.email_from = settings.email_from
 
+    def _build_message(self, to_email: str, subject: str, html_content: str) -> str:
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = subject
+        msg["From"] = self.email_from
+        msg["To"] = to_email
+
+        html_part = MIMEText(html_content, "html")
+        msg.attach(html_part)
+        return msg.as_string()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.smtp_host, self.smtp_port)
+        if self.smtp_user and self.smtp_password:
+            try:
+                server.starttls()
+                server.login(self.smtp_user, self.smtp_password)
+            except BaseException:
+                # Not yet inside a with block, so nothing else closes it
+                server.close()
+                raise
+        return server
+
     def _send_email(self, to_email: str, subject: str, html_content: str) -> bool:
         """Send an email using SMTP"""
         try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = self.email_from
-            msg["To"] = to_email
-
-            html_part = MIMEText(html_content, "html")
-            msg.attach(html_part)
-
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                if self.smtp_user and self.smtp_password:
-                    server.starttls()
-                    server.login(self.smtp_user, self.smtp_password)
-                server.sendmail(self.email_from, to_email, msg.as_string())
+            message = self._build_message(to_email, subject, html_content)
+            with (
+                tracer.start_span(
+                    "smtp.send",
+                    kind=SPAN_KIND_CLIENT,
+                    attributes={
+                        "net.peer.name": self.smtp_host,
+                        "email.subject": subject,
+                    },
+                ),
+                self._connect() as server,
+            ):
+                server.sendmail(self.email_from, to_email, message)
 
             logger.info("Email sent successfully to %s", to_email)
+            EMAIL_SENDS.labels("sent").inc()
             return True
         except Exception as e:
             logger.error("Failed to send email to %s: %s", to_email, str(e))
+            EMAIL_SENDS.labels("failed").inc()
+            if self.raise_errors:
+                raise
             return False
 
+    def send_bulk(
+        self,
+        messages: List[Tuple[str, str, str]],
+        deferred: Optional[List[int]] = None,
+    ) -> int:
+        """
+        Send (to_email, subject, html_content) messages over one SMTP
+        connection. A failed recipient does not stop the batch; returns the
+        number of messages sent. Indexes of messages refused with a 4xx
+        reply are appended to ``deferred``, so the caller can retry them.
+        """
+        if not messages:
+            return 0
+        sent = 0
+        position = 0
+        try:
+            with (
+                tracer.start_span(
+                    "smtp.send_bulk",
+                    kind=SPAN_KIND_CLIENT,
+                    attributes={
+                        "net.peer.name": self.smtp_host,
+                        "email.count": len(messages),
+                    },
+                ),
+                self._connect() as server,
+            ):
+                for to_email, subject, html_content in messages:
+                    try:
+                        server.sendmail(
+                            self.email_from,
+                            to_email,
+                            self._build_message(to_email, subject, html_content),
+                        )
+                    except smtplib.SMTPRecipientsRefused as e:
+                        if deferred is not None and is_temporary_refusal(e):
+                            logger.warning("Email to %s deferred: %s", to_email, e)
+                            EMAIL_SENDS.labels("deferred").inc()
+                            deferred.append(position)
+                        else:
+                            logger.error("Failed to send email to %s: %s", to_email, e)
+                            EMAIL_SENDS.labels("failed").inc()
+                        position += 1
+                        continue
+                    sent += 1
+                    position += 1
+                    EMAIL_SENDS.labels("sent").inc()
+        except Exception as e:
+            logger.error("Bulk email send aborted after %d messages: %s", sent, e)
+            EMAIL_SENDS.labels("failed").inc(len(messages) - position)
+            if self.raise_errors:
+                raise BulkSendAborted(position, sent) from e
+        logger.info("Bulk email sent %d of %d messages", sent, len(messages))
+        return sent
+
     def generate_verification_token(self, user_id: int) -> str:
         """Generate a verification token for email verification"""
         from datetime import timedelta
@@ -277,20 +378,18 @@ class EmailService:
         subject = "Добредојдовте на e-Faktura!"
         return self._send_email(to_email, subject, html_content)
 
-    def send_organization_invitation_email(
+    def _render_organization_invitation(
         self,
-        to_email: str,
         organization_name: str,
         inviter_name: Optional[str],
         role: str,
         invitation_code: str,
         base_url: str = "http://localhost:5173",
         user_exists: bool = False,
-    ) -> bool:
-        """Send organization invitation email.
+    ) -> Tuple[str, str]:
+        """Render the subject and HTML body of an organization invitation.
 
         Args:
-            to_email: Email address to send the invitation to.
             organization_name: Name of the organization the user is invited to.
             inviter_name: Name of the person who sent the invitation.
             role: Role the invited user will have in the organization.
@@ -299,7 +398,7 @@ class EmailService:
             user_exists: If True, sends to login page. If False, sends to register page.
 
         Returns:
-            True if email was sent successfully, False otherwise.
+            The subject and the HTML content.
         """
         # Link goes to the join page which handles all auth states
         join_url = f"/organization/join?code={invitation_code}"
@@ -380,8 +479,69 @@ class EmailService:
         """
 
         subject = f"Покана за приклучување на {organization_name} - e-Faktura"
+        return subject, html_content
+
+    def send_organization_invitation_email(
+        self,
+        to_email: str,
+        organization_name: str,
+        inviter_name: Optional[str],
+        role: str,
+        invitation_code: str,
+        base_url: str = "http://localhost:5173",
+        user_exists: bool = False,
+    ) -> bool:
+        """Send organization invitation email. Returns True if it was sent."""
+        subject, html_content = self._render_organization_invitation(
+            organization_name,
+            inviter_name,
+            role,
+            invitation_code,
+            base_url,
+            user_exists,
+        )
         return self._send_email(to_email, subject, html_content)
 
+    def send_organization_invitation_emails(
+        self,
+        organization_name: str,
+        inviter_name: Optional[str],
+        invitations: List[Tuple[str, str, str, bool]],
+        base_url: str = "http://localhost:5173",
+    ) -> int:
+        """
+        Send many invitations over one SMTP connection.
+
+        ``invitations`` holds (to_email, role, invitation_code, user_exists)
+        tuples. Returns the number of emails sent.
+        """
+        return self.send_bulk(
+            self.render_organization_invitations(
+                organization_name, inviter_name, invitations, base_url
+            )
+        )
+
+    def render_organization_invitations(
+        self,
+        organization_name: str,
+        inviter_name: Optional[str],
+        invitations: List[Tuple[str, str, str, bool]],
+        base_url: str = "http://localhost:5173",
+    ) -> List[Tuple[str, str, str]]:
+        """(to_email, subject, html_content) messages for ``send_bulk``."""
+        messages = []
+        for to_email, role, invitation_code, user_exists in invitations:
+            subject, html_content = self._render_organization_invitation(
+                organization_name,
+                inviter_name,
+                role,
+                invitation_code,
+                base_url,
+                user_exists,
+            )
+            messages.append((to_email, subject, html_content))
+        return messages
+
 
 # Singleton instance
 email_service = EmailService()
@@ -1,6 +1,10 @@
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional, Tuple
 
+from app.core.cache import cached, invalidate_tags
+from app.core.metrics import INVITATION_REDEMPTIONS
+from app.core.permissions import ROLE_HIERARCHY, OrgPermission, has_permission
+from app.db.loaders import LoadProfile, loader_options
 from app.models.organization import (
     Organization,
     OrganizationInvitation,
@@ -9,6 +13,7 @@ from app.models.organization import (
 )
 from app.models.user import User
 from app.schemas.organization import (
+    BulkInvitationItem,
     InvitationCreate,
     InvitationWithLink,
     OrganizationCreate,
@@ -16,17 +21,47 @@ from app.schemas.organization import (
     OrganizationWithRole,
     TeamMember,
 )
+from app.tasks.deferred import defer
+from app.utils.email import normalize_email
 from pydantic.v1 import EmailStr
-from sqlalchemy import and_, select
+from sqlalchemy import Row, and_, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import aliased
 
 # Invitation validity duration (30 minutes)
 INVITATION_VALIDITY_MINUTES = 30
 
+# Rounds of regenerating colliding invitation codes before giving up
+INVITATION_CODE_ATTEMPTS = 5
+
 
 class OrganizationService:
-    """Service for organization-related operations."""
+    """
+    Service for organization-related operations.
+
+    Methods flush but do not commit; the session dependency commits once
+    per request.
+    """
+
+    @staticmethod
+    async def _bump_change_counters(
+        db: AsyncSession,
+        organization_id: int,
+        *,
+        members: bool = False,
+        invitations: bool = False,
+    ) -> None:
+        """Increment the ETag change counters without touching updated_at."""
+        values = {"updated_at": Organization.updated_at}
+        if members:
+            values["members_version"] = Organization.members_version + 1
+        if invitations:
+            values["invitations_version"] = Organization.invitations_version + 1
+        await db.execute(
+            update(Organization)
+            .where(Organization.id == organization_id)
+            .values(**values)
+        )
 
     @staticmethod
     async def create_organization(
@@ -55,9 +90,8 @@ class OrganizationService:
             role=OrganizationRole.OWNER,
         )
         db.add(user_org)
-        await db.commit()
-        await db.refresh(organization)
-        await db.refresh(user_org)
+        await db.flush()
+        await invalidate_tags(db, f"user:{owner_id}")
 
         return organization, user_org
 
@@ -80,13 +114,21 @@ class OrganizationService:
         return result.scalar_one_or_none()
 
     @staticmethod
+    @cached(
+        "user_organizations",
+        key=lambda db, user_id: user_id,
+        tags=lambda db, user_id: [f"user:{user_id}"],
+        result_tags=lambda organizations: [f"org:{org.id}" for org in organizations],
+        # Served next to a database-derived ETag, so never from a stale tier
+        local_ttl=0,
+    )
     async def get_user_organizations(
         db: AsyncSession, user_id: int
     ) -> List[OrganizationWithRole]:
         """Get all organizations for a user with their roles."""
         result = await db.execute(
             select(UserOrganization)
-            .options(selectinload(UserOrganization.organization))
+            .options(*loader_options(LoadProfile.USER_ORGANIZATIONS))
             .where(
                 and_(
                     UserOrganization.user_id == user_id,
@@ -137,6 +179,80 @@ class OrganizationService:
         user_org = result.scalar_one_or_none()
         return user_org.role if user_org else None
 
+    @staticmethod
+    async def get_membership_validators(
+        db: AsyncSession,
+        user_id: int,
+        organization_id: int,
+        *,
+        include_member_profiles: bool = False,
+    ) -> Optional[Row]:
+        """
+        Get the user's membership and the organization's change validators
+        (updated_at and change counters) in a single query.
+        Returns None if the user is not an active member.
+
+        With include_member_profiles the latest profile change of any active
+        member is added as members_updated_at.
+        """
+        columns = [
+            UserOrganization.role,
+            UserOrganization.joined_at,
+            Organization.updated_at,
+            Organization.members_version,
+            Organization.invitations_version,
+        ]
+        if include_member_profiles:
+            member = aliased(UserOrganization)
+            columns.append(
+                select(func.max(User.updated_at))
+                .join(member, member.user_id == User.id)
+                .where(
+                    and_(
+                        member.organization_id == organization_id,
+                        member.is_active,
+                    )
+                )
+                .scalar_subquery()
+                .label("members_updated_at")
+            )
+
+        result = await db.execute(
+            select(*columns)
+            .join(Organization, Organization.id == UserOrganization.organization_id)
+            .where(
+                and_(
+                    UserOrganization.user_id == user_id,
+                    UserOrganization.organization_id == organization_id,
+                    UserOrganization.is_active,
+                )
+            )
+        )
+        return result.one_or_none()
+
+    @staticmethod
+    async def get_user_organizations_validators(
+        db: AsyncSession, user_id: int
+    ) -> List[Row]:
+        """Get the ETag validators of every active membership of a user."""
+        result = await db.execute(
+            select(
+                UserOrganization.organization_id,
+                UserOrganization.role,
+                UserOrganization.joined_at,
+                Organization.updated_at,
+            )
+            .join(Organization, Organization.id == UserOrganization.organization_id)
+            .where(
+                and_(
+                    UserOrganization.user_id == user_id,
+                    UserOrganization.is_active,
+                )
+            )
+            .order_by(UserOrganization.organization_id)
+        )
+        return list(result.all())
+
     @staticmethod
     async def is_user_member(
         db: AsyncSession, user_id: int, organization_id: int
@@ -163,8 +279,10 @@ class OrganizationService:
             max_uses=data.max_uses,
         )
         db.add(invitation)
-        await db.commit()
-        await db.refresh(invitation)
+        await OrganizationService._bump_change_counters(
+            db, organization_id, invitations=True
+        )
+        await db.flush()
         return invitation
 
     @staticmethod
@@ -176,8 +294,8 @@ class OrganizationService:
     ) -> InvitationWithLink:
         """Create invitation and optionally send email notification."""
         from app.core.config import get_settings
-        from app.services.email import email_service
         from app.services.user import UserService
+        from app.tasks.email import send_organization_invitation_email
 
         settings = get_settings()
 
@@ -201,7 +319,9 @@ class OrganizationService:
             user_exists = existing_user is not None
 
             if organization:
-                email_service.send_organization_invitation_email(
+                defer(
+                    db,
+                    send_organization_invitation_email,
                     to_email=data.target_email,
                     organization_name=organization.company_name,
                     inviter_name=inviter.full_name if inviter else None,
@@ -225,6 +345,82 @@ class OrganizationService:
             link=link,
         )
 
+    @staticmethod
+    async def _unique_invitation_codes(db: AsyncSession, count: int) -> List[str]:
+        """Generate ``count`` codes unused in the database, checking in bulk."""
+        codes: set[str] = set()
+        for _ in range(INVITATION_CODE_ATTEMPTS):
+            while len(codes) < count:
+                codes.add(OrganizationInvitation.generate_code())
+            result = await db.execute(
+                select(OrganizationInvitation.code).where(
+                    OrganizationInvitation.code.in_(list(codes))
+                )
+            )
+            taken = set(result.scalars().all())
+            if not taken:
+                return list(codes)
+            codes -= taken
+        raise RuntimeError("Could not generate unique invitation codes")
+
+    @staticmethod
+    async def create_invitations_bulk(
+        db: AsyncSession,
+        organization_id: int,
+        inviter_id: int,
+        items: List[BulkInvitationItem],
+    ) -> Tuple[List[OrganizationInvitation], List[Tuple[str, str, str, bool]]]:
+        """
+        Create one single-use invitation per addressee.
+
+        Repeated addresses (after normalization) are invited once. The
+        invitations are written with one INSERT ... RETURNING, and existing
+        accounts are resolved with one IN query. Returns the invitations and
+        the (email, role, code, user_exists) tuples to mail.
+        """
+        unique: dict[str, BulkInvitationItem] = {}
+        for item in items:
+            unique.setdefault(normalize_email(str(item.email)), item)
+
+        codes = await OrganizationService._unique_invitation_codes(db, len(unique))
+        expires_at = datetime.now(timezone.utc) + timedelta(
+            minutes=INVITATION_VALIDITY_MINUTES
+        )
+        result = await db.scalars(
+            insert(OrganizationInvitation).returning(OrganizationInvitation),
+            [
+                {
+                    "organization_id": organization_id,
+                    "code": code,
+                    "created_by": inviter_id,
+                    "target_email": str(item.email),
+                    "role": item.role,
+                    "expires_at": expires_at,
+                    "max_uses": 1,
+                }
+                for code, item in zip(codes, unique.values())
+            ],
+        )
+        invitations = list(result.all())
+        await OrganizationService._bump_change_counters(
+            db, organization_id, invitations=True
+        )
+
+        result = await db.execute(
+            select(User.email_normalized).where(User.email_normalized.in_(list(unique)))
+        )
+        existing = set(result.scalars().all())
+        notifications = [
+            (
+                invitation.target_email,
+                invitation.role.value,
+                invitation.code,
+                normalize_email(invitation.target_email) in existing,
+            )
+            for invitation in invitations
+        ]
+        return invitations, notifications
+
     @staticmethod
     async def get_invitation_by_code(
         db: AsyncSession, code: str
@@ -232,7 +428,7 @@ class OrganizationService:
         """Get invitation by code."""
         result = await db.execute(
             select(OrganizationInvitation)
-            .options(selectinload(OrganizationInvitation.organization))
+            .options(*loader_options(LoadProfile.INVITATION_DETAIL))
             .where(OrganizationInvitation.code == code)
         )
         return result.scalar_one_or_none()
@@ -253,7 +449,11 @@ class OrganizationService:
         if not invitation.is_active:
             return False, "Оваа покана е деактивирана.", None
 
-        if invitation.expires_at < datetime.now(timezone.utc):
+        expires_at = invitation.expires_at
+        if expires_at.tzinfo is None:
+            # SQLite drops the offset; stored values are always UTC
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        if expires_at < datetime.now(timezone.utc):
             return False, "Оваа покана е истечена.", None
 
         if invitation.max_uses and invitation.use_count >= invitation.max_uses:
@@ -275,6 +475,7 @@ class OrganizationService:
         )
 
         if not is_valid or not invitation:
+            INVITATION_REDEMPTIONS.labels("invalid").inc()
             return False, message, None, None
 
         # Check if user is already an active member
@@ -282,13 +483,17 @@ class OrganizationService:
             db, user_id, invitation.organization_id
         )
         if is_member:
+            INVITATION_REDEMPTIONS.labels("already_member").inc()
             return False, "Веќе сте член на оваа организација.", None, None
 
         # Check if invitation is for specific email
         if invitation.target_email:
-            result = await db.execute(select(User).where(User.id == user_id))
-            user = result.scalar_one_or_none()
-            if user and user.email.lower() != invitation.target_email.lower():
+            result = await db.execute(
+                select(User.email_normalized).where(User.id == user_id)
+            )
+            user_email = result.scalar_one_or_none()
+            if user_email and user_email != normalize_email(invitation.target_email):
+                INVITATION_REDEMPTIONS.labels("email_mismatch").inc()
                 return False, "Оваа покана е наменета за друга е-пошта.", None, None
 
         # Check if there's an existing inactive membership (user was previously removed)
@@ -322,17 +527,19 @@ class OrganizationService:
         if invitation.use_count >= invitation.max_uses:
             invitation.is_active = False
 
-        await db.commit()
-
-        # Get the organization
-        organization = await OrganizationService.get_organization_by_id(
-            db, invitation.organization_id
+        await OrganizationService._bump_change_counters(
+            db, invitation.organization_id, members=True, invitations=True
         )
+        await db.flush()
+        await invalidate_tags(
+            db, f"user:{user_id}", f"org:{invitation.organization_id}"
+        )
+        INVITATION_REDEMPTIONS.labels("joined").inc()
 
         return (
             True,
             "Успешно се приклучивте на организацијата!",
-            organization,
+            invitation.organization,
             invitation.role,
         )
 
@@ -351,18 +558,27 @@ class OrganizationService:
         for field, value in update_data.items():
             setattr(organization, field, value)
 
-        await db.commit()
+        await db.flush()
+        await invalidate_tags(db, f"org:{organization_id}")
+        # onupdate expires updated_at; reload it for the response
         await db.refresh(organization)
         return organization
 
     @staticmethod
     async def deactivate_invitation(
-        db: AsyncSession, invitation_id: int, user_id: int
+        db: AsyncSession,
+        organization_id: int,
+        invitation_id: int,
+        user_id: int,
+        role: OrganizationRole,
     ) -> bool:
-        """Deactivate an invitation (only by creator or org admin)."""
+        """Deactivate an invitation (only by its creator or an org manager)."""
         result = await db.execute(
             select(OrganizationInvitation).where(
-                OrganizationInvitation.id == invitation_id
+                and_(
+                    OrganizationInvitation.id == invitation_id,
+                    OrganizationInvitation.organization_id == organization_id,
+                )
             )
         )
         invitation = result.scalar_one_or_none()
@@ -370,21 +586,41 @@ class OrganizationService:
         if not invitation:
             return False
 
-        # Check if user has permission (creator or admin/owner of org)
-        role = await OrganizationService.get_user_role_in_organization(
-            db, user_id, invitation.organization_id
-        )
-
-        if invitation.created_by != user_id and role not in [
-            OrganizationRole.OWNER,
-            OrganizationRole.ADMIN,
-        ]:
+        if invitation.created_by != user_id and not has_permission(
+            role, OrgPermission.MANAGE_INVITATIONS
+        ):
             return False
 
         invitation.is_active = False
-        await db.commit()
+        await OrganizationService._bump_change_counters(
+            db, invitation.organization_id, invitations=True
+        )
+        await db.flush()
         return True
 
+    @staticmethod
+    async def deactivate_expired_invitations(db: AsyncSession) -> int:
+        """Deactivate every active invitation past its expiry; returns the count."""
+        result = await db.execute(
+            update(OrganizationInvitation)
+            .where(
+                and_(
+                    OrganizationInvitation.is_active,
+                    OrganizationInvitation.expires_at < datetime.now(timezone.utc),
+                )
+            )
+            .values(is_active=False)
+            .returning(OrganizationInvitation.organization_id)
+            .execution_options(synchronize_session=False)
+        )
+        organization_ids = result.scalars().all()
+        for organization_id in sorted(set(organization_ids)):
+            await OrganizationService._bump_change_counters(
+                db, organization_id, invitations=True
+            )
+        await db.flush()
+        return len(organization_ids)
+
     @staticmethod
     async def get_organization_invitations(
         db: AsyncSession, organization_id: int
@@ -398,13 +634,21 @@ class OrganizationService:
         return list(result.scalars().all())
 
     @staticmethod
+    @cached(
+        "organization_members",
+        key=lambda db, organization_id: organization_id,
+        tags=lambda db, organization_id: [f"org:{organization_id}"],
+        result_tags=lambda members: [f"user:{member.user_id}" for member in members],
+        # Served next to a database-derived ETag, so never from a stale tier
+        local_ttl=0,
+    )
     async def get_organization_members(
         db: AsyncSession, organization_id: int
     ) -> List[TeamMember]:
         """Get all members of an organization with their user details."""
         result = await db.execute(
             select(UserOrganization)
-            .options(selectinload(UserOrganization.user))
+            .options(*loader_options(LoadProfile.MEMBER_LISTING))
             .where(
                 and_(
                     UserOrganization.organization_id == organization_id,
@@ -432,12 +676,56 @@ class OrganizationService:
 
         return members
 
+    @staticmethod
+    def check_member_removal(
+        requester_role: OrganizationRole, member_role: OrganizationRole
+    ) -> Optional[str]:
+        """Return why the requester may not remove the member, or None if allowed."""
+        if not has_permission(requester_role, OrgPermission.MANAGE_MEMBERS):
+            return "Немате дозвола да отстранувате членови."
+
+        # Can only remove users with lower authority
+        if ROLE_HIERARCHY.get(requester_role, 99) >= ROLE_HIERARCHY.get(
+            member_role, 99
+        ):
+            return "Немате дозвола да го отстраните овој член."
+        return None
+
+    @staticmethod
+    def check_role_change(
+        requester_role: OrganizationRole,
+        member_role: OrganizationRole,
+        new_role: OrganizationRole,
+    ) -> Optional[str]:
+        """Return why the requester may not assign ``new_role``, or None if allowed."""
+        requester_level = ROLE_HIERARCHY.get(requester_role, 99)
+
+        if not has_permission(requester_role, OrgPermission.MANAGE_MEMBERS):
+            return "Немате дозвола да менувате улоги."
+
+        # Cannot change to owner role
+        if new_role == OrganizationRole.OWNER:
+            return "Не може да се додели улога на сопственик."
+
+        # Can only change roles of users with lower authority
+        if requester_level >= ROLE_HIERARCHY.get(member_role, 99):
+            return "Немате дозвола да ја промените улогата на овој член."
+
+        # Admin cannot promote someone to admin level
+        if (
+            requester_role == OrganizationRole.ADMIN
+            and ROLE_HIERARCHY.get(new_role, 99) <= requester_level
+        ):
+            return "Немате дозвола да доделите оваа улога."
+        return None
+
     @staticmethod
     async def remove_member(
         db: AsyncSession,
         organization_id: int,
         member_id: int,
         requester_id: int,
+        requester_role: OrganizationRole,
     ) -> Tuple[bool, str]:
         """
         Remove a member from an organization.
@@ -467,37 +755,17 @@ class OrganizationService:
         if member.user_id == requester_id:
             return False, "Не можете да се отстраните себеси."
 
-        # Get requester's role
-        requester_role = await OrganizationService.get_user_role_in_organization(
-            db, requester_id, organization_id
-        )
-
-        if not requester_role:
-            return False, "Немате пристап до оваа организација."
-
-        # Define role hierarchy (lower number = higher authority)
-        role_hierarchy = {
-            OrganizationRole.OWNER: 0,
-            OrganizationRole.ADMIN: 1,
-            OrganizationRole.ACCOUNTANT: 2,
-            OrganizationRole.MEMBER: 3,
-            OrganizationRole.VIEWER: 4,
-        }
-
-        requester_level = role_hierarchy.get(requester_role, 99)
-        member_level = role_hierarchy.get(member.role, 99)
-
-        # Only owner and admin can remove members
-        if requester_role not in [OrganizationRole.OWNER, OrganizationRole.ADMIN]:
-            return False, "Немате дозвола да отстранувате членови."
-
-        # Can only remove users with lower authority
-        if requester_level >= member_level:
-            return False, "Немате дозвола да го отстраните овој член."
+        denied = OrganizationService.check_member_removal(requester_role, member.role)
+        if denied:
+            return False, denied
 
         # Deactivate the membership (soft delete)
         member.is_active = False
-        await db.commit()
+        await OrganizationService._bump_change_counters(
+            db, organization_id, members=True
+        )
+        await db.flush()
+        await invalidate_tags(db, f"org:{organization_id}", f"user:{member.user_id}")
 
         return True, "Членот е успешно отстранет."
 
@@ -508,6 +776,7 @@ class OrganizationService:
         member_id: int,
         new_role: OrganizationRole,
         requester_id: int,
+        requester_role: OrganizationRole,
     ) -> Tuple[bool, str]:
         """
         Change a member's role in an organization.
@@ -538,49 +807,19 @@ class OrganizationService:
         if member.user_id == requester_id:
             return False, "Не можете да ја промените сопствената улога."
 
-        # Get requester's role
-        requester_role = await OrganizationService.get_user_role_in_organization(
-            db, requester_id, organization_id
+        denied = OrganizationService.check_role_change(
+            requester_role, member.role, new_role
         )
-
-        if not requester_role:
-            return False, "Немате пристап до оваа организација."
-
-        # Define role hierarchy (lower number = higher authority)
-        role_hierarchy = {
-            OrganizationRole.OWNER: 0,
-            OrganizationRole.ADMIN: 1,
-            OrganizationRole.ACCOUNTANT: 2,
-            OrganizationRole.MEMBER: 3,
-            OrganizationRole.VIEWER: 4,
-        }
-
-        requester_level = role_hierarchy.get(requester_role, 99)
-        member_current_level = role_hierarchy.get(member.role, 99)
-        new_role_level = role_hierarchy.get(new_role, 99)
-
-        # Only owner and admin can change roles
-        if requester_role not in [OrganizationRole.OWNER, OrganizationRole.ADMIN]:
-            return False, "Немате дозвола да менувате улоги."
-
-        # Cannot change to owner role
-        if new_role == OrganizationRole.OWNER:
-            return False, "Не може да се додели улога на сопственик."
-
-        # Can only change roles of users with lower authority
-        if requester_level >= member_current_level:
-            return False, "Немате дозвола да ја промените улогата на овој член."
-
-        # Admin cannot promote someone to admin level
-        if (
-            requester_role == OrganizationRole.ADMIN
-            and new_role_level <= requester_level
-        ):
-            return False, "Немате дозвола да доделите оваа улога."
+        if denied:
+            return False, denied
 
         # Update the role
         member.role = new_role
-        await db.commit()
+        await OrganizationService._bump_change_counters(
+            db, organization_id, members=True
+        )
+        await db.flush()
+        await invalidate_tags(db, f"org:{organization_id}", f"user:{member.user_id}")
 
         return True, "Улогата е успешно променета."
 
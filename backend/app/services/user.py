@@ -2,40 +2,27 @@ import logging
 from datetime import UTC, datetime
 from typing import List, Optional
 
+from app.core.cache import cached, invalidate_tags
 from app.core.security import get_password_hash
 from app.models import user as user_models
+from app.models.organization import OrganizationInvitation, UserOrganization
 from app.models.user import AuthProvider
 from app.schemas.user import UserCreate, UserCreateOAuth, UserRead
-from sqlalchemy import select
+from app.utils.email import normalize_email
+from sqlalchemy import delete, exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 logger = logging.getLogger(__name__)
 
 
-def normalize_email(email: str) -> str:
+class UserService:
     """
-    Normalize email address for consistent storage and lookup.
-
-    Gmail ignores dots in the local part, so:
-    - pipo.jordanoski@gmail.com
-    - pipojordanoski@gmail.com
-    - p.i.p.o.jordanoski@gmail.com
+    User persistence helpers.
 
-    Are all the same inbox. This function normalizes Gmail addresses
-    by removing dots from the local part.
+    Methods flush their changes but never commit; the request's session
+    dependency commits once when the handler returns.
     """
-    email = email.lower().strip()
-    local_part, domain = email.rsplit("@", 1)
-
-    # Gmail and Google-hosted domains ignore dots
-    gmail_domains = {"gmail.com", "googlemail.com"}
-    if domain in gmail_domains:
-        local_part = local_part.replace(".", "")
 
-    return f"{local_part}@{domain}"
-
-
-class UserService:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
 
@@ -47,10 +34,21 @@ class UserService:
         logger.debug("Fetched user by id %s => %s", user_id, bool(user))
         return user
 
+    @cached(
+        "user_read",
+        key=lambda self, user_id: user_id,
+        tags=lambda self, user_id: [f"user:{user_id}"],
+    )
+    async def get_user_read(self, user_id: int) -> Optional[UserRead]:
+        user = await self.get_by_id(user_id)
+        return UserRead.model_validate(user) if user else None
+
     async def get_by_email(self, email: str) -> Optional[user_models.User]:
         normalized = normalize_email(str(email))
         result = await self.session.execute(
-            select(user_models.User).where(user_models.User.email == normalized)
+            select(user_models.User).where(
+                user_models.User.email_normalized == normalized
+            )
         )
         user = result.scalar_one_or_none()
         logger.debug(
@@ -82,8 +80,9 @@ class UserService:
             is_verified=False,
         )
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        # A lookup of this id may have cached "no such user"
+        await invalidate_tags(self.session, f"user:{user.id}")
         logger.info("Created user %s", user.email)
         return UserRead.model_validate(user)
 
@@ -99,14 +98,15 @@ class UserService:
             is_verified=payload.is_verified,
         )
         self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        # A lookup of this id may have cached "no such user"
+        await invalidate_tags(self.session, f"user:{user.id}")
         logger.info("Created OAuth user %s via %s", user.email, payload.auth_provider)
         return UserRead.model_validate(user)
 
     async def update_last_login(self, user: user_models.User) -> None:
         user.last_login_at = datetime.now(UTC)
-        await self.session.commit()
+        await self.session.flush()
         logger.debug("Updated last login for user %s", user.email)
 
     async def set_password(
@@ -114,16 +114,16 @@ class UserService:
     ) -> UserRead:
         """Set password for a user (typically OAuth users adding password login)"""
         user.hashed_password = hashed_password
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        await invalidate_tags(self.session, f"user:{user.id}")
         logger.info("Password set for user %s", user.email)
         return UserRead.model_validate(user)
 
     async def verify_user(self, user: user_models.User) -> UserRead:
         """Mark user as verified"""
         user.is_verified = True
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        await invalidate_tags(self.session, f"user:{user.id}")
         logger.info("User %s verified", user.email)
         return UserRead.model_validate(user)
 
@@ -145,11 +145,45 @@ class UserService:
         if not user.is_verified:
             user.is_verified = True
             logger.info("User %s auto-verified via Google OAuth", user.email)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self.session.flush()
+        await invalidate_tags(self.session, f"user:{user.id}")
         logger.debug("Updated OAuth info for user %s", user.email)
         return UserRead.model_validate(user)
 
+    async def purge_unverified(
+        self, created_before: datetime, limit: int = 1000
+    ) -> int:
+        """
+        Delete up to ``limit`` users who never verified their email, signed up
+        before ``created_before`` and have no organization or invitations.
+        """
+        user = user_models.User
+        result = await self.session.execute(
+            select(user.id)
+            .where(
+                ~user.is_verified,
+                user.created_at < created_before,
+                ~exists().where(UserOrganization.user_id == user.id),
+                ~exists().where(OrganizationInvitation.created_by == user.id),
+            )
+            .order_by(user.id)
+            .limit(limit)
+        )
+        user_ids = result.scalars().all()
+        if not user_ids:
+            return 0
+        await self.session.execute(
+            delete(user)
+            .where(user.id.in_(user_ids))
+            .execution_options(synchronize_session=False)
+        )
+        await self.session.flush()
+        await invalidate_tags(
+            self.session, *(f"user:{user_id}" for user_id in user_ids)
+        )
+        logger.info("Purged %d unverified users", len(user_ids))
+        return len(user_ids)
+
     async def list_users(self) -> List[UserRead]:
         result = await self.session.execute(select(user_models.User))
         records = [UserRead.model_validate(user) for user in result.scalars().all()]
@@ -0,0 +1,40 @@
+"""
+Tasks sent once the request's transaction commits.
+
+Services call ``defer(session, task, ...)`` instead of sending a task
+directly. ``get_session`` sends the deferred tasks after a successful commit
+and drops them on rollback, so a worker never picks up a task for rows it
+cannot see yet, and a failed request sends no email.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+DEFERRED_TASKS_KEY = "deferred_tasks"
+
+
+def defer(session: AsyncSession, task: Any, /, *args: Any, **kwargs: Any) -> None:
+    """Send ``task(*args, **kwargs)`` once ``session``'s transaction commits."""
+    session.info.setdefault(DEFERRED_TASKS_KEY, []).append((task, args, kwargs))
+
+
+def discard_deferred(session: AsyncSession) -> None:
+    session.info.pop(DEFERRED_TASKS_KEY, None)
+
+
+async def dispatch_deferred(session: AsyncSession) -> None:
+    """
+    Send the tasks deferred on ``session``. The data is already committed,
+    so a broker failure is logged rather than failing the request.
+    """
+    for task, args, kwargs in session.info.pop(DEFERRED_TASKS_KEY, ()):
+        try:
+            # The broker client blocks; eager mode even runs the task itself
+            await asyncio.to_thread(task.apply_async, args, kwargs)
+        except Exception:
+            logger.exception("Failed to send task %s", task.name)
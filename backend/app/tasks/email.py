@@ -0,0 +1,133 @@
+"""
+Email sending tasks.
+
+Each task wraps the matching ``EmailService`` method and retries transient
+SMTP failures with ``SMTP_RETRY``. Tasks take only JSON-serializable
+arguments; tokens and links are built by the caller, so a retry sends the
+same email.
+"""
+
+from typing import List, Optional
+
+from app.services.email import BulkSendAborted, EmailService
+from app.tasks.retry import SMTP_RETRY
+from app.tasks.worker import celery_app
+
+# Delays before re-sending invitations the server greylisted (4xx for some
+# recipients); greylisting servers accept a retry after a few minutes
+GREYLIST_RETRY_DELAYS = (300, 900, 3600)
+
+# Raises instead of returning False, so failures reach the retry policy and
+# the task result
+mailer = EmailService(raise_errors=True)
+
+
+@celery_app.task(name="email.send_password_reset")
+def send_password_reset_email(
+    to_email: str,
+    user_name: Optional[str],
+    reset_token: str,
+    base_url: str = "http://localhost:5173",
+) -> bool:
+    return SMTP_RETRY.call(
+        mailer.send_password_reset_email, to_email, user_name, reset_token, base_url
+    )
+
+
+@celery_app.task(name="email.send_password_changed")
+def send_password_changed_email(to_email: str, user_name: Optional[str]) -> bool:
+    return SMTP_RETRY.call(mailer.send_password_changed_email, to_email, user_name)
+
+
+@celery_app.task(name="email.send_verification")
+def send_verification_email(
+    to_email: str,
+    user_name: Optional[str],
+    verification_token: str,
+    base_url: str = "http://localhost:5173",
+) -> bool:
+    return SMTP_RETRY.call(
+        mailer.send_verification_email,
+        to_email,
+        user_name,
+        verification_token,
+        base_url,
+    )
+
+
+@celery_app.task(name="email.send_welcome")
+def send_welcome_email(to_email: str, user_name: Optional[str]) -> bool:
+    return SMTP_RETRY.call(mailer.send_welcome_email, to_email, user_name)
+
+
+@celery_app.task(name="email.send_organization_invitation")
+def send_organization_invitation_email(
+    to_email: str,
+    organization_name: str,
+    inviter_name: Optional[str],
+    role: str,
+    invitation_code: str,
+    base_url: str = "http://localhost:5173",
+    user_exists: bool = False,
+) -> bool:
+    return SMTP_RETRY.call(
+        mailer.send_organization_invitation_email,
+        to_email,
+        organization_name,
+        inviter_name,
+        role,
+        invitation_code,
+        base_url,
+        user_exists,
+    )
+
+
+@celery_app.task(name="email.send_organization_invitations")
+def send_organization_invitation_emails(
+    organization_name: str,
+    inviter_name: Optional[str],
+    invitations: List[List],
+    base_url: str = "http://localhost:5173",
+    greylist_attempt: int = 0,
+) -> int:
+    """
+    Send ``invitations`` ((to_email, role, code, user_exists) items) over one
+    SMTP connection. A retry resumes after the messages already handled, so
+    nobody gets the same invitation twice. Recipients refused with a 4xx
+    reply are sent again by a delayed task of their own. Returns the number
+    sent.
+    """
+    messages = mailer.render_organization_invitations(
+        organization_name, inviter_name, invitations, base_url
+    )
+    position = 0
+    sent = 0
+    deferred: List[int] = []
+
+    def send_remaining() -> None:
+        nonlocal position, sent
+        start = position
+        refused: List[int] = []
+        try:
+            sent += mailer.send_bulk(messages[position:], refused)
+        except BulkSendAborted as exc:
+            position += exc.position
+            sent += exc.sent
+            raise
+        finally:
+            deferred.extend(start + index for index in refused)
+        position = len(messages)
+
+    SMTP_RETRY.call(send_remaining)
+    if deferred and greylist_attempt < len(GREYLIST_RETRY_DELAYS):
+        send_organization_invitation_emails.apply_async(
+            (
+                organization_name,
+                inviter_name,
+                [invitations[index] for index in deferred],
+                base_url,
+                greylist_attempt + 1,
+            ),
+            countdown=GREYLIST_RETRY_DELAYS[greylist_attempt],
+        )
+    return sent
@@ -0,0 +1,70 @@
+"""
+Periodic maintenance jobs.
+
+The API runs them when ``SCHEDULER_ENABLED=true`` (one replica leads, see
+``app.core.scheduler``). To keep them off the API replicas, leave it unset
+there and run a dedicated process instead:
+
+    SCHEDULER_ENABLED=true python -m app.tasks.periodic
+"""
+
+import asyncio
+import logging
+from datetime import UTC, datetime, timedelta
+
+from app.core.cache import close_cache, configure_cache
+from app.core.config import get_settings
+from app.core.logging import setup_logging
+from app.core.scheduler import Job, start_scheduler, stop_scheduler
+from app.db.session import unit_of_work
+from app.services.organization import OrganizationService
+from app.services.user import UserService
+
+logger = logging.getLogger(__name__)
+
+# Users deleted per transaction by purge_unverified_users
+PURGE_BATCH_SIZE = 1000
+
+
+async def deactivate_expired_invitations() -> None:
+    async with unit_of_work() as session:
+        count = await OrganizationService.deactivate_expired_invitations(session)
+    if count:
+        logger.info("Deactivated %d expired invitations", count)
+
+
+async def purge_unverified_users() -> None:
+    retention = timedelta(days=get_settings().unverified_user_retention_days)
+    created_before = datetime.now(UTC) - retention
+    # One transaction per batch keeps locks short; a full batch means more
+    while True:
+        async with unit_of_work() as session:
+            purged = await UserService(session).purge_unverified(
+                created_before, limit=PURGE_BATCH_SIZE
+            )
+        if purged < PURGE_BATCH_SIZE:
+            return
+
+
+PERIODIC_JOBS = [
+    Job("deactivate_expired_invitations", 15 * 60, deactivate_expired_invitations),
+    Job("purge_unverified_users", 24 * 3600, purge_unverified_users),
+]
+
+
+async def main() -> None:
+    if not get_settings().scheduler_enabled:
+        raise SystemExit("Set SCHEDULER_ENABLED=true to run the scheduler")
+    configure_cache()
+    start_scheduler(PERIODIC_JOBS)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await stop_scheduler()
+        await close_cache()
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    setup_logging(getattr(logging, settings.log_level.upper(), logging.INFO))
+    asyncio.run(main())
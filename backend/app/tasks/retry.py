@@ -0,0 +1,69 @@
+"""
+Retry policies for tasks that talk to flaky dependencies.
+
+A policy retries the whole call with exponential backoff and jitter, but
+only for errors that a later attempt can fix; anything else fails the task
+at once. Tenacity does the retrying inside the worker, so one task run
+covers all attempts and its result records the final outcome.
+"""
+
+import logging
+import smtplib
+from dataclasses import dataclass
+from typing import Callable, TypeVar
+
+from app.services.email import BulkSendAborted, is_temporary_refusal
+from tenacity import (
+    Retrying,
+    before_sleep_log,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int
+    initial_wait: float
+    max_wait: float
+    retry_on: Callable[[BaseException], bool]
+    jitter: float = 1.0
+
+    def retrying(self) -> Retrying:
+        return Retrying(
+            stop=stop_after_attempt(self.attempts),
+            wait=wait_exponential_jitter(
+                multiplier=self.initial_wait, max=self.max_wait, jitter=self.jitter
+            ),
+            retry=retry_if_exception(self.retry_on),
+            before_sleep=before_sleep_log(logger, logging.WARNING),
+            reraise=True,
+        )
+
+    def call(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return self.retrying()(fn, *args, **kwargs)
+
+
+def is_transient_smtp_error(exc: BaseException) -> bool:
+    """
+    4xx replies (including per-recipient ones), dropped connections and
+    network errors are worth a retry.
+    """
+    if isinstance(exc, BulkSendAborted) and exc.__cause__ is not None:
+        exc = exc.__cause__
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return is_temporary_refusal(exc)
+    # SMTPServerDisconnected, timeouts and socket errors are all OSErrors
+    return isinstance(exc, OSError)
+
+
+SMTP_RETRY = RetryPolicy(
+    attempts=5, initial_wait=2, max_wait=60, retry_on=is_transient_smtp_error
+)
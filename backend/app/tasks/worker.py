@@ -0,0 +1,44 @@
+"""
+Celery application for background work.
+
+Start a worker with:
+
+    celery -A app.tasks.worker worker --loglevel=info
+
+Redis is the broker and result backend (``REDIS_URL`` unless
+``TASK_BROKER_URL`` / ``TASK_RESULT_BACKEND`` say otherwise). With
+``TASKS_ALWAYS_EAGER=true`` tasks run inline in the process that sends them,
+which is what tests and a laptop without Redis want.
+
+Tasks are acknowledged after they finish, so a worker that dies mid-task
+hands the message to another worker instead of losing it. Tasks must
+therefore tolerate running twice; every task here does.
+"""
+
+from app.core.config import get_settings
+from celery import Celery
+
+TASK_MODULES = ["app.tasks.email"]
+
+
+def _build_celery() -> Celery:
+    settings = get_settings()
+    app = Celery("e_invoices", include=TASK_MODULES)
+    app.conf.update(
+        broker_url=settings.task_broker_url or settings.redis_url,
+        result_backend=settings.task_result_backend or settings.redis_url,
+        task_always_eager=settings.tasks_always_eager,
+        task_serializer="json",
+        result_serializer="json",
+        accept_content=["json"],
+        task_acks_late=True,
+        task_reject_on_worker_lost=True,
+        worker_prefetch_multiplier=1,
+        task_track_started=True,
+        result_expires=settings.task_result_ttl_seconds,
+        broker_connection_retry_on_startup=True,
+    )
+    return app
+
+
+celery_app = _build_celery()
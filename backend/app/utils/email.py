@@ -0,0 +1,23 @@
+# Gmail and Google-hosted domains ignore dots
+GMAIL_DOMAINS = frozenset({"gmail.com", "googlemail.com"})
+
+
+def normalize_email(email: str) -> str:
+    """
+    Normalize email address for consistent storage and lookup.
+
+    Gmail ignores dots in the local part, so:
+    - pipo.jordanoski@gmail.com
+    - pipojordanoski@gmail.com
+    - p.i.p.o.jordanoski@gmail.com
+
+    Are all the same inbox. This function normalizes Gmail addresses
+    by removing dots from the local part.
+    """
+    email = email.lower().strip()
+    local_part, domain = email.rsplit("@", 1)
+
+    if domain in GMAIL_DOMAINS:
+        local_part = local_part.replace(".", "")
+
+    return f"{local_part}@{domain}"
@@ -0,0 +1,25 @@
+from starlette.types import Scope
+
+
+def route_template(scope: Scope) -> str:
+    """
+    Return the full path template of the route matched for ``scope``,
+    e.g. ``/api/v1/organizations/{organization_id}/members``.
+
+    Recent FastAPI releases keep route paths relative to their router, so the
+    static prefix is recovered from the concrete request path. Requests that
+    matched no route collapse into ``"unmatched"`` to keep label cardinality
+    bounded.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    try:
+        rendered = template.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope.get("path", "")
+    if path.endswith(rendered):
+        return path[: len(path) - len(rendered)] + template
+    return template
@@ -0,0 +1,141 @@
+"""
+Microbenchmark harness for hot functions.
+
+The ``bench`` fixture calibrates an inner loop so each round lasts about
+``--micro-round-ms`` and records per-call timings over several rounds. Results
+are printed at the end of the session.
+
+Regression mode:
+
+    python -m pytest benchmarks/micro --micro-save baseline.json
+    python -m pytest benchmarks/micro --micro-compare baseline.json
+
+When comparing, a benchmark fails if its median is more than
+``--micro-max-regression`` times the baseline median (default 1.5). Baselines
+are only meaningful on the machine that recorded them.
+"""
+
+import json
+import platform
+import statistics
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+_results: dict[str, dict[str, float]] = {}
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("micro", "microbenchmarks")
+    group.addoption("--micro-save", help="Write results to this JSON file")
+    group.addoption("--micro-compare", help="Baseline JSON file to compare against")
+    group.addoption(
+        "--micro-max-regression",
+        type=float,
+        default=1.5,
+        help="Fail when median exceeds baseline median by this factor",
+    )
+    group.addoption("--micro-rounds", type=int, default=15)
+    group.addoption("--micro-round-ms", type=float, default=20.0)
+
+
+class Bench:
+    def __init__(self, config: pytest.Config, name: str) -> None:
+        self.name = name
+        self.rounds = config.getoption("micro_rounds")
+        self.round_seconds = config.getoption("micro_round_ms") / 1000
+        self.max_regression = config.getoption("micro_max_regression")
+        compare = config.getoption("micro_compare")
+        self.baseline = (
+            json.loads(Path(compare).read_text())["benchmarks"] if compare else {}
+        )
+
+    def _calibrate(self, func: Callable[[], Any]) -> int:
+        iterations = 1
+        while True:
+            started = time.perf_counter()
+            for _ in range(iterations):
+                func()
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.round_seconds or iterations >= 1_000_000:
+                return iterations
+            iterations *= (
+                2 if elapsed == 0 else max(2, int(self.round_seconds / elapsed))
+            )
+
+    def __call__(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        result = func(*args, **kwargs)
+
+        def call() -> Any:
+            return func(*args, **kwargs)
+
+        iterations = self._calibrate(call)
+        timings = []
+        for _ in range(self.rounds):
+            started = time.perf_counter()
+            for _ in range(iterations):
+                call()
+            timings.append((time.perf_counter() - started) / iterations)
+
+        stats = {
+            "median_us": statistics.median(timings) * 1e6,
+            "min_us": min(timings) * 1e6,
+            "stdev_us": statistics.stdev(timings) * 1e6 if len(timings) > 1 else 0.0,
+            "iterations": iterations,
+            "rounds": self.rounds,
+        }
+        _results[self.name] = stats
+        self._check_regression(stats)
+        return result
+
+    def _check_regression(self, stats: dict[str, float]) -> None:
+        previous = self.baseline.get(self.name)
+        if previous is None:
+            return
+        ratio = stats["median_us"] / previous["median_us"]
+        stats["baseline_ratio"] = ratio
+        if ratio > self.max_regression:
+            pytest.fail(
+                f"{self.name} regressed {ratio:.2f}x: median "
+                f"{stats['median_us']:.2f}us vs baseline {previous['median_us']:.2f}us "
+                f"(limit {self.max_regression:.2f}x)",
+                pytrace=False,
+            )
+
+
+@pytest.fixture
+def bench(request: pytest.FixtureRequest) -> Bench:
+    return Bench(request.config, request.node.name)
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    if not _results:
+        return
+    terminalreporter.section("microbenchmarks")
+    for name, stats in sorted(_results.items()):
+        ratio = stats.get("baseline_ratio")
+        terminalreporter.write_line(
+            f"{name:<48} median {stats['median_us']:12.2f}us"
+            f"  min {stats['min_us']:12.2f}us"
+            + (f"  {ratio:5.2f}x baseline" if ratio is not None else "")
+        )
+    save = config.getoption("micro_save")
+    if save:
+        Path(save).write_text(
+            json.dumps(
+                {
+                    "meta": {
+                        "saved_at": datetime.now(UTC).isoformat(),
+                        "python": platform.python_version(),
+                        "machine": platform.machine(),
+                        "node": platform.node(),
+                    },
+                    "benchmarks": _results,
+                },
+                indent=2,
+            )
+        )
+        terminalreporter.write_line(f"Saved results to {save}")
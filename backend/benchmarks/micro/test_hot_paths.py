@@ -0,0 +1,129 @@
+"""Microbenchmarks for security, schema, normalization and rate limit hot functions."""
+
+from datetime import UTC, datetime
+
+import pytest
+from app.core.rate_limit import LocalBuckets, RateLimit
+from app.core.security import (
+    create_access_token,
+    decode_access_token,
+    get_password_hash,
+    verify_password,
+)
+from app.models.organization import Organization, OrganizationRole
+from app.models.user import User
+from app.schemas.organization import OrganizationResponse, OrganizationWithRole
+from app.schemas.user import UserRead
+from app.services.organization import OrganizationService
+from app.utils.email import normalize_email
+
+NOW = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+@pytest.fixture(scope="module")
+def token() -> str:
+    return create_access_token(42, organization_id=7, organization_role="admin")
+
+
+@pytest.fixture(scope="module")
+def password_hash() -> str:
+    return get_password_hash("correct horse battery staple")
+
+
+@pytest.fixture(scope="module")
+def user() -> User:
+    return User(
+        id=42,
+        email="jane.doe@gmail.com",
+        hashed_password="$argon2id$stub",
+        full_name="Jane Doe",
+        auth_provider="email",
+        is_active=True,
+        is_verified=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+@pytest.fixture(scope="module")
+def organization() -> Organization:
+    return Organization(
+        id=7,
+        company_name="Acme",
+        registration_name="Acme DOOEL Skopje",
+        edb="4030000000000",
+        embs="1234567",
+        vat_registered=True,
+        address="Partizanska 1, Skopje",
+        contact_person="Jane Doe",
+        contact_email="office@acme.mk",
+        contact_phone="070000000",
+        is_active=True,
+        created_at=NOW,
+        updated_at=NOW,
+    )
+
+
+def test_create_access_token(bench):
+    bench(create_access_token, 42, organization_id=7, organization_role="admin")
+
+
+def test_decode_access_token(bench, token):
+    assert bench(decode_access_token, token)["sub"] == "42"
+
+
+def test_verify_password(bench, password_hash):
+    # Runs at the configured Argon2 cost, so few iterations per round
+    assert bench(verify_password, "correct horse battery staple", password_hash)
+
+
+def test_normalize_email_gmail(bench):
+    assert bench(normalize_email, " Jane.Doe@GMail.com ") == "janedoe@gmail.com"
+
+
+def test_normalize_email_other_domain(bench):
+    assert bench(normalize_email, "Jane.Doe@Example.com") == "jane.doe@example.com"
+
+
+def test_user_read_model_validate(bench, user):
+    assert bench(UserRead.model_validate, user).has_password
+
+
+def test_organization_with_role_construction(bench, organization):
+    def build() -> OrganizationWithRole:
+        return OrganizationWithRole(
+            **OrganizationResponse.model_validate(organization).model_dump(),
+            role=OrganizationRole.ADMIN,
+            joined_at=NOW,
+        )
+
+    assert bench(build).role == OrganizationRole.ADMIN
+
+
+def test_member_removal_check(bench):
+    assert (
+        bench(
+            OrganizationService.check_member_removal,
+            OrganizationRole.ADMIN,
+            OrganizationRole.MEMBER,
+        )
+        is None
+    )
+
+
+def test_role_change_check(bench):
+    assert (
+        bench(
+            OrganizationService.check_role_change,
+            OrganizationRole.ADMIN,
+            OrganizationRole.VIEWER,
+            OrganizationRole.MEMBER,
+        )
+        is None
+    )
+
+
+def test_local_rate_limit_bucket(bench):
+    buckets = LocalBuckets()
+    limit = RateLimit.parse("1000000/second")
+    assert bench(buckets.hit, "ratelimit:auth.login:ip:10.0.0.1", limit).allowed
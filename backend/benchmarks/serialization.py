@@ -0,0 +1,116 @@
+"""
+Serialization benchmark for ``TeamMembersResponse``.
+
+Compares the three ways a route can turn an already-built response model into
+bytes:
+
+- ``legacy``: re-validate against ``response_model``, ``jsonable_encoder``
+  and ``json.dumps`` (FastAPI's classic path).
+- ``revalidate``: re-validate against ``response_model`` and dump straight to
+  JSON with pydantic-core (newer FastAPI releases).
+- ``orjson``: ``ORJSONResponse`` rendering the model once, no re-validation.
+  A top-level model goes through pydantic-core's serializer, which beats
+  ``model_dump(mode="json")`` + orjson by building no intermediate dict.
+
+Run from the ``backend`` directory:
+
+    python -m benchmarks.serialization --members 5000 --repeat 20
+"""
+
+import argparse
+import json
+import statistics
+import time
+from datetime import UTC, datetime, timedelta
+from typing import Callable
+
+from app.core.responses import ORJSONResponse
+from app.schemas.organization import OrganizationRole, TeamMember, TeamMembersResponse
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+ROLES = list(OrganizationRole)
+
+
+def build_payload(members: int) -> TeamMembersResponse:
+    joined = datetime(2025, 1, 1, tzinfo=UTC)
+    team = [
+        TeamMember(
+            id=index,
+            user_id=index,
+            email=f"member{index}@example.com",
+            full_name=f"Member {index}",
+            picture_url=(
+                f"https://cdn.example.com/avatars/{index}.png" if index % 3 else None
+            ),
+            role=ROLES[index % len(ROLES)],
+            joined_at=joined + timedelta(minutes=index),
+        )
+        for index in range(members)
+    ]
+    return TeamMembersResponse(members=team, total=len(team))
+
+
+def _legacy(adapter: TypeAdapter, payload: TeamMembersResponse) -> bytes:
+    value = adapter.validate_python(payload)
+    return json.dumps(
+        jsonable_encoder(value), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _revalidate(adapter: TypeAdapter, payload: TeamMembersResponse) -> bytes:
+    return adapter.dump_json(adapter.validate_python(payload))
+
+
+def _orjson(_adapter: TypeAdapter, payload: TeamMembersResponse) -> bytes:
+    return ORJSONResponse(payload).body
+
+
+STRATEGIES: dict[str, Callable[[TypeAdapter, TeamMembersResponse], bytes]] = {
+    "legacy": _legacy,
+    "revalidate": _revalidate,
+    "orjson": _orjson,
+}
+
+
+def run(members: int, repeat: int) -> dict[str, dict[str, float]]:
+    payload = build_payload(members)
+    adapter = TypeAdapter(TeamMembersResponse)
+    reference = json.loads(_legacy(adapter, payload))
+
+    results: dict[str, dict[str, float]] = {}
+    for name, strategy in STRATEGIES.items():
+        assert json.loads(strategy(adapter, payload)) == reference, name
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = strategy(adapter, payload)
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            "median_ms": statistics.median(timings),
+            "min_ms": min(timings),
+            "bytes": len(body),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--members", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = run(args.members, args.repeat)
+    baseline = results["legacy"]["median_ms"]
+    print(f"TeamMembersResponse with {args.members} members ({args.repeat} runs)")
+    for name, stats in results.items():
+        print(
+            f"  {name:<11} median {stats['median_ms']:8.2f} ms"
+            f"  min {stats['min_ms']:8.2f} ms"
+            f"  {baseline / stats['median_ms']:5.2f}x"
+            f"  {stats['bytes']} bytes"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from dataclasses import replace
 from datetime import datetime, timezone
 from unittest.mock import AsyncMock, Mock
 
@@ -6,6 +7,7 @@ import pytest_asyncio
 from app.api.v1.routers import auth as auth_router
 from app.api.v1.routers import health as health_router
 from app.api.v1.routers import user as user_router
+from app.core import security
 
 
 @pytest.fixture
@@ -44,3 +46,12 @@ def mock_health_service(monkeypatch):
 @pytest_asyncio.fixture()
 async def async_client(api_client):
     yield api_client
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    token = "test-admin-token"
+    monkeypatch.setattr(
+        security, "settings", replace(security.settings, admin_api_token=token)
+    )
+    return token
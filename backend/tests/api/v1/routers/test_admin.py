@@ -0,0 +1,84 @@
+import pytest
+from app.core.security import create_access_token
+from app.core.usage import AGGREGATOR, track_engine_usage
+from fastapi import status
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_admin_routes_are_hidden_without_configured_token(async_client):
+    response = await async_client.post(
+        "/api/v1/admin/profiler/window", headers={"X-Admin-Token": "anything"}
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_admin_routes_reject_wrong_token(async_client, admin_token):
+    response = await async_client.post(
+        "/api/v1/admin/profiler/window", headers={"X-Admin-Token": "wrong"}
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_profiler_window_returns_collapsed_stacks(async_client, admin_token):
+    response = await async_client.post(
+        "/api/v1/admin/profiler/window",
+        params={"seconds": 0.1, "interval_ms": 1},
+        headers={"X-Admin-Token": admin_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "X-Worker-Id" in response.headers
+    stack, count = response.text.splitlines()[0].rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+
+
+async def test_debug_header_profiles_single_request(async_client, admin_token):
+    response = await async_client.get(
+        "/api/v1/health/", headers={"X-Debug-Profile": admin_token}
+    )
+    profile_id = response.headers["X-Profile-Id"]
+
+    profile = await async_client.get(
+        f"/api/v1/admin/profiler/profiles/{profile_id}",
+        headers={"X-Admin-Token": admin_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert profile.status_code == status.HTTP_200_OK
+
+
+async def test_debug_header_requires_admin_token(async_client, admin_token):
+    response = await async_client.get(
+        "/api/v1/health/", headers={"X-Debug-Profile": "wrong"}
+    )
+
+    assert "X-Profile-Id" not in response.headers
+
+
+async def test_tenant_usage_attributes_requests_to_organization(
+    async_client, admin_token, db_engine
+):
+    # The app engine is instrumented at import; the test engine is not
+    track_engine_usage(db_engine.sync_engine)
+    AGGREGATOR.clear()
+    token = create_access_token(1, organization_id=4242, organization_role="owner")
+
+    await async_client.get(
+        "/api/v1/organizations", headers={"Authorization": f"Bearer {token}"}
+    )
+    response = await async_client.get(
+        "/api/v1/admin/tenants/usage",
+        params={"sort_by": "sql_statements"},
+        headers={"X-Admin-Token": admin_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    tenants = {item["organization_id"]: item for item in response.json()["tenants"]}
+    assert tenants[4242]["requests"] == 1
+    assert tenants[4242]["sql_statements"] >= 1
+    assert tenants[4242]["db_time_seconds"] > 0
+    assert tenants[4242]["response_bytes"] > 0
@@ -1,6 +1,7 @@
 from types import SimpleNamespace
 
 import pytest
+from app.core.rate_limit import RateLimit, RateLimiter, configure_rate_limiter
 from fastapi import status
 
 
@@ -45,3 +46,32 @@ async def test_login_router(async_client, mock_auth_service):
         "auth@example.com", "secret"
     )
     mock_auth_service.generate_token.assert_called_once_with(2)
+
+
+@pytest.mark.asyncio
+async def test_login_routes_share_a_rate_limit(async_client, mock_auth_service):
+    configure_rate_limiter(
+        RateLimiter(overrides={"auth.login": RateLimit.parse("2/minute")})
+    )
+    mock_auth_service.authenticate_user.return_value = SimpleNamespace(id=2)
+    mock_auth_service.generate_token.return_value = {
+        "access_token": "token",
+        "token_type": "bearer",
+    }
+    form = {"username": "auth@example.com", "password": "secret"}
+
+    first = await async_client.post("/api/v1/auth/token", data=form)
+    second = await async_client.post("/api/v1/auth/token", data=form)
+    third = await async_client.post(
+        "/api/v1/auth/login",
+        json={"email": "auth@example.com", "password": "secret"},
+    )
+
+    assert first.headers["RateLimit-Limit"] == "2"
+    assert first.headers["RateLimit-Remaining"] == "1"
+    assert first.headers["RateLimit-Policy"] == "2;w=60"
+    assert second.headers["RateLimit-Remaining"] == "0"
+    assert third.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert third.headers["Retry-After"] == "30"
+    assert third.headers["RateLimit-Remaining"] == "0"
+    assert mock_auth_service.authenticate_user.await_count == 2
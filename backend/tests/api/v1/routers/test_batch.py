@@ -0,0 +1,135 @@
+import pytest
+from app.core import security
+from app.core.security import create_access_token
+from app.models.user import User
+from app.schemas.organization import OrganizationCreate
+from app.services.organization import OrganizationService
+from fastapi import status
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _owner_with_organization(db_session):
+    owner = User(email="owner@example.com", full_name="Owner", is_verified=True)
+    db_session.add(owner)
+    await db_session.flush()
+    organization, _ = await OrganizationService.create_organization(
+        db_session,
+        OrganizationCreate(
+            company_name="Acme",
+            registration_name="Acme DOOEL",
+            edb="4030000000000",
+            embs="1234567",
+            address="Skopje",
+            contact_person="Owner",
+            contact_email="owner@example.com",
+            contact_phone="070000000",
+        ),
+        owner.id,
+    )
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(owner.id)}"}
+    return owner, organization, headers
+
+
+async def test_batch_runs_page_load_reads(async_client, db_session, monkeypatch):
+    owner, organization, headers = await _owner_with_organization(db_session)
+    decodes = []
+    decode = security.decode_access_token
+    monkeypatch.setattr(
+        security,
+        "decode_access_token",
+        lambda token: decodes.append(token) or decode(token),
+    )
+    base = f"/organizations/{organization.id}"
+
+    response = await async_client.post(
+        "/api/v1/batch",
+        json={
+            "requests": [
+                {"id": "me", "path": "/auth/me"},
+                {"id": "organizations", "path": "/organizations"},
+                {"id": "organization", "path": base},
+                {"id": "members", "path": f"{base}/members"},
+                {"id": "invitations", "path": f"{base}/invitations"},
+            ]
+        },
+        headers=headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    results = {item["id"]: item for item in response.json()["responses"]}
+    assert list(results) == [
+        "me",
+        "organizations",
+        "organization",
+        "members",
+        "invitations",
+    ]
+    assert {item["status"] for item in results.values()} == {200}
+    assert results["me"]["body"]["email"] == owner.email
+    assert results["organization"]["body"]["company_name"] == "Acme"
+    assert results["members"]["body"]["total"] == 1
+    assert results["members"]["headers"]["etag"]
+    assert results["invitations"]["body"] == []
+    assert len(decodes) == 1
+
+
+async def test_batch_items_fail_independently(async_client, db_session):
+    _, organization, headers = await _owner_with_organization(db_session)
+    members = f"/organizations/{organization.id}/members"
+    first = await async_client.post(
+        "/api/v1/batch",
+        json={"requests": [{"id": "members", "path": members}]},
+        headers=headers,
+    )
+    etag = first.json()["responses"][0]["headers"]["etag"]
+
+    response = await async_client.post(
+        "/api/v1/batch",
+        json={
+            "requests": [
+                {"id": "missing", "path": "/does-not-exist"},
+                {"id": "forbidden", "path": "/organizations/999999"},
+                {
+                    "id": "members",
+                    "path": members,
+                    "headers": {"If-None-Match": etag, "X-Other": "ignored"},
+                },
+            ]
+        },
+        headers=headers,
+    )
+
+    results = {item["id"]: item for item in response.json()["responses"]}
+    assert results["missing"]["status"] == status.HTTP_404_NOT_FOUND
+    assert results["forbidden"]["status"] == status.HTTP_403_FORBIDDEN
+    assert results["members"]["status"] == status.HTTP_304_NOT_MODIFIED
+    assert results["members"]["body"] is None
+
+
+async def test_batch_rejects_writes_and_duplicate_ids(async_client, db_session):
+    _, _, headers = await _owner_with_organization(db_session)
+
+    write = await async_client.post(
+        "/api/v1/batch",
+        json={"requests": [{"id": "a", "method": "POST", "path": "/organizations"}]},
+        headers=headers,
+    )
+    duplicate = await async_client.post(
+        "/api/v1/batch",
+        json={
+            "requests": [
+                {"id": "a", "path": "/auth/me"},
+                {"id": "a", "path": "/organizations"},
+            ]
+        },
+        headers=headers,
+    )
+    anonymous = await async_client.post(
+        "/api/v1/batch", json={"requests": [{"id": "a", "path": "/auth/me"}]}
+    )
+
+    assert write.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+    assert duplicate.status_code == status.HTTP_400_BAD_REQUEST
+    assert anonymous.status_code == status.HTTP_401_UNAUTHORIZED
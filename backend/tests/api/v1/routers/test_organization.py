@@ -0,0 +1,338 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from app.core.security import create_access_token
+from app.models.organization import (
+    OrganizationInvitation,
+    OrganizationRole,
+    UserOrganization,
+)
+from app.models.user import User
+from app.schemas.organization import InvitationCreate, OrganizationCreate
+from app.services.organization import OrganizationService
+from app.tasks.email import mailer
+from fastapi import status
+from sqlalchemy import event, func, select
+
+pytestmark = pytest.mark.asyncio
+
+
+async def _owner_with_organization(db_session):
+    owner = User(email="owner@example.com", full_name="Owner", is_verified=True)
+    db_session.add(owner)
+    await db_session.flush()
+    organization, _ = await OrganizationService.create_organization(
+        db_session,
+        OrganizationCreate(
+            company_name="Acme",
+            registration_name="Acme DOOEL",
+            edb="4030000000000",
+            embs="1234567",
+            address="Skopje",
+            contact_person="Owner",
+            contact_email="owner@example.com",
+            contact_phone="070000000",
+        ),
+        owner.id,
+    )
+    headers = {"Authorization": f"Bearer {create_access_token(owner.id)}"}
+    return owner, organization, headers
+
+
+async def test_get_members_answers_304_for_matching_etag(async_client, db_session):
+    _, organization, headers = await _owner_with_organization(db_session)
+    url = f"/api/v1/organizations/{organization.id}/members"
+
+    first = await async_client.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    repeat = await async_client.get(url, headers={**headers, "If-None-Match": etag})
+
+    assert first.status_code == status.HTTP_200_OK
+    assert first.json()["total"] == 1
+    assert repeat.status_code == status.HTTP_304_NOT_MODIFIED
+    assert repeat.headers["ETag"] == etag
+    assert repeat.content == b""
+
+
+async def test_get_organization_etag_matches_on_repeat(async_client, db_session):
+    _, organization, headers = await _owner_with_organization(db_session)
+    url = f"/api/v1/organizations/{organization.id}"
+
+    first = await async_client.get(url, headers=headers)
+    repeat = await async_client.get(
+        url, headers={**headers, "If-None-Match": first.headers["ETag"]}
+    )
+
+    assert first.status_code == status.HTTP_200_OK
+    assert first.json()["role"] == "owner"
+    assert repeat.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+async def test_invitation_change_invalidates_etag(async_client, db_session):
+    owner, organization, headers = await _owner_with_organization(db_session)
+    url = f"/api/v1/organizations/{organization.id}/invitations"
+
+    first = await async_client.get(url, headers=headers)
+    await OrganizationService.create_invitation(
+        db_session, organization.id, owner.id, InvitationCreate()
+    )
+    second = await async_client.get(
+        url, headers={**headers, "If-None-Match": first.headers["ETag"]}
+    )
+
+    assert first.json() == []
+    assert second.status_code == status.HTTP_200_OK
+    assert len(second.json()) == 1
+    assert second.headers["ETag"] != first.headers["ETag"]
+
+
+async def test_conditional_get_still_requires_membership(async_client, db_session):
+    _, organization, _ = await _owner_with_organization(db_session)
+    outsider = User(email="outsider@example.com", full_name="Outsider")
+    db_session.add(outsider)
+    await db_session.flush()
+    headers = {
+        "Authorization": f"Bearer {create_access_token(outsider.id)}",
+        "If-None-Match": "*",
+    }
+
+    response = await async_client.get(
+        f"/api/v1/organizations/{organization.id}/members", headers=headers
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_join_with_invitation_loaded_from_sqlite(async_client, db_session):
+    owner, organization, _ = await _owner_with_organization(db_session)
+    invitation = await OrganizationService.create_invitation(
+        db_session, organization.id, owner.id, InvitationCreate()
+    )
+    joiner = User(email="joiner@example.com", full_name="Joiner")
+    db_session.add(joiner)
+    await db_session.flush()
+    code = invitation.code
+    headers = {"Authorization": f"Bearer {create_access_token(joiner.id)}"}
+    # Reload from the database, where SQLite returns offset-naive timestamps
+    db_session.expire_all()
+
+    response = await async_client.post(
+        "/api/v1/organizations/join", json={"code": code}, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["role"] == "member"
+
+
+async def _member(db_session, organization, role, email):
+    user = User(email=email, full_name=role.value)
+    db_session.add(user)
+    await db_session.flush()
+    membership = UserOrganization(
+        user_id=user.id, organization_id=organization.id, role=role
+    )
+    db_session.add(membership)
+    await db_session.flush()
+    headers = {"Authorization": f"Bearer {create_access_token(user.id)}"}
+    return membership, headers
+
+
+async def test_role_without_permission_is_forbidden(async_client, db_session):
+    _, organization, _ = await _owner_with_organization(db_session)
+    _, viewer_headers = await _member(
+        db_session, organization, OrganizationRole.VIEWER, "viewer@example.com"
+    )
+
+    response = await async_client.post(
+        f"/api/v1/organizations/{organization.id}/invitations",
+        json={"role": "member"},
+        headers=viewer_headers,
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+async def test_admin_removes_member_with_single_role_lookup(
+    async_client, db_session, db_engine
+):
+    _, organization, _ = await _owner_with_organization(db_session)
+    _, admin_headers = await _member(
+        db_session, organization, OrganizationRole.ADMIN, "admin@example.com"
+    )
+    member, _ = await _member(
+        db_session, organization, OrganizationRole.MEMBER, "member@example.com"
+    )
+    membership_queries = []
+
+    def _record(conn, cursor, statement, parameters, context, many):
+        if statement.lstrip().upper().startswith("SELECT") and (
+            "user_organizations.role" in statement
+        ):
+            membership_queries.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        response = await async_client.delete(
+            f"/api/v1/organizations/{organization.id}/members/{member.id}",
+            headers=admin_headers,
+        )
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", _record)
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    # The caller's role is resolved once; the second statement loads the target
+    assert len(membership_queries) == 2
+
+
+async def test_invitation_creator_can_deactivate_own_invitation(
+    async_client, db_session
+):
+    _, organization, _ = await _owner_with_organization(db_session)
+    accountant, accountant_headers = await _member(
+        db_session, organization, OrganizationRole.ACCOUNTANT, "acc@example.com"
+    )
+    invitation = await OrganizationService.create_invitation(
+        db_session, organization.id, accountant.user_id, InvitationCreate()
+    )
+
+    response = await async_client.delete(
+        f"/api/v1/organizations/{organization.id}/invitations/{invitation.id}",
+        headers=accountant_headers,
+    )
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert invitation.is_active is False
+
+
+async def test_bulk_invitations_insert_once_and_mail_in_one_batch(
+    async_client, db_session, db_engine, monkeypatch
+):
+    owner, organization, headers = await _owner_with_organization(db_session)
+    existing = User(email="existing@example.com", full_name="Existing")
+    db_session.add(existing)
+    await db_session.flush()
+    batches = []
+    monkeypatch.setattr(
+        mailer,
+        "send_bulk",
+        lambda messages, deferred=None: batches.append(messages) or len(messages),
+    )
+    inserts = []
+
+    def _record(conn, cursor, statement, parameters, context, many):
+        if statement.startswith("INSERT INTO organization_invitations"):
+            inserts.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", _record)
+    try:
+        response = await async_client.post(
+            f"/api/v1/organizations/{organization.id}/invitations/bulk",
+            json={
+                "invitations": [
+                    {"email": "existing@example.com", "role": "accountant"},
+                    {"email": "new@example.com"},
+                    {"email": "NEW@example.com", "role": "admin"},
+                ]
+            },
+            headers=headers,
+        )
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", _record)
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert body["total"] == 2
+    assert [item["role"] for item in body["invitations"]] == ["accountant", "member"]
+    assert len({item["code"] for item in body["invitations"]}) == 2
+    assert len(inserts) == 1
+    assert len(batches) == 1
+    recipients = [to_email for to_email, _subject, _html in batches[0]]
+    assert recipients == ["existing@example.com", "new@example.com"]
+    # Existing accounts are sent to the login page, new ones to register
+    assert "/login?redirect=" in batches[0][0][2].split("Прифати")[0]
+    assert "/register?redirect=" in batches[0][1][2].split("Прифати")[0]
+
+
+async def test_deactivate_expired_invitations_bumps_version(db_session):
+    owner, organization, _ = await _owner_with_organization(db_session)
+    expired = await OrganizationService.create_invitation(
+        db_session, organization.id, owner.id, InvitationCreate()
+    )
+    current = await OrganizationService.create_invitation(
+        db_session, organization.id, owner.id, InvitationCreate()
+    )
+    expired.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    await db_session.flush()
+    version = organization.invitations_version
+
+    count = await OrganizationService.deactivate_expired_invitations(db_session)
+
+    await db_session.refresh(expired)
+    await db_session.refresh(current)
+    await db_session.refresh(organization)
+    assert count == 1
+    assert expired.is_active is False
+    assert current.is_active is True
+    assert organization.invitations_version == version + 1
+
+
+async def test_bulk_invitation_codes_skip_taken_codes(db_session, monkeypatch):
+    owner, organization, _ = await _owner_with_organization(db_session)
+    taken = await OrganizationService.create_invitation(
+        db_session, organization.id, owner.id, InvitationCreate()
+    )
+    generated = iter([taken.code, "FRESH001"])
+    monkeypatch.setattr(
+        OrganizationInvitation, "generate_code", staticmethod(lambda: next(generated))
+    )
+
+    codes = await OrganizationService._unique_invitation_codes(db_session, 1)
+
+    assert codes == ["FRESH001"]
+
+
+async def test_cached_member_listing_follows_profile_changes(async_client, db_session):
+    _, organization, headers = await _owner_with_organization(db_session)
+    url = f"/api/v1/organizations/{organization.id}/members"
+
+    before = await async_client.get(url, headers=headers)
+    await async_client.put(
+        "/api/v1/auth/profile", json={"full_name": "Renamed"}, headers=headers
+    )
+    after = await async_client.get(url, headers=headers)
+
+    assert before.json()["members"][0]["full_name"] == "Owner"
+    assert after.json()["members"][0]["full_name"] == "Renamed"
+
+
+async def test_create_organization_retry_with_idempotency_key(async_client, db_session):
+    owner, _, headers = await _owner_with_organization(db_session)
+    payload = {
+        "company_name": "Retry",
+        "registration_name": "Retry DOOEL",
+        "edb": "4030000000001",
+        "embs": "7654321",
+        "address": "Skopje",
+        "contact_person": "Owner",
+        "contact_email": "owner@example.com",
+        "contact_phone": "070000000",
+    }
+    headers = {**headers, "Idempotency-Key": "create-retry"}
+
+    first = await async_client.post(
+        "/api/v1/organizations", json=payload, headers=headers
+    )
+    retry = await async_client.post(
+        "/api/v1/organizations", json=payload, headers=headers
+    )
+
+    assert first.status_code == status.HTTP_201_CREATED
+    assert retry.status_code == status.HTTP_201_CREATED
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    memberships = await db_session.scalar(
+        select(func.count())
+        .select_from(UserOrganization)
+        .where(UserOrganization.user_id == owner.id)
+    )
+    assert memberships == 2
@@ -3,10 +3,16 @@ from unittest.mock import AsyncMock, Mock
 
 import pytest
 import pytest_asyncio
+from app.core.admission import AdmissionController, configure_admission
+from app.core.cache import Cache, MemoryBackend, configure_cache
+from app.core.idempotency import MemoryStore, configure_idempotency
+from app.core.rate_limit import RateLimiter, configure_rate_limiter
 from app.db.base import Base
 from app.db.session import get_session
 from app.main import app as fastapi_app
 from app.models.user import User as UserModel
+from app.tasks.deferred import dispatch_deferred
+from app.tasks.worker import celery_app
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.pool import StaticPool
@@ -21,6 +27,42 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def memory_cache():
+    """Every test starts with an empty in-memory service cache."""
+    return configure_cache(Cache(MemoryBackend()))
+
+
+@pytest.fixture(autouse=True)
+def rate_limiter():
+    """Every test starts with full per-process rate limit buckets."""
+    return configure_rate_limiter(RateLimiter())
+
+
+@pytest.fixture(autouse=True)
+def idempotency_store():
+    """Every test starts with no stored Idempotency-Key responses."""
+    return configure_idempotency(MemoryStore())
+
+
+@pytest.fixture(autouse=True)
+def admission_controller():
+    """Every test starts with an idle admission controller."""
+    return configure_admission(AdmissionController())
+
+
+@pytest.fixture(autouse=True, scope="session")
+def eager_tasks():
+    """Tasks run inline, with an in-memory broker and result backend."""
+    celery_app.conf.update(
+        task_always_eager=True,
+        task_eager_propagates=True,
+        broker_url="memory://",
+        result_backend="cache+memory://",
+    )
+    return celery_app
+
+
 @pytest_asyncio.fixture()
 async def db_engine():
     engine = create_async_engine(
@@ -55,6 +97,8 @@ async def _truncate_all_tables(session: AsyncSession) -> None:
 async def api_client(db_session):
     async def override_get_session():
         yield db_session
+        # The test session never commits; the request still ends here
+        await dispatch_deferred(db_session)
 
     fastapi_app.dependency_overrides[get_session] = override_get_session
     transport = ASGITransport(app=fastapi_app)
@@ -69,6 +113,7 @@ def mock_user_repository():
     session.add = Mock()
     session.commit = AsyncMock()
     session.refresh = AsyncMock()
+    session.flush = AsyncMock()
     session.execute = AsyncMock()
     return session
 
@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+from app.core.admission import (
+    AdmissionController,
+    Priority,
+    Shed,
+    classify,
+    configure_admission,
+)
+from app.core.config import get_settings
+from app.middleware.admission import AdmissionControlMiddleware
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_classify_by_path():
+    prefix = get_settings().api_v1_prefix
+
+    assert classify(f"{prefix}/health/") is None
+    assert classify(f"{prefix}/metrics") is None
+    assert classify(f"{prefix}/auth/refresh") is Priority.HIGH
+    assert classify(f"{prefix}/organizations/1/invitations/bulk") is Priority.LOW
+    assert classify(f"{prefix}/batch") is Priority.LOW
+    assert classify(f"{prefix}/organizations/1/members") is Priority.NORMAL
+
+
+async def test_limit_grows_when_fast_and_shrinks_once_per_overload():
+    controller = AdmissionController(initial_limit=10, target_latency=0.5)
+
+    await controller.acquire(Priority.NORMAL)
+    controller.release(0.01, ok=True)
+    grown = controller.limit
+    for _ in range(3):
+        await controller.acquire(Priority.NORMAL)
+        controller.release(2.0, ok=True)
+
+    assert grown == pytest.approx(10.1)
+    assert controller.limit == pytest.approx(grown * 0.9)
+
+
+async def test_released_slots_go_to_the_highest_priority_waiter():
+    controller = AdmissionController(initial_limit=2, min_limit=2, max_limit=2)
+    await controller.acquire(Priority.HIGH)
+    await controller.acquire(Priority.HIGH)
+    order = []
+
+    async def wait(priority):
+        await controller.acquire(priority)
+        order.append(priority)
+
+    normal = asyncio.create_task(wait(Priority.NORMAL))
+    await asyncio.sleep(0)
+    high = asyncio.create_task(wait(Priority.HIGH))
+    await asyncio.sleep(0)
+    controller.release(None, ok=True)
+    await high
+    controller.release(None, ok=True)
+    controller.release(None, ok=True)
+    await normal
+
+    assert order == [Priority.HIGH, Priority.NORMAL]
+
+
+async def test_full_queue_sheds_the_least_important_request():
+    controller = AdmissionController(initial_limit=1, min_limit=1, max_queue=1)
+    await controller.acquire(Priority.HIGH)
+    normal = asyncio.create_task(controller.acquire(Priority.NORMAL))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Shed):
+        await controller.acquire(Priority.LOW)
+    high = asyncio.create_task(controller.acquire(Priority.HIGH))
+    await asyncio.sleep(0)
+
+    with pytest.raises(Shed):
+        await normal
+    controller.release(None, ok=True)
+    await high
+    assert controller.inflight == 1
+
+
+async def test_waiters_are_shed_after_the_queue_timeout():
+    controller = AdmissionController(initial_limit=1, min_limit=1, queue_timeout=0.01)
+    await controller.acquire(Priority.HIGH)
+
+    with pytest.raises(Shed) as shed:
+        await controller.acquire(Priority.NORMAL)
+
+    assert shed.value.retry_after >= 1
+    assert controller.queued == 0
+
+
+async def test_overloaded_worker_answers_503_but_keeps_health_checks(api_client):
+    prefix = get_settings().api_v1_prefix
+    controller = configure_admission(AdmissionController(initial_limit=5, max_queue=0))
+    controller.inflight = 5
+
+    shed = await api_client.get(f"{prefix}/organizations")
+    health = await api_client.get(f"{prefix}/health/")
+
+    assert shed.status_code == 503
+    assert int(shed.headers["Retry-After"]) >= 1
+    assert health.status_code == 200
+
+
+async def test_shed_response_is_readable_cross_origin(api_client):
+    settings = get_settings()
+    origin = settings.cors_origins[0]
+    controller = configure_admission(AdmissionController(initial_limit=5, max_queue=0))
+    controller.inflight = 5
+
+    shed = await api_client.get(
+        f"{settings.api_v1_prefix}/organizations", headers={"Origin": origin}
+    )
+
+    assert shed.status_code == 503
+    assert shed.headers["Access-Control-Allow-Origin"] == origin
+    assert "retry-after" in shed.headers["Access-Control-Expose-Headers"].lower()
+
+
+async def test_cancelled_requests_do_not_shrink_the_limit():
+    controller = configure_admission(AdmissionController(initial_limit=10))
+
+    async def disconnected(scope, receive, send):
+        raise asyncio.CancelledError
+
+    async def crashed(scope, receive, send):
+        raise RuntimeError("boom")
+
+    scope = {"type": "http", "path": f"{get_settings().api_v1_prefix}/organizations"}
+    with pytest.raises(asyncio.CancelledError):
+        await AdmissionControlMiddleware(disconnected)(scope, None, None)
+    assert controller.limit == 10
+    assert controller.inflight == 0
+
+    with pytest.raises(RuntimeError):
+        await AdmissionControlMiddleware(crashed)(scope, None, None)
+    assert controller.limit == pytest.approx(9)
@@ -0,0 +1,169 @@
+from types import SimpleNamespace
+from typing import List
+
+import orjson
+import pytest
+from app.core import cache as cache_module
+from app.core.cache import (
+    KEY_PREFIX,
+    Cache,
+    MemoryBackend,
+    cached,
+    configure_cache,
+    invalidate_pending,
+    invalidate_tags,
+)
+from pydantic import BaseModel
+
+pytestmark = pytest.mark.asyncio
+
+
+class Item(BaseModel):
+    id: int
+    owner_id: int
+
+
+class Repository:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    @cached(
+        "items",
+        key=lambda self, group_id: group_id,
+        tags=lambda self, group_id: [f"group:{group_id}"],
+        result_tags=lambda items: [f"user:{item.owner_id}" for item in items],
+        local_ttl=0,
+    )
+    async def list_items(self, group_id: int) -> List[Item]:
+        self.calls += 1
+        return [Item(id=self.calls, owner_id=10)]
+
+
+class FailingBackend(MemoryBackend):
+    async def get_many(self, keys):
+        raise ConnectionError("backend down")
+
+
+async def test_second_read_is_served_from_cache(memory_cache):
+    repository = Repository()
+
+    first = await repository.list_items(1)
+    second = await repository.list_items(1)
+
+    assert first == second
+    assert repository.calls == 1
+
+
+async def test_argument_and_result_tags_invalidate(memory_cache):
+    repository = Repository()
+    await repository.list_items(1)
+
+    await memory_cache.invalidate("group:1")
+    await repository.list_items(1)
+    await memory_cache.invalidate("user:10")
+    items = await repository.list_items(1)
+
+    assert repository.calls == 3
+    assert items[0].id == 3
+
+
+async def test_local_tier_answers_without_backend(memory_cache):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return 1
+
+    adapter = cache_module.TypeAdapter(int)
+    await memory_cache.get_or_compute("k", compute, adapter, tags=["t"])
+    memory_cache.backend = FailingBackend()
+
+    assert await memory_cache.get_or_compute("k", compute, adapter, tags=["t"]) == 1
+    assert len(calls) == 1
+
+
+async def test_backend_failure_falls_back_to_compute():
+    configure_cache(Cache(FailingBackend()))
+    repository = Repository()
+
+    await repository.list_items(1)
+    await repository.list_items(1)
+
+    assert repository.calls == 2
+
+
+async def test_entry_near_expiry_is_refreshed_early(memory_cache, monkeypatch):
+    repository = Repository()
+    await repository.list_items(1)
+    key = KEY_PREFIX + "items:1"
+    raw, expires_at = memory_cache.backend._data[key]
+    entry = orjson.loads(raw)
+    # Pretend the value took ten seconds to compute and expires in one
+    entry["d"] = 10.0
+    entry["x"] = cache_module.time.time() + 1
+    memory_cache.backend._data[key] = (orjson.dumps(entry), expires_at)
+    monkeypatch.setattr(cache_module.random, "random", lambda: 0.5)
+
+    await repository.list_items(1)
+
+    assert repository.calls == 2
+
+
+async def test_session_tags_are_invalidated_again_after_commit(memory_cache):
+    repository = Repository()
+    session = SimpleNamespace(info={})
+
+    await invalidate_tags(session, "group:1")
+    # A concurrent reader caches data the writer has not committed yet
+    await repository.list_items(1)
+    await invalidate_pending(session)
+    await repository.list_items(1)
+
+    assert repository.calls == 2
+    assert session.info == {}
+
+
+async def test_value_is_not_cached_when_a_result_tag_moves_during_compute(
+    memory_cache,
+):
+    adapter = cache_module.TypeAdapter(int)
+    calls = []
+
+    def reader(writer_commits: bool):
+        async def compute():
+            calls.append(writer_commits)
+            if writer_commits:
+                # The owner is updated and committed while the value is built
+                await memory_cache.invalidate("user:10")
+            return len(calls)
+
+        return memory_cache.get_or_compute(
+            "k",
+            compute,
+            adapter,
+            tags=["group:1"],
+            result_tags=lambda _value: ["user:10"],
+            local_ttl=0,
+        )
+
+    # Cold key: user:10 has no snapshot yet, the invalidation epoch moved
+    await reader(writer_commits=True)
+    assert await reader(writer_commits=False) == 2
+    # Stale entry: user:10 is snapshotted from the tags the entry recorded
+    await memory_cache.invalidate("group:1")
+    await reader(writer_commits=True)
+
+    assert await reader(writer_commits=False) == 4
+    assert await reader(writer_commits=False) == 4
+
+
+async def test_unseen_result_tag_is_verified_by_the_next_fill(memory_cache):
+    repository = Repository()
+    await memory_cache.invalidate("user:10")
+
+    # user:10 has a version but no snapshot, so the first value is not trusted
+    await repository.list_items(1)
+    await repository.list_items(1)
+    await repository.list_items(1)
+
+    assert repository.calls == 2
@@ -0,0 +1,154 @@
+import asyncio
+from dataclasses import replace
+
+import pytest
+import pytest_asyncio
+from app.core import idempotency
+from app.core.idempotency import IdempotencyStore, MemoryStore
+from app.middleware import idempotency as middleware_module
+from app.middleware.idempotency import IdempotencyMiddleware
+from fastapi import FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+
+pytestmark = pytest.mark.asyncio
+
+
+class FailingStore(MemoryStore):
+    async def claim(self, key, value, ttl):
+        raise ConnectionError("store down")
+
+
+@pytest.fixture
+def app_state():
+    return {"calls": 0, "release": None, "fail": False}
+
+
+@pytest_asyncio.fixture
+async def client(app_state):
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware)
+
+    @app.post("/items")
+    async def create_item(payload: dict) -> dict:
+        app_state["calls"] += 1
+        if app_state["release"] is not None:
+            await app_state["release"].wait()
+        if app_state["fail"]:
+            raise HTTPException(status_code=503, detail="unavailable")
+        return {"id": app_state["calls"], **payload}
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        yield client
+
+
+async def test_retry_replays_stored_response(client, app_state):
+    headers = {"Idempotency-Key": "abc"}
+
+    first = await client.post("/items", json={"name": "a"}, headers=headers)
+    retry = await client.post("/items", json={"name": "a"}, headers=headers)
+    other = await client.post("/items", json={"name": "a"})
+
+    assert retry.json() == first.json() == {"id": 1, "name": "a"}
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert other.json()["id"] == 2
+    assert app_state["calls"] == 2
+
+
+async def test_key_is_scoped_to_credentials_and_request(client, app_state):
+    await client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k"})
+
+    other_user = await client.post(
+        "/items",
+        json={"name": "a"},
+        headers={"Idempotency-Key": "k", "Authorization": "Bearer other"},
+    )
+    reused = await client.post(
+        "/items", json={"name": "b"}, headers={"Idempotency-Key": "k"}
+    )
+
+    assert other_user.json()["id"] == 2
+    assert reused.status_code == 422
+    assert app_state["calls"] == 2
+
+
+async def test_concurrent_duplicate_waits_for_first(client, app_state):
+    app_state["release"] = asyncio.Event()
+    headers = {"Idempotency-Key": "slow"}
+
+    first = asyncio.create_task(
+        client.post("/items", json={"name": "a"}, headers=headers)
+    )
+    duplicate = asyncio.create_task(
+        client.post("/items", json={"name": "a"}, headers=headers)
+    )
+    await asyncio.sleep(0.05)
+    assert app_state["calls"] == 1
+    app_state["release"].set()
+
+    responses = await asyncio.gather(first, duplicate)
+
+    assert [response.json() for response in responses] == [{"id": 1, "name": "a"}] * 2
+    assert app_state["calls"] == 1
+
+
+async def test_duplicate_gives_up_after_wait(client, app_state, monkeypatch):
+    settings = replace(middleware_module.get_settings(), idempotency_wait_seconds=0)
+    monkeypatch.setattr(middleware_module, "get_settings", lambda: settings)
+    app_state["release"] = asyncio.Event()
+    headers = {"Idempotency-Key": "stuck"}
+
+    first = asyncio.create_task(
+        client.post("/items", json={"name": "a"}, headers=headers)
+    )
+    await asyncio.sleep(0.01)
+    duplicate = await client.post("/items", json={"name": "a"}, headers=headers)
+    app_state["release"].set()
+    await first
+
+    assert duplicate.status_code == 409
+    assert duplicate.headers["Retry-After"] == "1"
+    assert app_state["calls"] == 1
+
+
+async def test_server_errors_are_not_stored(client, app_state):
+    app_state["fail"] = True
+    headers = {"Idempotency-Key": "flaky"}
+
+    failed = await client.post("/items", json={"name": "a"}, headers=headers)
+    app_state["fail"] = False
+    retried = await client.post("/items", json={"name": "a"}, headers=headers)
+
+    assert failed.status_code == 503
+    assert retried.status_code == 200
+    assert app_state["calls"] == 2
+
+
+async def test_store_failure_runs_request(client, app_state, monkeypatch):
+    monkeypatch.setattr(idempotency, "store", FailingStore())
+    headers = {"Idempotency-Key": "abc"}
+
+    first = await client.post("/items", json={"name": "a"}, headers=headers)
+    second = await client.post("/items", json={"name": "a"}, headers=headers)
+
+    assert [first.status_code, second.status_code] == [200, 200]
+    assert app_state["calls"] == 2
+
+
+async def test_rejects_oversized_key(client, app_state):
+    response = await client.post(
+        "/items", json={}, headers={"Idempotency-Key": "x" * 256}
+    )
+
+    assert response.status_code == 400
+    assert app_state["calls"] == 0
+
+
+async def test_store_missing_a_method_fails_on_instantiation():
+    class PartialStore(IdempotencyStore):
+        async def get(self, key):
+            return None
+
+    with pytest.raises(TypeError, match="claim"):
+        PartialStore()
@@ -0,0 +1,55 @@
+import asyncio
+import time
+import traceback
+
+import pytest
+from app.core.loop_monitor import APP_DIR, LoopMonitor, _call_site
+from app.core.metrics import EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG
+
+
+def _blocking_handler():
+    time.sleep(0.3)
+
+
+@pytest.mark.asyncio
+async def test_blocking_call_is_reported_with_its_stack():
+    monitor = LoopMonitor(interval=0.02, threshold=0.1)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        _blocking_handler()
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    (report,) = monitor.reports
+    assert report.blocked_for >= 0.1
+    assert report.site == "test_loop_monitor:_blocking_handler"
+    assert "_blocking_handler" in report.stack
+    assert EVENT_LOOP_BLOCKS.labels(report.site).snapshot() >= 1
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_records_lag_without_reports():
+    before = sum(EVENT_LOOP_LAG.labels().counts)
+    monitor = LoopMonitor(interval=0.01, threshold=0.2)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    assert not monitor.reports
+    assert sum(EVENT_LOOP_LAG.labels().counts) > before
+
+
+def test_call_site_prefers_application_frames():
+    frames = traceback.StackSummary.from_list(
+        [
+            ("/usr/lib/python3/asyncio/events.py", 80, "_run", None),
+            (str(APP_DIR / "services" / "email.py"), 34, "_send_email", None),
+            ("/usr/lib/python3/smtplib.py", 255, "__init__", None),
+        ]
+    )
+
+    assert _call_site(frames) == "app.services.email:_send_email"
@@ -0,0 +1,87 @@
+import os
+
+import pytest
+from app.core.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    MultiprocessStore,
+    render_snapshots,
+)
+from fastapi import status
+
+
+@pytest.fixture()
+def registry():
+    return MetricsRegistry()
+
+
+def test_counter_renders_with_labels(registry):
+    counter = Counter("jobs_total", "Jobs.", ["outcome"], registry=registry)
+    counter.labels("ok").inc()
+    counter.labels("ok").inc(2)
+
+    output = registry.render()
+
+    assert "# TYPE jobs_total counter" in output
+    assert 'jobs_total{outcome="ok"} 3.0' in output
+
+
+def test_counter_rejects_wrong_label_count(registry):
+    counter = Counter("jobs_total", "Jobs.", ["outcome"], registry=registry)
+
+    with pytest.raises(ValueError):
+        counter.labels("ok", "extra")
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = Histogram(
+        "latency_seconds", "Latency.", buckets=(0.1, 1.0), registry=registry
+    )
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    output = registry.render()
+
+    assert 'latency_seconds_bucket{le="0.1"} 2' in output
+    assert 'latency_seconds_bucket{le="1.0"} 3' in output
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in output
+    assert "latency_seconds_count 4" in output
+    assert "latency_seconds_sum 3.65" in output
+
+
+def test_collectors_refresh_gauges(registry):
+    gauge = Gauge("pool_size", "Pool size.", registry=registry)
+    registry.add_collector(lambda: gauge.set(7))
+
+    assert "pool_size 7.0" in registry.render()
+
+
+def test_multiprocess_snapshots_are_merged(registry, tmp_path):
+    counter = Counter("jobs_total", "Jobs.", ["outcome"], registry=registry)
+    gauge = Gauge("lag_seconds", "Lag.", registry=registry, multiprocess_mode="max")
+    store = MultiprocessStore(tmp_path)
+
+    counter.labels("ok").inc(2)
+    gauge.set(0.5)
+    store.write(registry.snapshot(), pid=101)
+    counter.labels("ok").inc(3)
+    gauge.set(0.2)
+    store.write(registry.snapshot(), pid=os.getpid())
+
+    output = render_snapshots(store.read_all())
+
+    assert 'jobs_total{outcome="ok"} 7.0' in output
+    assert "lag_seconds 0.5" in output
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_request_metrics(api_client):
+    await api_client.get("/api/v1/health/")
+
+    response = await api_client.get("/api/v1/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/v1/health/"' in response.text
@@ -0,0 +1,29 @@
+import pytest
+from app.core.permissions import (
+    DENIED_MESSAGES,
+    ROLE_PERMISSIONS,
+    OrgPermission,
+    has_permission,
+)
+from app.models.organization import OrganizationRole
+
+
+def test_every_role_and_permission_is_covered():
+    assert set(ROLE_PERMISSIONS) == set(OrganizationRole)
+    assert set(DENIED_MESSAGES) == set(OrgPermission)
+
+
+@pytest.mark.parametrize(
+    ("role", "permission", "allowed"),
+    [
+        (OrganizationRole.OWNER, OrgPermission.MANAGE_MEMBERS, True),
+        (OrganizationRole.ADMIN, OrgPermission.VIEW_INVITATIONS, True),
+        (OrganizationRole.ACCOUNTANT, OrgPermission.CREATE_INVITATIONS, True),
+        (OrganizationRole.ACCOUNTANT, OrgPermission.VIEW_INVITATIONS, False),
+        (OrganizationRole.MEMBER, OrgPermission.VIEW_MEMBERS, True),
+        (OrganizationRole.VIEWER, OrgPermission.UPDATE_ORGANIZATION, False),
+        (None, OrgPermission.VIEW_ORGANIZATION, False),
+    ],
+)
+def test_has_permission(role, permission, allowed):
+    assert has_permission(role, permission) is allowed
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from app.core.profiler import ProfileStore, StackSampler
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collapses_stacks_of_target_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,))
+    worker.start()
+    try:
+        sampler = StackSampler(interval=0.001, thread_ids={worker.ident}).start()
+        time.sleep(0.05)
+        sampler.stop()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sampler.sample_count > 0
+    assert any("test_profiler:_busy_loop" in stack for stack in sampler.samples)
+    # Only the worker was sampled: not the main thread, nor the sampler itself
+    assert all(stack.startswith("threading:_bootstrap;") for stack in sampler.samples)
+    assert not any("profiler:_run" in stack for stack in sampler.samples)
+
+
+def test_profile_store_keeps_most_recent_profiles():
+    store = ProfileStore(max_profiles=2)
+    for profile_id in ("a", "b", "c"):
+        store.put(profile_id, f"{profile_id} 1\n")
+
+    assert store.get("a") is None
+    assert store.get("c") == "c 1\n"
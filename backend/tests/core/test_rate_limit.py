@@ -0,0 +1,113 @@
+from types import SimpleNamespace
+
+import pytest
+from app.core import rate_limit as rate_limit_module
+from app.core.rate_limit import (
+    KEY_PREFIX,
+    LocalBuckets,
+    RateLimit,
+    RateLimiter,
+    RateLimitKey,
+    _key_for,
+    parse_overrides,
+)
+from app.schemas.auth import UserContext
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FailingRedis:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def hit(self, key, limit, cost=1):
+        self.calls += 1
+        raise ConnectionError("redis down")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limit_module.time, "monotonic", clock)
+    return clock
+
+
+def test_parse_limits():
+    assert RateLimit.parse("10/minute") == RateLimit(10, 60)
+    assert RateLimit.parse(" 5 / hours ") == RateLimit(5, 3600)
+    assert parse_overrides("auth.login=3/second, org.join=1/day") == {
+        "auth.login": RateLimit(3, 1),
+        "org.join": RateLimit(1, 86400),
+    }
+    for invalid in ("0/minute", "10/fortnight", "ten"):
+        with pytest.raises(ValueError):
+            RateLimit.parse(invalid)
+    with pytest.raises(ValueError):
+        parse_overrides("auth.login")
+
+
+def test_bucket_allows_burst_then_refills(clock):
+    buckets = LocalBuckets()
+    limit = RateLimit.parse("3/minute")
+
+    decisions = [buckets.hit("k", limit) for _ in range(4)]
+
+    assert [decision.allowed for decision in decisions] == [True, True, True, False]
+    assert decisions[0].remaining == 2
+    assert decisions[3].retry_after_seconds == 20
+    assert decisions[3].reset_seconds == 60
+
+    clock.now += 20
+    assert buckets.hit("k", limit).allowed
+    assert not buckets.hit("k", limit).allowed
+    assert buckets.hit("other", limit).allowed
+
+
+def test_local_buckets_evict_least_recently_used(clock):
+    buckets = LocalBuckets(max_keys=2)
+    limit = RateLimit.parse("1/hour")
+    buckets.hit("a", limit)
+    buckets.hit("b", limit)
+    buckets.hit("c", limit)
+
+    # "a" was evicted, so it starts with a full bucket again
+    assert buckets.hit("a", limit).allowed
+    assert not buckets.hit("c", limit).allowed
+
+
+@pytest.mark.asyncio
+async def test_falls_back_to_local_buckets_while_redis_is_down(clock):
+    redis = FailingRedis()
+    limiter = RateLimiter(redis)
+    limit = RateLimit.parse("1/minute")
+
+    assert (await limiter.hit("auth.login", "ip:1.2.3.4", limit)).allowed
+    assert not (await limiter.hit("auth.login", "ip:1.2.3.4", limit)).allowed
+    assert redis.calls == 1
+
+    clock.now += rate_limit_module.REDIS_RETRY_SECONDS
+    await limiter.hit("auth.login", "ip:1.2.3.4", limit)
+    assert redis.calls == 2
+    assert list(limiter.local._buckets) == [f"{KEY_PREFIX}auth.login:ip:1.2.3.4"]
+
+
+def test_key_selection():
+    request = SimpleNamespace(
+        path_params={"organization_id": 7},
+        client=SimpleNamespace(host="10.0.0.1"),
+        headers={},
+    )
+    anonymous = SimpleNamespace(**{**vars(request), "path_params": {}})
+    ctx = UserContext(user_id=3, organization_id=9)
+
+    assert _key_for(request, RateLimitKey.ORGANIZATION, None) == "org:7"
+    assert _key_for(anonymous, RateLimitKey.ORGANIZATION, ctx) == "org:9"
+    assert _key_for(request, RateLimitKey.USER, ctx) == "user:3"
+    assert _key_for(request, RateLimitKey.USER, None) == "ip:10.0.0.1"
+    assert _key_for(request, RateLimitKey.IP, ctx) == "ip:10.0.0.1"
@@ -0,0 +1,43 @@
+import json
+from datetime import UTC, datetime
+
+from app.core.responses import ORJSONResponse
+from app.schemas.organization import OrganizationRole, TeamMember, TeamMembersResponse
+from app.schemas.user import UserRead
+
+
+def _member(member_id: int) -> TeamMember:
+    return TeamMember(
+        id=member_id,
+        user_id=member_id,
+        email=f"member{member_id}@example.com",
+        full_name=f"Member {member_id}",
+        role=OrganizationRole.ACCOUNTANT,
+        joined_at=datetime(2025, 1, 1, tzinfo=UTC),
+    )
+
+
+def test_renders_model_like_pydantic_json_mode():
+    payload = TeamMembersResponse(members=[_member(1), _member(2)], total=2)
+
+    response = ORJSONResponse(payload)
+
+    assert json.loads(response.body) == payload.model_dump(mode="json")
+    assert response.media_type == "application/json"
+
+
+def test_renders_models_nested_in_containers():
+    users = [UserRead(id=1, email="one@example.com", full_name="One")]
+
+    response = ORJSONResponse({"items": users, 1: "int-key"})
+
+    body = json.loads(response.body)
+    assert body["items"] == [users[0].model_dump(mode="json")]
+    assert body["1"] == "int-key"
+
+
+def test_keeps_status_code_and_headers():
+    response = ORJSONResponse(_member(1), status_code=201, headers={"X-Test": "yes"})
+
+    assert response.status_code == 201
+    assert response.headers["X-Test"] == "yes"
@@ -0,0 +1,105 @@
+import asyncio
+import time
+
+import pytest
+from app.core.metrics import SCHEDULER_JOB_RUNS
+from app.core.scheduler import Job, MemoryStore, Scheduler
+
+pytestmark = pytest.mark.asyncio
+
+
+class Recorder:
+    def __init__(self, fail=False, block=False):
+        self.calls = 0
+        self.fail = fail
+        self.release = asyncio.Event()
+        if not block:
+            self.release.set()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("boom")
+
+
+async def _drain(scheduler):
+    await asyncio.gather(*scheduler._running.values())
+
+
+async def test_only_the_leader_runs_jobs():
+    store = MemoryStore()
+    job = Recorder()
+    first = Scheduler(store, [Job("cleanup", 60, job)])
+    second = Scheduler(store, [Job("cleanup", 60, job)])
+
+    await first.tick()
+    await second.tick()
+    await _drain(first)
+
+    assert first.is_leader is True
+    assert second.is_leader is False
+    assert job.calls == 1
+
+
+async def test_missed_runs_are_caught_up_once():
+    store = MemoryStore()
+    await store.set_last_run("cleanup", time.time() - 600)
+    job = Recorder()
+    scheduler = Scheduler(store, [Job("cleanup", 60, job)])
+
+    await scheduler.tick()
+    await _drain(scheduler)
+    await scheduler.tick()
+    await _drain(scheduler)
+
+    assert job.calls == 1
+    assert (await store.last_runs())["cleanup"] > time.time() - 5
+
+
+async def test_jobs_that_are_not_due_wait():
+    store = MemoryStore()
+    await store.set_last_run("cleanup", time.time())
+    job = Recorder()
+    scheduler = Scheduler(store, [Job("cleanup", 60, job)])
+
+    await scheduler.tick()
+
+    assert scheduler.is_leader is True
+    assert job.calls == 0
+
+
+async def test_failed_runs_wait_for_the_next_interval():
+    job = Recorder(fail=True)
+    scheduler = Scheduler(MemoryStore(), [Job("flaky", 60, job)])
+    failures = SCHEDULER_JOB_RUNS.labels("flaky", "error").value
+
+    await scheduler.tick()
+    await _drain(scheduler)
+    await scheduler.tick()
+
+    assert job.calls == 1
+    assert SCHEDULER_JOB_RUNS.labels("flaky", "error").value == failures + 1
+
+
+async def test_losing_the_lease_cancels_running_jobs():
+    store = MemoryStore()
+    job = Recorder(block=True)
+    leader = Scheduler(store, [Job("slow", 60, job)], lease_seconds=30)
+    follower = Scheduler(store, [Job("slow", 60, job)], lease_seconds=30)
+    await leader.tick()
+    await asyncio.sleep(0)
+    running = leader._running["slow"]
+
+    # The lease expired, e.g. while this replica was paused
+    await store.release(leader.token)
+    await follower.tick()
+    await leader.tick()
+
+    assert leader.is_leader is False
+    assert running.cancelled()
+    assert "slow" not in await store.last_runs()
+    assert follower.is_leader is True
+    job.release.set()
+    await _drain(follower)
+    assert job.calls == 2
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+from app.core.singleflight import SingleFlight, flight_key
+from starlette.requests import Request
+
+pytestmark = pytest.mark.asyncio
+
+
+class Computation:
+    def __init__(self, result="members") -> None:
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.result = result
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+async def test_concurrent_calls_share_one_computation():
+    flights = SingleFlight()
+    compute = Computation()
+
+    tasks = [asyncio.create_task(flights.do("key", compute)) for _ in range(5)]
+    await compute.started.wait()
+    compute.release.set()
+
+    assert await asyncio.gather(*tasks) == ["members"] * 5
+    assert compute.calls == 1
+    assert len(flights) == 0
+
+
+async def test_different_keys_do_not_share():
+    flights = SingleFlight()
+    compute = Computation()
+    compute.release.set()
+
+    await asyncio.gather(
+        flights.do(("user", 1), compute), flights.do(("user", 2), compute)
+    )
+
+    assert compute.calls == 2
+
+
+async def test_followers_see_the_leaders_exception():
+    flights = SingleFlight()
+    compute = Computation(result=ValueError("boom"))
+
+    tasks = [asyncio.create_task(flights.do("key", compute)) for _ in range(3)]
+    await compute.started.wait()
+    compute.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert compute.calls == 1
+
+
+async def test_follower_takes_over_when_leader_is_cancelled():
+    flights = SingleFlight()
+    compute = Computation()
+
+    leader = asyncio.create_task(flights.do("key", compute))
+    await compute.started.wait()
+    follower = asyncio.create_task(flights.do("key", compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    compute.release.set()
+
+    assert await follower == "members"
+    assert compute.calls == 2
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+async def test_cancelled_follower_leaves_flight_running():
+    flights = SingleFlight()
+    compute = Computation()
+
+    leader = asyncio.create_task(flights.do("key", compute))
+    await compute.started.wait()
+    follower = asyncio.create_task(flights.do("key", compute))
+    await asyncio.sleep(0)
+    follower.cancel()
+    compute.release.set()
+
+    assert await leader == "members"
+    with pytest.raises(asyncio.CancelledError):
+        await follower
+
+
+async def test_flight_key_covers_route_parameters_and_scope():
+    def request(query: bytes, organization_id: int) -> Request:
+        return Request(
+            {
+                "type": "http",
+                "method": "GET",
+                "path": f"/organizations/{organization_id}/members",
+                "path_params": {"organization_id": organization_id},
+                "query_string": query,
+                "headers": [],
+            }
+        )
+
+    base = flight_key(request(b"a=1&b=2", 7), scope="v1")
+
+    assert flight_key(request(b"b=2&a=1", 7), scope="v1") == base
+    assert flight_key(request(b"a=1&b=2", 7), scope="v2") != base
+    assert flight_key(request(b"a=1&b=3", 7), scope="v1") != base
+    assert flight_key(request(b"a=1&b=2", 8), scope="v1") != base
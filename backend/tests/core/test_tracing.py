@@ -0,0 +1,157 @@
+import json
+
+import pytest
+from app.core.tracing import (
+    FileExporter,
+    InMemoryExporter,
+    ParentBasedRatioSampler,
+    SimpleSpanProcessor,
+    configure_tracing,
+    format_traceparent,
+    instrument_engine,
+    parse_traceparent,
+    tracer,
+)
+from sqlalchemy import text
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture()
+def exporter():
+    exporter = InMemoryExporter()
+    configure_tracing(SimpleSpanProcessor(exporter), sample_ratio=1.0)
+    yield exporter
+    tracer.processor = None
+
+
+def test_nested_spans_share_trace_and_link_parent(exporter):
+    with tracer.start_span("outer") as outer:
+        with tracer.start_span("inner", attributes={"step": 1}):
+            pass
+
+    inner, finished_outer = exporter.spans
+    assert finished_outer is outer
+    assert inner.trace_id == outer.trace_id
+    assert inner.parent_id == outer.span_id
+    assert inner.attributes == {"step": 1}
+
+
+def test_exception_marks_span_as_error(exporter):
+    with pytest.raises(RuntimeError):
+        with tracer.start_span("failing"):
+            raise RuntimeError("boom")
+
+    (span,) = exporter.spans
+    assert span.status == "error"
+    assert span.status_message == "RuntimeError: boom"
+
+
+@pytest.mark.asyncio
+async def test_traced_decorator_wraps_coroutines(exporter):
+    @tracer.traced("work")
+    async def work():
+        return 42
+
+    assert await work() == 42
+    assert [span.name for span in exporter.spans] == ["work"]
+
+
+def test_unsampled_traces_are_not_exported(exporter):
+    tracer.sampler = ParentBasedRatioSampler(0.0)
+
+    with tracer.start_span("outer"):
+        with tracer.start_span("inner") as inner:
+            assert not inner.sampled
+
+    assert exporter.spans == []
+
+
+def test_sampler_follows_parent_decision():
+    sampler = ParentBasedRatioSampler(0.0)
+
+    assert sampler.should_sample(TRACE_ID, True)
+    assert not ParentBasedRatioSampler(1.0).should_sample(TRACE_ID, False)
+
+
+def test_sampler_ratio_is_deterministic_per_trace():
+    sampler = ParentBasedRatioSampler(0.5)
+
+    assert sampler.should_sample("0" * 32, None)
+    assert not sampler.should_sample("f" * 32, None)
+
+
+def test_traceparent_round_trip(exporter):
+    parsed = parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01")
+    assert parsed == (TRACE_ID, PARENT_ID, True)
+
+    span = tracer.create_span("server", remote_parent=parsed)
+    assert span.trace_id == TRACE_ID
+    assert span.parent_id == PARENT_ID
+    assert format_traceparent(span) == f"00-{TRACE_ID}-{span.span_id}-01"
+
+
+@pytest.mark.parametrize(
+    "header",
+    [
+        None,
+        "",
+        "garbage",
+        f"00-{'0' * 32}-{PARENT_ID}-01",
+        f"ff-{TRACE_ID}-{PARENT_ID}-01",
+    ],
+)
+def test_invalid_traceparent_is_ignored(header):
+    assert parse_traceparent(header) is None
+
+
+def test_file_exporter_writes_otlp_json_lines(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    exporter = FileExporter(path, "test-service")
+    local_tracer = configure_tracing(SimpleSpanProcessor(exporter), sample_ratio=1.0)
+    try:
+        with local_tracer.start_span("op", attributes={"count": 2, "ok": True}):
+            pass
+    finally:
+        tracer.processor = None
+
+    (line,) = path.read_text().splitlines()
+    resource_spans = json.loads(line)["resourceSpans"][0]
+    span = resource_spans["scopeSpans"][0]["spans"][0]
+    assert resource_spans["resource"]["attributes"][0]["value"] == {
+        "stringValue": "test-service"
+    }
+    assert span["name"] == "op"
+    assert span["attributes"] == [
+        {"key": "count", "value": {"intValue": "2"}},
+        {"key": "ok", "value": {"boolValue": True}},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_sql_statements_become_child_spans(exporter, db_engine):
+    instrument_engine(db_engine.sync_engine)
+
+    with tracer.start_span("request") as parent:
+        async with db_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    db_spans = [span for span in exporter.spans if span.name == "db.query"]
+    assert db_spans[-1].parent_id == parent.span_id
+    assert db_spans[-1].attributes["db.statement"] == "SELECT 1"
+    assert db_spans[-1].attributes["db.system"] == "sqlite"
+
+
+@pytest.mark.asyncio
+async def test_request_span_uses_route_template_and_remote_parent(exporter, api_client):
+    response = await api_client.get(
+        "/api/v1/health/", headers={"traceparent": f"00-{TRACE_ID}-{PARENT_ID}-01"}
+    )
+
+    assert response.status_code == 200
+    server = next(span for span in exporter.spans if span.kind == "server")
+    assert server.name == "GET /api/v1/health/"
+    assert server.trace_id == TRACE_ID
+    assert server.parent_id == PARENT_ID
+    assert server.attributes["http.status_code"] == 200
@@ -0,0 +1,34 @@
+from app.core.metrics import MultiprocessStore
+from app.core.usage import (
+    NO_TENANT,
+    RequestUsage,
+    TenantUsageAggregator,
+    merge_snapshots,
+)
+
+
+def test_aggregator_sums_requests_per_tenant():
+    aggregator = TenantUsageAggregator()
+    aggregator.record(RequestUsage(organization_id=7, sql_statements=3))
+    aggregator.record(RequestUsage(organization_id=7, response_bytes=100))
+    aggregator.record(RequestUsage(sql_statements=1))
+
+    snapshot = aggregator.snapshot()
+
+    assert snapshot["7"]["requests"] == 2
+    assert snapshot["7"]["sql_statements"] == 3
+    assert snapshot["7"]["response_bytes"] == 100
+    assert snapshot[NO_TENANT]["sql_statements"] == 1
+
+
+def test_worker_snapshots_merge_through_store(tmp_path):
+    store = MultiprocessStore(tmp_path, prefix="tenant_usage")
+    for pid, statements in ((100, 2), (200, 5)):
+        aggregator = TenantUsageAggregator()
+        aggregator.record(RequestUsage(organization_id=1, sql_statements=statements))
+        store.write(aggregator.snapshot(), pid=pid)
+
+    merged = merge_snapshots([snapshot for _pid, snapshot in store.read_all()])
+
+    assert merged["1"].requests == 2
+    assert merged["1"].sql_statements == 7
@@ -0,0 +1,164 @@
+import pytest
+import sqlalchemy as sa
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from app.db.backfill import Backfill, BackfillRunner, checkpoints, run_in_migration
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import StaticPool
+
+metadata = sa.MetaData()
+items = sa.Table(
+    "items",
+    metadata,
+    sa.Column("id", sa.Integer, primary_key=True),
+    sa.Column("value", sa.Integer, nullable=True),
+)
+
+
+class LockNotAvailable(Exception):
+    pgcode = "55P03"
+
+
+@pytest.fixture()
+def connection():
+    engine = sa.create_engine("sqlite://", poolclass=StaticPool)
+    metadata.create_all(engine)
+    with engine.connect() as conn:
+        conn.execute(
+            items.insert(),
+            [{"id": i, "value": None if i % 2 else i} for i in range(1, 11)],
+        )
+        conn.commit()
+        yield conn
+    engine.dispose()
+
+
+def _runner(connection, **options):
+    return BackfillRunner(connection, sleep=lambda _seconds: None, **options)
+
+
+def _values(connection):
+    return connection.execute(sa.select(items.c.value).order_by(items.c.id)).scalars()
+
+
+def test_backfill_updates_matching_rows_in_chunks(connection):
+    progress = []
+    backfill = Backfill(
+        "fill_values", items, values={"value": 0}, where=items.c.value.is_(None)
+    )
+
+    handled = _runner(connection, batch_size=2, on_progress=progress.append).run(
+        backfill
+    )
+
+    assert handled == 5
+    assert list(_values(connection)) == [0, 2, 0, 4, 0, 6, 0, 8, 0, 10]
+    assert [p.rows_done for p in progress] == [2, 4, 5]
+    assert [p.last_key for p in progress] == [3, 7, 9]
+    checkpoint = connection.execute(sa.select(checkpoints)).one()
+    assert checkpoint.completed_at is not None
+    # A finished backfill is skipped when the revision runs again
+    assert _runner(connection).run(backfill) == 0
+
+
+def test_interrupted_backfill_resumes_after_last_checkpoint(connection):
+    seen = []
+    crashes = [RuntimeError("worker killed")]
+
+    def process(conn, rows):
+        if len(seen) == 4 and crashes:
+            raise crashes.pop()
+        seen.extend(row.id for row in rows)
+        conn.execute(
+            items.update()
+            .where(items.c.id.in_([row.id for row in rows]))
+            .values(value=-1)
+        )
+
+    backfill = Backfill("mark", items, process=process)
+    with pytest.raises(RuntimeError):
+        _runner(connection, batch_size=2).run(backfill)
+    connection.rollback()
+
+    _runner(connection, batch_size=2).run(backfill)
+
+    assert seen == list(range(1, 11))
+    assert set(_values(connection)) == {-1}
+
+
+def test_lock_timeouts_retry_with_smaller_chunks(connection):
+    sizes = []
+
+    def process(conn, rows):
+        sizes.append(len(rows))
+        if len(sizes) == 1:
+            raise OperationalError("UPDATE items", {}, LockNotAvailable())
+
+    _runner(connection, batch_size=4, min_batch_size=1).run(
+        Backfill("retry", items, process=process)
+    )
+
+    assert sizes[:3] == [4, 2, 4]
+    assert sum(sizes[1:]) == 10
+
+
+@pytest.mark.parametrize("autocommit", [False, True])
+def test_every_chunk_transaction_sets_its_own_lock_timeout(connection, autocommit):
+    if autocommit:
+        connection.execution_options(isolation_level="AUTOCOMMIT")
+    events = []
+
+    # SQLite has no set_config; record the call and run a no-op instead
+    def rewrite(conn, cursor, statement, parameters, context, executemany):
+        if "set_config('lock_timeout'" in statement:
+            events.append("lock_timeout")
+            return "SELECT 1", ()
+        if statement in ("BEGIN", "COMMIT", "ROLLBACK"):
+            events.append(statement.lower())
+        return statement, parameters
+
+    engine = connection.engine
+    event.listen(engine, "before_cursor_execute", rewrite, retval=True)
+    event.listen(engine, "commit", lambda conn: events.append("commit"))
+    event.listen(engine, "rollback", lambda conn: events.append("rollback"))
+    runner = _runner(connection, batch_size=4, min_batch_size=1)
+    runner.is_postgres = True
+    runner._replication_lag = lambda: 0.0
+    runner._lock_waiters = lambda: 0
+    # Whether lock_timeout was set since the last transaction ended
+    covered = []
+
+    def process(conn, rows):
+        ended = max(
+            (i for i, name in enumerate(events) if name in ("commit", "rollback")),
+            default=-1,
+        )
+        covered.append("lock_timeout" in events[ended + 1 :])
+        if len(covered) == 1:
+            raise OperationalError("UPDATE items", {}, LockNotAvailable())
+
+    runner.run(Backfill("settings", items, process=process))
+
+    assert runner.autocommit is autocommit
+    assert len(covered) > 2 and all(covered)
+    assert ("begin" in events) is autocommit
+
+
+def test_backfill_needs_values_or_process():
+    with pytest.raises(ValueError):
+        Backfill("empty", items)
+
+
+def test_run_in_migration_commits_chunks_outside_the_revision(connection):
+    context = MigrationContext.configure(connection)
+    with context.begin_transaction(), Operations.context(context):
+        run_in_migration(
+            Backfill(
+                "migration", items, values={"value": 1}, where=items.c.value.is_(None)
+            ),
+            batch_size=3,
+            sleep=lambda _seconds: None,
+        )
+
+    assert list(_values(connection)) == [1, 2, 1, 4, 1, 6, 1, 8, 1, 10]
@@ -0,0 +1,91 @@
+import pytest
+from app.db.loaders import LoadProfile, loader_options
+from app.models.organization import Organization, OrganizationRole, UserOrganization
+from app.models.user import User
+from app.services.organization import OrganizationService
+from sqlalchemy import event, select
+from sqlalchemy.exc import InvalidRequestError
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture()
+def statements(db_engine):
+    captured = []
+
+    def _record(conn, cursor, statement, parameters, context, many):
+        captured.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", _record)
+    yield captured
+    event.remove(db_engine.sync_engine, "before_cursor_execute", _record)
+
+
+async def _organization_with_members(db_session, count):
+    organization = Organization(
+        company_name="Acme",
+        registration_name="Acme DOOEL",
+        edb="4030000000000",
+        embs="1234567",
+        address="Skopje",
+        contact_person="Owner",
+        contact_email="owner@example.com",
+        contact_phone="070000000",
+    )
+    users = [
+        User(email=f"user{i}@example.com", full_name=f"User {i}") for i in range(count)
+    ]
+    db_session.add_all([organization, *users])
+    await db_session.flush()
+    db_session.add_all(
+        UserOrganization(
+            user_id=user.id,
+            organization_id=organization.id,
+            role=OrganizationRole.MEMBER,
+        )
+        for user in users
+    )
+    await db_session.flush()
+    db_session.expunge_all()
+    return organization.id
+
+
+async def test_unloaded_relationship_raises(db_session):
+    organization_id = await _organization_with_members(db_session, 1)
+
+    result = await db_session.execute(
+        select(UserOrganization).where(
+            UserOrganization.organization_id == organization_id
+        )
+    )
+    membership = result.scalars().one()
+
+    with pytest.raises(InvalidRequestError):
+        membership.user
+
+
+async def test_profile_loads_relationship_in_same_statement(db_session, statements):
+    organization_id = await _organization_with_members(db_session, 2)
+    statements.clear()
+
+    result = await db_session.execute(
+        select(UserOrganization)
+        .options(*loader_options(LoadProfile.MEMBER_LISTING))
+        .where(UserOrganization.organization_id == organization_id)
+    )
+    emails = sorted(membership.user.email for membership in result.scalars())
+
+    assert emails == ["user0@example.com", "user1@example.com"]
+    assert len(statements) == 1
+
+
+async def test_member_listing_query_count_is_constant(db_session, statements):
+    organization_id = await _organization_with_members(db_session, 5)
+    statements.clear()
+
+    members = await OrganizationService.get_organization_members(
+        db_session, organization_id
+    )
+
+    assert len(members) == 5
+    assert len(statements) == 1
@@ -0,0 +1,87 @@
+import pytest
+from app.db import session as session_module
+from app.db.session import get_session
+from app.models.user import User
+from fastapi import Depends, FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture()
+def session_factory(monkeypatch, db_engine):
+    factory = async_sessionmaker(db_engine, expire_on_commit=False, class_=AsyncSession)
+    monkeypatch.setattr(session_module, "async_session_factory", factory)
+    return factory
+
+
+@pytest.fixture()
+def app():
+    app = FastAPI()
+
+    @app.post("/users/{email}")
+    async def create(
+        email: str, session: AsyncSession = Depends(get_session, scope="function")
+    ):
+        session.add(User(email=email, hashed_password="x"))
+        await session.flush()
+        return {"ok": True}
+
+    @app.post("/users/{email}/fail")
+    async def create_then_fail(
+        email: str, session: AsyncSession = Depends(get_session, scope="function")
+    ):
+        session.add(User(email=email, hashed_password="x"))
+        await session.flush()
+        raise HTTPException(status_code=409, detail="conflict")
+
+    return app
+
+
+async def _count_users(factory) -> int:
+    async with factory() as session:
+        return await session.scalar(select(func.count()).select_from(User))
+
+
+async def test_get_session_commits_when_handler_returns(session_factory, app):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/users/a@example.com")
+
+    assert response.status_code == 200
+    assert await _count_users(session_factory) == 1
+
+
+async def test_get_session_rolls_back_when_handler_raises(session_factory, app):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.post("/users/b@example.com/fail")
+
+    assert response.status_code == 409
+    assert await _count_users(session_factory) == 0
+
+
+async def test_failed_commit_surfaces_as_error_response(
+    monkeypatch, session_factory, app
+):
+    class FailingCommitSession(AsyncSession):
+        async def commit(self) -> None:
+            raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(
+        session_module,
+        "async_session_factory",
+        async_sessionmaker(session_factory.kw["bind"], class_=FailingCommitSession),
+    )
+    async with AsyncClient(
+        transport=ASGITransport(app=app, raise_app_exceptions=False),
+        base_url="http://test",
+    ) as client:
+        response = await client.post("/users/c@example.com")
+
+    assert response.status_code == 500
+    assert await _count_users(session_factory) == 0
@@ -0,0 +1,82 @@
+import smtplib
+
+import pytest
+
+from app.services.email import EmailService
+
+
+class FakeSMTP:
+    def __init__(self, refused=()):
+        self.refused = set(refused)
+        self.sent = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def sendmail(self, from_addr, to_addr, message):
+        if to_addr in self.refused:
+            raise smtplib.SMTPRecipientsRefused({to_addr: (550, b"no such user")})
+        self.sent.append(to_addr)
+
+
+def test_send_bulk_uses_one_connection_and_skips_refused(monkeypatch):
+    service = EmailService()
+    connections = []
+
+    def _connect():
+        connections.append(FakeSMTP(refused={"bad@example.com"}))
+        return connections[-1]
+
+    monkeypatch.setattr(service, "_connect", _connect)
+
+    sent = service.send_bulk(
+        [
+            ("a@example.com", "Subject", "<p>a</p>"),
+            ("bad@example.com", "Subject", "<p>b</p>"),
+            ("c@example.com", "Subject", "<p>c</p>"),
+        ]
+    )
+
+    assert sent == 2
+    assert len(connections) == 1
+    assert connections[0].sent == ["a@example.com", "c@example.com"]
+
+
+def test_send_bulk_reports_zero_when_connection_fails(monkeypatch):
+    service = EmailService()
+
+    def _connect():
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(service, "_connect", _connect)
+
+    assert service.send_bulk([("a@example.com", "Subject", "<p>a</p>")]) == 0
+
+
+def test_connect_closes_socket_when_login_fails(monkeypatch):
+    closed = []
+
+    class FailingLogin:
+        def __init__(self, host, port):
+            pass
+
+        def starttls(self):
+            pass
+
+        def login(self, user, password):
+            raise smtplib.SMTPAuthenticationError(535, b"bad credentials")
+
+        def close(self):
+            closed.append(True)
+
+    monkeypatch.setattr(smtplib, "SMTP", FailingLogin)
+    service = EmailService()
+    service.smtp_user, service.smtp_password = "user", "secret"
+
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        service._connect()
+
+    assert closed == [True]
@@ -0,0 +1,42 @@
+import pytest
+from app.models.organization import OrganizationRole
+from app.services.organization import OrganizationService
+
+OWNER = OrganizationRole.OWNER
+ADMIN = OrganizationRole.ADMIN
+ACCOUNTANT = OrganizationRole.ACCOUNTANT
+MEMBER = OrganizationRole.MEMBER
+VIEWER = OrganizationRole.VIEWER
+
+
+@pytest.mark.parametrize(
+    ("requester", "member", "allowed"),
+    [
+        (OWNER, ADMIN, True),
+        (ADMIN, ACCOUNTANT, True),
+        (ADMIN, ADMIN, False),
+        (ADMIN, OWNER, False),
+        (ACCOUNTANT, VIEWER, False),
+    ],
+)
+def test_check_member_removal(requester, member, allowed):
+    denied = OrganizationService.check_member_removal(requester, member)
+
+    assert (denied is None) is allowed
+
+
+@pytest.mark.parametrize(
+    ("requester", "member", "new_role", "allowed"),
+    [
+        (OWNER, MEMBER, ADMIN, True),
+        (OWNER, ADMIN, OWNER, False),
+        (ADMIN, VIEWER, MEMBER, True),
+        (ADMIN, MEMBER, ADMIN, False),
+        (ADMIN, ADMIN, VIEWER, False),
+        (MEMBER, VIEWER, MEMBER, False),
+    ],
+)
+def test_check_role_change(requester, member, new_role, allowed):
+    denied = OrganizationService.check_role_change(requester, member, new_role)
+
+    assert (denied is None) is allowed
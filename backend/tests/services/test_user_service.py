@@ -1,9 +1,13 @@
+from datetime import UTC, datetime, timedelta
 from unittest.mock import AsyncMock, Mock
 
 import pytest
+from app.models.organization import UserOrganization
+from app.models.user import User
 from app.schemas.user import UserCreate
 from app.services.user import UserService
 from pydantic.v1 import EmailStr
+from sqlalchemy import select
 
 pytestmark = pytest.mark.asyncio
 
@@ -49,10 +53,10 @@ async def test_create_user_hashes_password(monkeypatch, mock_user_repository):
     fake_hash = "hashed-secret"
     monkeypatch.setattr("app.services.user.get_password_hash", lambda _: fake_hash)
 
-    async def _refresh_side_effect(user):
-        user.id = 1
+    async def _flush_side_effect():
+        mock_user_repository.add.call_args.args[0].id = 1
 
-    mock_user_repository.refresh = AsyncMock(side_effect=_refresh_side_effect)
+    mock_user_repository.flush = AsyncMock(side_effect=_flush_side_effect)
 
     mock_user_repository.execute.return_value = _result_with_scalar(None)
 
@@ -62,8 +66,8 @@ async def test_create_user_hashes_password(monkeypatch, mock_user_repository):
     assert created.id == 1
     added_user = mock_user_repository.add.call_args.args[0]
     assert added_user.hashed_password == fake_hash
-    mock_user_repository.commit.assert_awaited_once()
-    mock_user_repository.refresh.assert_awaited_once()
+    mock_user_repository.flush.assert_awaited_once()
+    mock_user_repository.commit.assert_not_awaited()
 
 
 async def test_create_user_respects_provided_hash(monkeypatch, mock_user_repository):
@@ -74,10 +78,10 @@ async def test_create_user_respects_provided_hash(monkeypatch, mock_user_reposit
         lambda _: (_ for _ in ()).throw(RuntimeError("should not hash")),
     )
 
-    async def _refresh_side_effect(user):
-        user.id = 2
+    async def _flush_side_effect():
+        mock_user_repository.add.call_args.args[0].id = 2
 
-    mock_user_repository.refresh = AsyncMock(side_effect=_refresh_side_effect)
+    mock_user_repository.flush = AsyncMock(side_effect=_flush_side_effect)
 
     mock_user_repository.execute.return_value = _result_with_scalar(None)
 
@@ -98,3 +102,39 @@ async def test_list_users_returns_serialized_models(mock_user_repository, user_f
 
     assert [u.email for u in users] == ["first@example.com", "second@example.com"]
     mock_user_repository.execute.assert_awaited_once()
+
+
+async def test_get_by_email_matches_differently_formatted_address(db_session):
+    user = User(email="Jane.Doe@GMail.com", hashed_password="hashed")
+    db_session.add(user)
+    await db_session.flush()
+
+    found = await UserService(db_session).get_by_email("janedoe@gmail.com")
+
+    assert found is user
+    assert user.email == "Jane.Doe@GMail.com"
+    assert user.email_normalized == "janedoe@gmail.com"
+
+
+async def test_purge_unverified_keeps_verified_recent_and_members(db_session):
+    old = datetime.now(UTC) - timedelta(days=60)
+    stale = User(email="stale@example.com", created_at=old)
+    verified = User(email="verified@example.com", is_verified=True, created_at=old)
+    member = User(email="member@example.com", created_at=old)
+    recent = User(email="recent@example.com")
+    db_session.add_all([stale, verified, member, recent])
+    await db_session.flush()
+    db_session.add(UserOrganization(user_id=member.id, organization_id=1))
+    await db_session.flush()
+
+    purged = await UserService(db_session).purge_unverified(
+        datetime.now(UTC) - timedelta(days=30)
+    )
+
+    remaining = await db_session.execute(select(User.email).order_by(User.email))
+    assert purged == 1
+    assert remaining.scalars().all() == [
+        "member@example.com",
+        "recent@example.com",
+        "verified@example.com",
+    ]
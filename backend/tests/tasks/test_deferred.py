@@ -0,0 +1,59 @@
+import pytest
+from app.db import session as session_module
+from app.db.session import get_session
+from app.tasks.deferred import defer
+from fastapi import Depends, FastAPI, HTTPException
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+pytestmark = pytest.mark.asyncio
+
+
+class RecordingTask:
+    name = "test.record"
+
+    def __init__(self):
+        self.calls = []
+
+    def apply_async(self, args, kwargs):
+        self.calls.append((args, kwargs))
+
+
+@pytest.fixture()
+def task():
+    return RecordingTask()
+
+
+@pytest.fixture()
+def client(monkeypatch, db_engine, task):
+    factory = async_sessionmaker(db_engine, expire_on_commit=False, class_=AsyncSession)
+    monkeypatch.setattr(session_module, "async_session_factory", factory)
+    app = FastAPI()
+
+    @app.post("/ok")
+    async def ok(session: AsyncSession = Depends(get_session, scope="function")):
+        defer(session, task, "a@example.com", name="A")
+        return {"ok": True}
+
+    @app.post("/fail")
+    async def fail(session: AsyncSession = Depends(get_session, scope="function")):
+        defer(session, task, "a@example.com")
+        raise HTTPException(status_code=409, detail="conflict")
+
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+async def test_deferred_tasks_are_sent_after_commit(client, task):
+    async with client:
+        response = await client.post("/ok")
+
+    assert response.status_code == 200
+    assert task.calls == [(("a@example.com",), {"name": "A"})]
+
+
+async def test_deferred_tasks_are_dropped_on_rollback(client, task):
+    async with client:
+        response = await client.post("/fail")
+
+    assert response.status_code == 409
+    assert task.calls == []
@@ -0,0 +1,141 @@
+import smtplib
+from dataclasses import replace
+
+import pytest
+from app.tasks import email as email_tasks
+
+pytestmark = pytest.mark.asyncio
+
+
+class FakeSMTP:
+    def __init__(self, fail_after=None, error=None, greylisted=()):
+        self.fail_after = fail_after
+        self.error = error or smtplib.SMTPServerDisconnected("connection lost")
+        self.greylisted = set(greylisted)
+        self.sent = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def sendmail(self, from_addr, to_addr, message):
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            raise self.error
+        if to_addr in self.greylisted:
+            raise smtplib.SMTPRecipientsRefused({to_addr: (451, b"try again later")})
+        self.sent.append(to_addr)
+
+
+@pytest.fixture()
+def connections(monkeypatch):
+    """Queue up the SMTP connections the mailer will open, in order."""
+    queued = []
+    opened = []
+
+    def _connect():
+        opened.append(queued.pop(0))
+        return opened[-1]
+
+    monkeypatch.setattr(email_tasks.mailer, "_connect", _connect)
+    monkeypatch.setattr(
+        email_tasks,
+        "SMTP_RETRY",
+        replace(email_tasks.SMTP_RETRY, initial_wait=0, max_wait=0, jitter=0),
+    )
+    return queued, opened
+
+
+async def test_transient_failures_are_retried(connections):
+    queued, opened = connections
+    queued.extend([FakeSMTP(fail_after=0), FakeSMTP()])
+
+    result = email_tasks.send_password_reset_email.delay("a@example.com", "A", "token")
+
+    assert result.get() is True
+    assert len(opened) == 2
+    assert opened[1].sent == ["a@example.com"]
+
+
+async def test_permanent_failures_are_not_retried(connections):
+    queued, opened = connections
+    queued.extend(
+        [
+            FakeSMTP(
+                fail_after=0,
+                error=smtplib.SMTPAuthenticationError(535, b"bad credentials"),
+            ),
+            FakeSMTP(),
+        ]
+    )
+
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        email_tasks.send_welcome_email.delay("a@example.com", "A")
+
+    assert len(opened) == 1
+
+
+async def test_bulk_retry_resumes_after_sent_messages(connections):
+    queued, opened = connections
+    queued.extend([FakeSMTP(fail_after=1), FakeSMTP()])
+
+    result = email_tasks.send_organization_invitation_emails.delay(
+        "Org",
+        "Inviter",
+        [
+            ["a@example.com", "member", "CODE0001", False],
+            ["b@example.com", "admin", "CODE0002", True],
+            ["c@example.com", "member", "CODE0003", False],
+        ],
+    )
+
+    assert result.get() == 3
+    assert opened[0].sent == ["a@example.com"]
+    assert opened[1].sent == ["b@example.com", "c@example.com"]
+
+
+async def test_greylisted_single_email_is_retried(connections):
+    queued, opened = connections
+    queued.extend([FakeSMTP(greylisted={"a@example.com"}), FakeSMTP()])
+
+    result = email_tasks.send_welcome_email.delay("a@example.com", "A")
+
+    assert result.get() is True
+    assert opened[1].sent == ["a@example.com"]
+
+
+async def test_bulk_requeues_only_greylisted_recipients(connections, monkeypatch):
+    queued, opened = connections
+    queued.extend(
+        [
+            FakeSMTP(fail_after=2, greylisted={"b@example.com"}),
+            FakeSMTP(),
+            FakeSMTP(),
+        ]
+    )
+    requeued = []
+    monkeypatch.setattr(
+        email_tasks.send_organization_invitation_emails,
+        "apply_async",
+        lambda args, countdown: requeued.append((args, countdown)),
+    )
+
+    sent = email_tasks.send_organization_invitation_emails(
+        "Org",
+        "Inviter",
+        [
+            ["a@example.com", "member", "CODE0001", False],
+            ["b@example.com", "admin", "CODE0002", True],
+            ["c@example.com", "member", "CODE0003", False],
+            ["d@example.com", "member", "CODE0004", False],
+        ],
+    )
+
+    assert sent == 3
+    assert opened[0].sent == ["a@example.com", "c@example.com"]
+    assert opened[1].sent == ["d@example.com"]
+    [(args, countdown)] = requeued
+    assert args[2] == [["b@example.com", "admin", "CODE0002", True]]
+    assert args[4] == 1
+    assert countdown == email_tasks.GREYLIST_RETRY_DELAYS[0]
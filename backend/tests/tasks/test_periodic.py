@@ -0,0 +1,34 @@
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from app.db import session as session_module
+from app.models.user import User
+from app.tasks import periodic
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+pytestmark = pytest.mark.asyncio
+
+
+async def test_purge_unverified_users_clears_a_backlog_in_batches(
+    monkeypatch, db_engine, db_session
+):
+    factory = async_sessionmaker(db_engine, expire_on_commit=False, class_=AsyncSession)
+    opened = []
+
+    def counting_factory():
+        opened.append(True)
+        return factory()
+
+    monkeypatch.setattr(session_module, "async_session_factory", counting_factory)
+    monkeypatch.setattr(periodic, "PURGE_BATCH_SIZE", 2)
+    old = datetime.now(UTC) - timedelta(days=60)
+    db_session.add_all(
+        [User(email=f"stale{index}@example.com", created_at=old) for index in range(5)]
+    )
+    await db_session.commit()
+
+    await periodic.purge_unverified_users()
+
+    assert await db_session.scalar(select(func.count()).select_from(User)) == 0
+    assert len(opened) == 3
@@ -0,0 +1,14 @@
+import pytest
+from app.utils.email import normalize_email
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        (" Jane.Doe@GMail.com ", "janedoe@gmail.com"),
+        ("j.a.n.e@googlemail.com", "jane@googlemail.com"),
+        ("Jane.Doe@Example.com", "jane.doe@example.com"),
+    ],
+)
+def test_normalize_email(raw, expected):
+    assert normalize_email(raw) == expected
@@ -0,0 +1,41 @@
+from app.utils.etag import etag_matches, make_etag, not_modified
+
+
+def test_make_etag_is_stable_and_weak_by_default():
+    first = make_etag("members", 1, 3, None)
+    second = make_etag("members", 1, 3, None)
+
+    assert first == second
+    assert first.startswith('W/"')
+
+
+def test_make_etag_changes_with_validators():
+    assert make_etag("members", 1, 3) != make_etag("members", 1, 4)
+
+
+def test_make_etag_strong():
+    etag = make_etag("organization", 1, weak=False)
+
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+def test_etag_matches_uses_weak_comparison():
+    etag = make_etag("organization", 1)
+    strong = etag.removeprefix("W/")
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(strong, etag)
+    assert etag_matches(f'"other", {strong}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_not_modified_carries_validator():
+    etag = make_etag("organization", 1)
+
+    response = not_modified(etag)
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.body == b""
@@ -0,0 +1,27 @@
+from types import SimpleNamespace
+
+from app.utils.routing import route_template
+
+
+def test_route_template_for_relative_route_path():
+    scope = {
+        "route": SimpleNamespace(path_format="/{organization_id}/members"),
+        "path": "/api/v1/organizations/5/members",
+        "path_params": {"organization_id": 5},
+    }
+
+    assert route_template(scope) == "/api/v1/organizations/{organization_id}/members"
+
+
+def test_route_template_for_full_route_path():
+    scope = {
+        "route": SimpleNamespace(path="/api/v1/health/"),
+        "path": "/api/v1/health/",
+        "path_params": {},
+    }
+
+    assert route_template(scope) == "/api/v1/health/"
+
+
+def test_route_template_without_match():
+    assert route_template({"path": "/nope"}) == "unmatched"